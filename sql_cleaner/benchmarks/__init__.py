@@ -0,0 +1 @@
+"""Benchmarks of the SQL cleaner on generated SQL corpora.""" 
\ No newline at end of file
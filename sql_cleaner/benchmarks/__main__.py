@@ -0,0 +1,69 @@
+import argparse
+import json
+from typing import List
+
+from sql_cleaner.benchmarks.corpus import CorpusGenerator, CorpusSpec
+from sql_cleaner.benchmarks.runner import benchmark_cli, format_results, run_benchmarks, target_tables
+
+
+def parse_size(value: str) -> int:
+    """
+    Parse a size such as '512', '64K' or '8M'.
+    
+    Args:
+        value: Size with an optional K, M or G suffix
+        
+    Returns:
+        Size in bytes
+    """
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    value = value.strip().upper()
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def parse_list(value: str) -> List[str]:
+    return [item for item in value.split(',') if item]
+
+
+def main():
+    """Run the benchmarks and print a report."""
+    parser = argparse.ArgumentParser(description='Benchmark the SQL cleaner on generated SQL.')
+    parser.add_argument('--sizes', type=parse_list, default=['64K', '1M'],
+                        help='Comma-separated input sizes, e.g. 64K,1M (default: 64K,1M)')
+    parser.add_argument('--tables', type=parse_list, default=['1', '10', '100'],
+                        help='Comma-separated numbers of tables to clean (default: 1,10,100)')
+    parser.add_argument('--scenarios', type=parse_list, default=None,
+                        help=f"Comma-separated scenarios: mixed,{','.join(CorpusGenerator.KINDS)} (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement; the fastest is reported')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the corpus generator')
+    parser.add_argument('--cli', action='store_true', help='Also time the command line tool on a corpus of files')
+    parser.add_argument('--small-files', type=int, default=CorpusSpec().small_files, help='Small files in the CLI corpus')
+    parser.add_argument('--small-file-size', type=parse_size, default=CorpusSpec().small_file_size)
+    parser.add_argument('--huge-files', type=int, default=CorpusSpec().huge_files, help='Huge files in the CLI corpus')
+    parser.add_argument('--huge-file-size', type=parse_size, default=CorpusSpec().huge_file_size)
+    parser.add_argument('--jobs', type=int, default=None, help='Parallel jobs for the CLI run')
+    parser.add_argument('--json', help='Also write the results to this JSON file')
+    
+    args = parser.parse_args()
+    
+    sizes = [parse_size(size) for size in args.sizes]
+    table_counts = [int(count) for count in args.tables]
+    results = run_benchmarks(sizes, table_counts, args.scenarios, args.repeat, args.seed)
+    
+    if args.cli:
+        spec = CorpusSpec(args.small_files, args.small_file_size, args.huge_files, args.huge_file_size)
+        for table_count in table_counts:
+            results.append(benchmark_cli(spec, target_tables(table_count), args.jobs, args.seed))
+    
+    print(format_results(results))
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump([dict(result._asdict(), mb_per_second=result.mb_per_second,
+                            statements_per_second=result.statements_per_second) for result in results], f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+import os
+import random
+from typing import Dict, List, NamedTuple, Optional
+
+
+class CorpusSpec(NamedTuple):
+    """Shape of a generated corpus."""
+    small_files: int = 200
+    small_file_size: int = 4 * 1024
+    huge_files: int = 2
+    huge_file_size: int = 8 * 1024 * 1024
+
+
+class CorpusGenerator:
+    """
+    Generates synthetic SQL that exercises every handler.
+
+    The output depends only on the seed, so benchmark runs are comparable. Statements refer to
+    a mix of target tables (the ones being cleaned) and unrelated tables, in roughly the ratio
+    found in migration and fixture files.
+    """
+
+    # Statement kinds and how often they occur in a mixed file
+    KINDS = {
+        'wide_insert': 4,
+        'nested_where': 2,
+        'many_joins': 2,
+        'heavy_comments': 1,
+        'update': 1,
+        'delete': 1,
+    }
+
+    def __init__(self, target_tables: List[str], other_tables: Optional[List[str]] = None, seed: int = 0):
+        """
+        Initialize the generator.
+
+        Args:
+            target_tables: Tables that the benchmark will clean
+            other_tables: Unrelated tables, generated when not given
+            seed: Seed of the random generator
+        """
+        self.target_tables = list(target_tables)
+        self.other_tables = list(other_tables) if other_tables else [f"table_{i}" for i in range(20)]
+        self.random = random.Random(seed)
+
+    def _table(self, target_ratio: float = 0.3) -> str:
+        if self.target_tables and self.random.random() < target_ratio:
+            return self.random.choice(self.target_tables)
+        return self.random.choice(self.other_tables)
+
+    def _value(self) -> str:
+        kind = self.random.random()
+        if kind < 0.4:
+            return str(self.random.randint(0, 100000))
+        if kind < 0.8:
+            return f"'value {self.random.randint(0, 1000)}; with, punctuation'"
+        if kind < 0.9:
+            return 'NULL'
+        return f"now() - interval '{self.random.randint(1, 30)} days'"
+
+    def _condition(self, aliases: List[str], depth: int) -> str:
+        if depth > 0 and self.random.random() < 0.6:
+            operator = self.random.choice(['AND', 'OR'])
+            return f"({self._condition(aliases, depth - 1)} {operator} {self._condition(aliases, depth - 1)})"
+        column = self.random.choice([
+            f"{self.random.choice(aliases)}.col_{self.random.randint(0, 9)}",
+            f"{self._table(0.5)}_id",
+        ])
+        return f"{column} {self.random.choice(['=', '<>', '>', '<='])} {self._value()}"
+
+    def wide_insert(self, rows: int = 50, columns: int = 20) -> str:
+        """
+        Generate a multi-row INSERT with reference columns to several tables.
+
+        Args:
+            rows: Number of value rows
+            columns: Number of columns
+
+        Returns:
+            SQL statement
+        """
+        names = ['id'] + [f"{self._table(0.5)}_id" if i % 4 == 0 else f"col_{i}" for i in range(1, columns)]
+        names = list(dict.fromkeys(names))
+        values = ',\n    '.join(
+            '(' + ', '.join(self._value() for _ in names) + ')'
+            for _ in range(rows)
+        )
+        return f"INSERT INTO {self._table()} ({', '.join(names)}) VALUES\n    {values};"
+
+    def nested_where(self, depth: int = 5) -> str:
+        """
+        Generate a SELECT with a deeply nested WHERE clause.
+
+        Args:
+            depth: Nesting depth of the conditions
+
+        Returns:
+            SQL statement
+        """
+        table = self._table(0.5)
+        return (f"SELECT * FROM {table} t\nWHERE {self._condition(['t'], depth)}"
+                f" AND {self._condition(['t'], depth)}\nORDER BY t.id;")
+
+    def many_joins(self, joins: int = 8) -> str:
+        """
+        Generate a SELECT joining many tables.
+
+        Args:
+            joins: Number of JOIN clauses
+
+        Returns:
+            SQL statement
+        """
+        lines = [f"SELECT a0.* FROM {self._table(0.1)} a0"]
+        for i in range(1, joins + 1):
+            table = self._table()
+            kind = self.random.choice(['JOIN', 'LEFT JOIN', 'INNER JOIN'])
+            lines.append(f"{kind} {table} a{i} ON a{i}.id = a{i - 1}.{table}_id AND a{i}.col_1 = a0.col_1")
+        lines.append(f"WHERE {self._condition(['a0', 'a1'], 2)};")
+        return '\n'.join(lines)
+
+    def heavy_comments(self, lines: int = 20) -> str:
+        """
+        Generate a statement surrounded and interleaved with comments.
+
+        Args:
+            lines: Number of comment lines
+
+        Returns:
+            SQL statement with comments
+        """
+        parts = [f"-- generated comment {i}: SELECT * FROM {self._table()};" for i in range(lines // 2)]
+        parts.append("/* block comment\n   /* nested */\n   with 'quotes' and -- dashes */")
+        parts.append(f"UPDATE {self._table()} SET col_1 = 'x' -- trailing comment\nWHERE id = {self._value()};")
+        parts.extend(f"/* {i} */" for i in range(lines - lines // 2))
+        return '\n'.join(parts)
+
+    def update(self) -> str:
+        """Generate an UPDATE statement."""
+        return f"UPDATE {self._table()} SET col_1 = {self._value()} WHERE id = {self._value()};"
+
+    def delete(self) -> str:
+        """Generate a DELETE statement."""
+        return f"DELETE FROM {self._table()} WHERE {self._table(0.5)}_id = {self._value()};"
+
+    def statement(self, kind: Optional[str] = None) -> str:
+        """
+        Generate a statement of the given kind, or a random kind weighted by KINDS.
+
+        Args:
+            kind: Name of a generator method listed in KINDS
+
+        Returns:
+            SQL statement
+        """
+        if kind is None:
+            kind = self.random.choices(list(self.KINDS), weights=list(self.KINDS.values()))[0]
+        return getattr(self, kind)()
+
+    def content(self, size: int, kind: Optional[str] = None) -> str:
+        """
+        Generate SQL content of about the given size.
+
+        Args:
+            size: Size in characters to reach
+            kind: Generate only statements of this kind instead of a mix
+
+        Returns:
+            SQL content
+        """
+        statements = []
+        length = 0
+        while length < size:
+            statement = self.statement(kind)
+            statements.append(statement)
+            length += len(statement) + 1
+        return '\n'.join(statements) + '\n'
+
+    def write_corpus(self, directory: str, spec: CorpusSpec = CorpusSpec()) -> List[str]:
+        """
+        Write many small files and a few huge ones to a directory.
+
+        Args:
+            directory: Directory to write to; created if missing
+            spec: Number and size of the files
+
+        Returns:
+            Paths of the written files
+        """
+        paths = []
+        files: Dict[str, int] = {}
+        for i in range(spec.small_files):
+            files[os.path.join(directory, f"small_{i // 100:03d}", f"fixture_{i:05d}.sql")] = spec.small_file_size
+        for i in range(spec.huge_files):
+            files[os.path.join(directory, f"huge_{i:02d}.sql")] = spec.huge_file_size
+
+        for path, size in files.items():
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.content(size))
+            paths.append(path)
+
+        return paths
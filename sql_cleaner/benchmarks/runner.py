@@ -0,0 +1,192 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from contextlib import redirect_stdout
+from typing import Callable, Iterable, List, NamedTuple, Optional
+
+from sql_cleaner.benchmarks.corpus import CorpusGenerator, CorpusSpec
+from sql_cleaner.cli import process_sql_files
+from sql_cleaner.processor.cleaning_plan import CleaningPlan
+from sql_cleaner.processor.handler import SQLHandler
+from sql_cleaner.processor.sql_processor import SQLProcessor
+from sql_cleaner.processor.statement import parse_statements
+
+
+class BenchmarkResult(NamedTuple):
+    """Timing of one stage on one input."""
+    scenario: str
+    stage: str
+    tables: int
+    size: int
+    statements: int
+    seconds: float
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.size / (1024 * 1024) / self.seconds if self.seconds else float('inf')
+
+    @property
+    def statements_per_second(self) -> float:
+        return self.statements / self.seconds if self.seconds else float('inf')
+
+
+def handler_chain(processor: SQLProcessor) -> List[SQLHandler]:
+    """
+    List the handlers of a processor in chain order.
+
+    Args:
+        processor: Processor to inspect
+
+    Returns:
+        Handlers from the first to the last
+    """
+    handlers = []
+    handler = processor.handler
+    while handler is not None:
+        handlers.append(handler)
+        handler = handler._next_handler
+    return handlers
+
+
+def _best_time(run: Callable[[], None], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def target_tables(count: int) -> List[str]:
+    """
+    Get the names of the tables to clean in a benchmark with the given table count.
+
+    Args:
+        count: Number of tables
+
+    Returns:
+        Table names
+    """
+    return [f"target_{i}" for i in range(count)]
+
+
+def benchmark_handlers(content: str, tables: List[str], scenario: str, repeat: int = 3) -> List[BenchmarkResult]:
+    """
+    Time statement parsing, each handler and the whole chain on the same content.
+
+    Every handler gets the statements produced by the handlers before it and, as in the
+    chain, processes only the statements it accepts.
+
+    Args:
+        content: SQL content to process
+        tables: Tables to clean
+        scenario: Name of the input, for the report
+        repeat: Number of runs; the fastest one is reported
+
+    Returns:
+        One result per stage
+    """
+    processor = SQLProcessor()
+    plan = CleaningPlan(tables)
+    size = len(content.encode('utf-8'))
+    statement_count = len(parse_statements(content))
+    timings = {}
+
+    def record(stage: str, seconds: float):
+        timings[stage] = min(seconds, timings.get(stage, float('inf')))
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        statements = parse_statements(content)
+        record('parse', time.perf_counter() - start)
+
+        for handler in handler_chain(processor):
+            start = time.perf_counter()
+            statements = handler._route_statements(statements, plan)
+            record(type(handler).__name__, time.perf_counter() - start)
+
+    record('end-to-end', _best_time(lambda: processor.process_sql_content(content, plan), repeat))
+
+    return [BenchmarkResult(scenario, stage, len(tables), size, statement_count, seconds)
+            for stage, seconds in timings.items()]
+
+
+def benchmark_cli(spec: CorpusSpec, tables: List[str], jobs: Optional[int] = None, seed: int = 0) -> BenchmarkResult:
+    """
+    Time the command line tool on a generated corpus.
+
+    Args:
+        spec: Shape of the corpus
+        tables: Tables to clean
+        jobs: Number of parallel jobs passed to the tool
+        seed: Seed of the corpus generator
+
+    Returns:
+        Result for the whole run
+    """
+    directory = tempfile.mkdtemp(prefix='sql_cleaner_bench_')
+    try:
+        paths = CorpusGenerator(tables, seed=seed).write_corpus(directory, spec)
+        size = sum(os.path.getsize(path) for path in paths)
+        statement_count = 0
+        for path in paths:
+            with open(path, encoding='utf-8') as f:
+                statement_count += len(parse_statements(f.read()))
+
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            process_sql_files(directory, list(tables), jobs=jobs)
+        seconds = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return BenchmarkResult(f"cli ({len(paths)} files)", 'cli', len(tables), size, statement_count, seconds)
+
+
+def run_benchmarks(sizes: Iterable[int], table_counts: Iterable[int], scenarios: Optional[Iterable[str]] = None,
+                   repeat: int = 3, seed: int = 0) -> List[BenchmarkResult]:
+    """
+    Time the handlers for every combination of scenario, input size and table count.
+
+    Args:
+        sizes: Input sizes in characters
+        table_counts: Numbers of tables to clean
+        scenarios: Statement kinds from CorpusGenerator.KINDS, plus 'mixed'; all when not given
+        repeat: Number of runs per measurement
+        seed: Seed of the corpus generator
+
+    Returns:
+        All results
+    """
+    scenarios = list(scenarios) if scenarios else ['mixed'] + list(CorpusGenerator.KINDS)
+    results = []
+    for table_count in table_counts:
+        tables = target_tables(table_count)
+        for scenario in scenarios:
+            for size in sizes:
+                generator = CorpusGenerator(tables, seed=seed)
+                content = generator.content(size, None if scenario == 'mixed' else scenario)
+                results.extend(benchmark_handlers(content, tables, scenario, repeat))
+    return results
+
+
+def format_results(results: Iterable[BenchmarkResult]) -> str:
+    """
+    Format results as a plain text table.
+
+    Args:
+        results: Results to format
+
+    Returns:
+        The table
+    """
+    header = f"{'scenario':<22} {'stage':<24} {'tables':>7} {'size':>10} {'stmts':>8} {'seconds':>9} {'MB/s':>9} {'stmts/s':>11}"
+    lines = [header, '-' * len(header)]
+    for result in results:
+        lines.append(
+            f"{result.scenario:<22} {result.stage:<24} {result.tables:>7} {result.size:>10} {result.statements:>8} "
+            f"{result.seconds:>9.4f} {result.mb_per_second:>9.2f} {result.statements_per_second:>11.0f}"
+        )
+    return '\n'.join(lines)
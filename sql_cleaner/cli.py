@@ -1,10 +1,28 @@
+import difflib
+import hashlib
+import mmap
 import os
+import pathlib
+import shutil
 import sys
+import tempfile
+import time
 import argparse
-from typing import List, Optional
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from itertools import islice
+from typing import BinaryIO, Callable, Deque, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
 
+from sql_cleaner.processor.data_dump import AUTO, DATA_DUMP_MODES, NEVER
 from sql_cleaner.processor.file_finder import SQLFileFinder
-from sql_cleaner.processor.sql_processor import SQLProcessor
+from sql_cleaner.processor.manifest import (
+    MANIFEST_FILE_NAME, ManifestEntry, RunManifest, is_unchanged, make_entry, tables_fingerprint
+)
+from sql_cleaner.processor.profiler import Profiler
+from sql_cleaner.processor.sql_processor import SQLProcessor, worker_processor
+from sql_cleaner.processor.table_index import INDEX_FILE_NAME, TableIndex
 
 
 def read_tables_from_file(file_path: str) -> List[str]:
@@ -25,7 +43,12 @@ def read_tables_from_file(file_path: str) -> List[str]:
         return [line.strip() for line in f if line.strip()]
 
 
-def process_sql_files(directory: str, tables_to_process: Optional[List[str]] = None, tables_file: Optional[str] = None):
+def process_sql_files(directory: str, tables_to_process: Optional[List[str]] = None, tables_file: Optional[str] = None,
+                      jobs: Optional[int] = None, profile_report: Optional[str] = None, incremental: bool = False,
+                      manifest_path: Optional[str] = None, dry_run: bool = False, diff: Optional[str] = None,
+                      include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                      use_index: bool = False, index_path: Optional[str] = None, data_dump: str = NEVER,
+                      large_file_size: Optional[int] = None):
     """
     Process all SQL files in a directory recursively.
     
@@ -33,6 +56,20 @@ def process_sql_files(directory: str, tables_to_process: Optional[List[str]] = N
         directory: Directory to search for SQL files
         tables_to_process: List of tables to process
         tables_file: Path to a file containing table names
+        jobs: Number of files to process in parallel (defaults to the number of CPUs)
+        profile_report: Path of a JSON file to write per-handler, per-table and per-file timings to
+        incremental: Skip files that are unchanged since the last incremental run with the same tables
+        manifest_path: Path of the manifest of incremental runs (defaults to a file in the directory)
+        dry_run: Process the files without writing them, or the manifest
+        diff: Print the changes of every file, as a 'unified' diff or a 'summary' line
+        include: Patterns of the files to process (defaults to '*.sql')
+        exclude: Patterns of files and directories to skip, besides .git and node_modules
+        use_index: Update the table index of the directory and open only the files it lists for the tables
+        index_path: Path of the table index (defaults to a file in the directory)
+        data_dump: Clean data dumps in place, keeping their formatting: 'never', 'auto' for files
+            that turn out to be data dumps, or 'always'
+        large_file_size: Size in bytes from which files are processed one statement at a time
+            with bounded memory (defaults to processing every file in memory)
     """
     if not os.path.exists(directory):
         print(f"Error: Directory '{directory}' does not exist.", file=sys.stderr)
@@ -60,47 +97,507 @@ def process_sql_files(directory: str, tables_to_process: Optional[List[str]] = N
         print("Error: No tables specified for processing. Please specify tables via command line arguments or a tables file.", file=sys.stderr)
         return
     
-    # Find SQL files
-    finder = SQLFileFinder(directory)
-    sql_files = finder.find_sql_files()
+    print(f"Target tables for processing: {', '.join(tables_to_process)}")
+    
+    # Find SQL files; processing starts while the rest of the tree is still being listed
+    finder = SQLFileFinder(directory, include, exclude)
+    all_files = None
+    files = finder.iter_sql_files()
+    if use_index:
+        all_files = list(files)
+        files = _select_files_with_index(directory, index_path, all_files, tables_to_process, not dry_run)
+    sql_files = []
+    
+    jobs = max(1, jobs or default_jobs())
+    profiler = Profiler() if profile_report else None
+    manifest = RunManifest(directory, manifest_path) if incremental else None
+    fingerprint = tables_fingerprint(tables_to_process) if manifest is not None else None
+    process = partial(_process_file_in_worker, tables_to_process=tables_to_process, profile=profiler is not None,
+                      fingerprint=fingerprint, dry_run=dry_run, diff=diff, data_dump=data_dump,
+                      large_file_size=large_file_size)
+    
+    def discovered_files() -> Iterator[Tuple[str, Optional[ManifestEntry]]]:
+        for file_path in files:
+            sql_files.append(file_path)
+            yield file_path, manifest.get(file_path) if manifest is not None else None
+    
+    # Results come back in file order, so the log is the same for any number of jobs
+    completed = False
+    try:
+        results = _map_in_order(process, discovered_files(), jobs)
+        _log_results(((sql_files[i], result) for i, result in enumerate(results)), profiler, manifest)
+        completed = True
+    finally:
+        # Keep what was learned even when the run is interrupted
+        if manifest is not None and not dry_run:
+            # Files that were not reached are only known to be gone after a complete walk
+            if completed:
+                manifest.retain(all_files if all_files is not None else sql_files)
+            manifest.save()
     
+    if all_files is not None:
+        sql_files = all_files
     if not sql_files:
         print(f"No SQL files found in directory: {directory}")
         return
     
-    print(f"Found {len(sql_files)} SQL files to process.")
-    print(f"Target tables for processing: {', '.join(tables_to_process)}")
+    print(f"Found {len(sql_files)} SQL files.")
+    
+    if profiler is not None:
+        profiler.write_report(profile_report)
+        print(f"Profile report written to: {profile_report}")
+
+
+def build_index(directory: str, index_path: Optional[str] = None, include: Optional[List[str]] = None,
+                exclude: Optional[List[str]] = None):
+    """
+    Create or update the table index of a directory without processing any file.
     
-    # Create SQL processor
-    processor = SQLProcessor()
+    Args:
+        directory: Directory to search for SQL files
+        index_path: Path of the table index (defaults to a file in the directory)
+        include: Patterns of the files to index (defaults to '*.sql')
+        exclude: Patterns of files and directories to skip, besides .git and node_modules
+    """
+    if not os.path.exists(directory):
+        print(f"Error: Directory '{directory}' does not exist.", file=sys.stderr)
+        return
     
-    # Process each file
-    for file_path in sql_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Check if any of the specified tables exist in this file
-            tables_in_file = processor.extract_table_names(content)
-            common_tables = set(t.lower() for t in tables_to_process).intersection(
-                set(t.lower() for t in tables_in_file))
+    with TableIndex(directory, index_path) as index:
+        sql_files = SQLFileFinder(directory, include, exclude).find_sql_files()
+        scanned = index.update(sql_files)
+        index.save()
+    
+    print(f"Indexed {len(sql_files)} SQL files ({scanned} scanned): {index.path}")
+
+
+def _select_files_with_index(directory: str, index_path: Optional[str], sql_files: List[pathlib.Path],
+                             tables_to_process: List[str], save: bool = True) -> List[pathlib.Path]:
+    """
+    Bring the table index up to date and keep the files it lists for the tables.
+    
+    Args:
+        directory: Directory of the files
+        index_path: Path of the table index (defaults to a file in the directory)
+        sql_files: All SQL files found in the directory
+        tables_to_process: List of tables to process
+        save: Write the updated index to disk; without saving, the index is not written at all
+        
+    Returns:
+        The files that may reference the tables, in their original order
+    """
+    with TableIndex(directory, index_path, read_only=not save) as index:
+        scanned = index.update(sql_files)
+        affected = index.files_for_tables(tables_to_process)
+        if save:
+            index.save()
+    
+    if affected is None:
+        print("Table index cannot be used for these table names; checking every file.")
+        return sql_files
+    
+    affected = set(os.path.normpath(file_path) for file_path in affected)
+    selected = [file_path for file_path in sql_files if os.path.normpath(file_path) in affected]
+    print(f"Table index ({scanned} files scanned): {len(selected)} of {len(sql_files)} files reference the tables.")
+    return selected
+
+
+class FileResult(NamedTuple):
+    """Outcome of processing a single file."""
+    is_error: bool
+    message: str
+    profile: Optional[Profiler] = None
+    manifest_entry: Optional[ManifestEntry] = None
+    changes: Optional[str] = None
+
+
+def _log_results(results: Iterable[Tuple[str, FileResult]], profiler: Optional[Profiler] = None,
+                 manifest: Optional[RunManifest] = None):
+    """
+    Print the messages of processed files as they become available.
+    
+    Args:
+        results: Paths of the processed files with their results
+        profiler: Profiler to merge the profiles of the files into, if profiling
+        manifest: Manifest to record the files in, for incremental runs
+    """
+    for file_path, result in results:
+        print(result.message, file=sys.stderr if result.is_error else sys.stdout)
+        if result.changes is not None:
+            sys.stdout.write(result.changes)
+        if profiler is not None and result.profile is not None:
+            profiler.merge(result.profile)
+        if manifest is not None:
+            manifest.update(file_path, result.manifest_entry)
+
+
+def _map_in_order(process: Callable[..., FileResult], arguments: Iterable[Tuple], jobs: int) -> Iterator[FileResult]:
+    """
+    Process files as their arguments arrive, in parallel when jobs is more than one.
+    
+    Files are handed to the workers in small batches, and only a bounded number of batches is
+    in flight, so processing starts before all arguments are known and memory stays flat.
+    
+    Args:
+        process: Picklable function that processes one file
+        arguments: Arguments of process for every file
+        jobs: Number of worker processes
+        
+    Yields:
+        Results in the order of arguments
+    """
+    if jobs == 1:
+        for args in arguments:
+            yield process(*args)
+        return
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending: Deque[Future] = deque()
+        arguments = iter(arguments)
+        while True:
+            batch = list(islice(arguments, _BATCH_SIZE))
+            if batch:
+                pending.append(executor.submit(_process_batch, process, batch))
+            if pending and (not batch or len(pending) >= jobs * 4):
+                yield from pending.popleft().result()
+            elif not batch:
+                return
+
+
+# Files per task sent to a worker; large enough to amortize the cost of a task,
+# small enough that a few huge files do not end up behind each other
+_BATCH_SIZE = 8
+
+
+def _process_batch(process: Callable[..., FileResult], batch: List[Tuple]) -> List[FileResult]:
+    return [process(*args) for args in batch]
+
+
+def default_jobs() -> int:
+    """
+    Get the default number of parallel jobs.
+    
+    Returns:
+        Number of CPUs available to this process
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def process_file(file_path: str, tables_to_process: List[str], processor: SQLProcessor,
+                 fingerprint: Optional[str] = None, manifest_entry: Optional[ManifestEntry] = None,
+                 dry_run: bool = False, diff: Optional[str] = None,
+                 large_file_size: Optional[int] = None) -> FileResult:
+    """
+    Process a single SQL file in place.
+    
+    The file is only written when processing changes its content. When the processor has a
+    profiler, the file is recorded with it. When a table fingerprint is given, a file that is
+    unchanged since its manifest entry was made is skipped, and the result carries the new
+    entry for the file. A file of at least large_file_size bytes is processed with
+    process_large_file, so that its content is never held in memory.
+    
+    Args:
+        file_path: Path to the SQL file
+        tables_to_process: List of tables to process
+        processor: SQL processor to use
+        fingerprint: Fingerprint of the tables, for incremental runs
+        manifest_entry: Entry of the file from the last incremental run
+        dry_run: Process the file without writing it
+        diff: Describe the changes of the file, as a 'unified' diff or a 'summary' line
+        large_file_size: Size in bytes from which the file is processed with bounded memory
+        
+    Returns:
+        Result with the message to log
+    """
+    profiler = processor.profiler
+    if profiler is not None:
+        profiler.begin_file()
+    start = time.perf_counter()
+    common_tables = set()
+    entry = None
+    changes = None
+    
+    try:
+        stat = os.stat(file_path)
+        size_in = size_out = stat.st_size
+        with open(file_path, 'rb') as f, _map_file(f, stat.st_size) as data:
+            # A file whose size and modification time match its entry is not even hashed
+            if fingerprint is not None and is_unchanged(manifest_entry, fingerprint, stat.st_size,
+                                                        stat.st_mtime_ns, data):
+                outcome = 'unchanged'
+            # Most files reference none of the tables; rule them out before decoding
+            elif not processor.data_may_contain_tables(data, tables_to_process):
+                outcome = 'skipped'
+            elif large_file_size is not None and stat.st_size >= large_file_size:
+                # Processed once the file is closed, so that it can be replaced
+                outcome = 'large'
+            else:
+                content = _decode(data)
+                size_in = size_out = len(content)
+                # Check if any of the specified tables exist in this file
+                common_tables = processor.find_target_tables(content, tables_to_process)
                 
-            # Only process files that contain at least one of the specified tables
-            if not common_tables:
-                print(f"No target tables found in file: {file_path}")
-                continue
-            
-            # Process the content
-            processed_content = processor.process_sql_content(content, tables_to_process)
+                # Only process files that contain at least one of the specified tables
+                if not common_tables:
+                    outcome = 'skipped'
+                else:
+                    processed_content = processor.process_sql_content(content, tables_to_process)
+                    size_out = len(processed_content)
+                    outcome = 'processed' if processed_content != content else 'unmodified'
             
-            # Write the processed content back to the file
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(processed_content)
+            if fingerprint is not None and outcome in ('skipped', 'unmodified'):
+                entry = make_entry(file_path, data, fingerprint, outcome)
+        
+        streamed = outcome == 'large'
+        if streamed:
+            outcome, common_tables, size_in, size_out = process_large_file(file_path, tables_to_process, processor,
+                                                                           dry_run)
+            if fingerprint is not None and (outcome != 'processed' or not dry_run):
+                with open(file_path, 'rb') as f, _map_file(f, os.fstat(f.fileno()).st_size) as data:
+                    entry = make_entry(file_path, data, fingerprint, outcome)
+            if outcome == 'processed' and diff is not None:
+                # A diff would need both contents in memory
+                changes = f"{file_path}: processed as a large file, changes not compared\n"
+        
+        if outcome == 'unchanged':
+            result = FileResult(False, f"Unchanged since last run: {file_path}")
+            entry = manifest_entry._replace(mtime_ns=stat.st_mtime_ns)
+        elif outcome == 'skipped':
+            result = FileResult(False, f"No target tables found in file: {file_path}")
+        elif outcome == 'unmodified':
+            # Writing the same content would only touch the modification time
+            result = FileResult(False, f"No changes needed in file: {file_path}")
+        else:
+            if diff is not None and not streamed:
+                changes = describe_changes(file_path, content, processed_content, diff)
             
-            print(f"Processed file: {file_path}")
+            if dry_run:
+                result = FileResult(False, f"Would process file: {file_path}")
+            else:
+                # A large file has replaced the original already
+                if not streamed:
+                    # Write the processed content back to the file
+                    with open(file_path, 'w', encoding='utf-8') as f:
+                        f.write(processed_content)
+                
+                result = FileResult(False, f"Processed file: {file_path}")
+                if fingerprint is not None and not streamed:
+                    entry = make_entry(file_path, processed_content.encode('utf-8'), fingerprint, outcome)
+    
+    except Exception as e:
+        outcome, result = 'error', FileResult(True, f"Error processing file {file_path}: {str(e)}")
+    
+    if profiler is not None:
+        profiler.end_file(str(file_path), time.perf_counter() - start, size_in, size_out, common_tables, outcome)
+    return result._replace(manifest_entry=entry, changes=changes)
+
+
+def process_large_file(file_path: str, tables_to_process: List[str], processor: SQLProcessor,
+                       dry_run: bool = False) -> Tuple[str, Set[str], int, int]:
+    """
+    Process a SQL file one statement at a time, with memory use that does not depend on its size.
+    
+    The file is read in chunks and processed with SQLProcessor.process_stream, which holds only
+    the statement being read. The result is written to a temporary file in the same directory,
+    which replaces the file in one step when the content changed, so the file is never left half
+    written. Input and output are hashed as they pass, to tell whether anything changed. The
+    referenced tables are only found when the processor has a profiler to report them to;
+    without one, a file that does not change is 'unmodified' rather than 'skipped'.
+    
+    Args:
+        file_path: Path to the SQL file
+        tables_to_process: List of tables to process
+        processor: SQL processor to use
+        dry_run: Process the file without writing anything
         
-        except Exception as e:
-            print(f"Error processing file {file_path}: {str(e)}", file=sys.stderr)
+    Returns:
+        The outcome ('processed', 'unmodified' or 'skipped'), the referenced tables (empty
+        without a profiler) and the sizes of the content before and after processing
+    """
+    common_tables: Set[str] = set()
+    # Only the profile reports the tables; finding them would be another pass over every chunk
+    find_tables = processor.profiler is not None
+    hash_in = hashlib.sha256()
+    hash_out = hashlib.sha256()
+    size_in = size_out = 0
+    
+    def chunks(f) -> Iterator[str]:
+        nonlocal size_in
+        for chunk in iter(lambda: f.read(_LARGE_FILE_CHUNK_SIZE), ''):
+            size_in += len(chunk)
+            hash_in.update(chunk.encode('utf-8'))
+            if find_tables:
+                # A name split between two chunks may be missed
+                common_tables.update(processor.find_target_tables(chunk, tables_to_process))
+            yield chunk
+    
+    target = None
+    try:
+        with open(file_path, 'r', encoding='utf-8') as source:
+            if not dry_run:
+                # The temporary file goes next to the file a link points to, which it replaces
+                directory, name = os.path.split(os.path.realpath(file_path))
+                target = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, prefix=f'.{name}.',
+                                                     suffix='.tmp', delete=False)
+            for piece in processor.process_stream(chunks(source), tables_to_process):
+                size_out += len(piece)
+                hash_out.update(piece.encode('utf-8'))
+                if target is not None:
+                    target.write(piece)
+        
+        changed = size_in != size_out or hash_in.digest() != hash_out.digest()
+        if target is not None:
+            target.close()
+            if changed:
+                _replace_file(target.name, os.path.join(directory, name))
+                target = None
+    finally:
+        if target is not None:
+            target.close()
+            os.remove(target.name)
+    
+    if changed:
+        return 'processed', common_tables, size_in, size_out
+    if find_tables and not common_tables:
+        return 'skipped', common_tables, size_in, size_out
+    return 'unmodified', common_tables, size_in, size_out
+
+
+def _replace_file(source: str, path: str) -> None:
+    """
+    Replace a file with another file in the same directory, keeping its mode, owner and links.
+    
+    A file with other hard links keeps its inode, so that the other names see the new content;
+    its content is then written in place, without the guarantee of a single replace.
+    
+    Args:
+        source: Path to the new content, which is removed
+        path: Path to the file to replace, not a symbolic link
+    """
+    stat = os.stat(path)
+    if stat.st_nlink > 1:
+        with open(source, 'rb') as new, open(path, 'r+b') as old:
+            shutil.copyfileobj(new, old)
+            old.truncate()
+        os.remove(source)
+        return
+    
+    shutil.copymode(path, source)
+    if hasattr(os, 'chown'):
+        try:
+            os.chown(source, stat.st_uid, stat.st_gid)
+        except PermissionError:
+            # Only root can give a file away; the group is kept if the user is in it
+            try:
+                os.chown(source, -1, stat.st_gid)
+            except PermissionError:
+                pass
+    os.replace(source, path)
+
+
+# Characters read at a time by process_large_file
+_LARGE_FILE_CHUNK_SIZE = 1 << 20
+
+
+def describe_changes(file_path: str, content: str, processed_content: str, mode: str = 'unified') -> str:
+    """
+    Describe how processing changes a file.
+    
+    Args:
+        file_path: Path of the file, used in the header of the diff
+        content: Content of the file
+        processed_content: Content after processing
+        mode: 'unified' for a unified diff, 'summary' for a line with the added and removed line counts
+        
+    Returns:
+        The diff or the summary line
+    """
+    lines = difflib.unified_diff(content.splitlines(keepends=True), processed_content.splitlines(keepends=True),
+                                 fromfile=str(file_path), tofile=str(file_path))
+    
+    if mode == 'unified':
+        # A missing newline at the end of the file would join two lines of the diff
+        return ''.join(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n' for line in lines)
+    
+    added = removed = 0
+    for line in lines:
+        if line.startswith('+') and not line.startswith('+++'):
+            added += 1
+        elif line.startswith('-') and not line.startswith('---'):
+            removed += 1
+    return f"{file_path}: {added} lines added, {removed} lines removed\n"
+
+
+@contextmanager
+def _map_file(f: BinaryIO, size: int) -> Iterator[Union[bytes, mmap.mmap]]:
+    """
+    Map a file into memory for reading, so that checking it does not copy its content.
+    
+    Args:
+        f: File opened in binary mode
+        size: Size of the file
+        
+    Yields:
+        The mapped content; empty files, which cannot be mapped, as empty bytes
+    """
+    if size == 0:
+        yield b''
+        return
+    
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        yield data
+
+
+def _decode(data: Union[bytes, mmap.mmap]) -> str:
+    """
+    Decode file content the way reading the file in text mode does.
+    
+    Args:
+        data: Raw UTF-8 content
+        
+    Returns:
+        Decoded content with universal newlines
+    """
+    return str(data, 'utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _process_file_in_worker(file_path: str, manifest_entry: Optional[ManifestEntry], tables_to_process: List[str],
+                            profile: bool = False, fingerprint: Optional[str] = None, dry_run: bool = False,
+                            diff: Optional[str] = None, data_dump: str = NEVER,
+                            large_file_size: Optional[int] = None) -> FileResult:
+    """
+    Process a single SQL file with the processor of the current process.
+    
+    Args:
+        file_path: Path to the SQL file
+        manifest_entry: Entry of the file from the last incremental run
+        tables_to_process: List of tables to process
+        profile: Whether to return a profile of the file with the result
+        fingerprint: Fingerprint of the tables, for incremental runs
+        dry_run: Process the file without writing it
+        diff: Describe the changes of the file, as a 'unified' diff or a 'summary' line
+        data_dump: When to clean the file in place as a data dump ('never', 'auto' or 'always')
+        large_file_size: Size in bytes from which the file is processed with bounded memory
+        
+    Returns:
+        Result with the message to log
+    """
+    if not profile:
+        return process_file(file_path, tables_to_process, worker_processor(data_dump), fingerprint, manifest_entry,
+                            dry_run, diff, large_file_size)
+    
+    # The shared processor is never given a profiler; profiling one file takes a processor of its own
+    profiler = Profiler()
+    processor = SQLProcessor(profiler, data_dump)
+    result = process_file(file_path, tables_to_process, processor, fingerprint, manifest_entry, dry_run, diff,
+                          large_file_size)
+    return result._replace(profile=profiler)
+
+
+# Size from which --large-files without a size processes files with bounded memory
+_DEFAULT_LARGE_FILE_MB = 64
 
 
 def main():
@@ -109,10 +606,51 @@ def main():
     parser.add_argument('directory', help='Directory to search for SQL files recursively')
     parser.add_argument('tables', nargs='*', help='Tables to process (if not provided, all tables found will be processed)')
     parser.add_argument('--tables-file', help='Path to a file containing table names to process')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of files to process in parallel (default: number of CPUs)')
+    parser.add_argument('--profile-report', metavar='PATH',
+                        help='Write handler, table and file timings of the run to this JSON file')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Skip files that are unchanged since the last incremental run with the same tables')
+    parser.add_argument('--manifest', metavar='PATH',
+                        help=f'Manifest of incremental runs (default: {MANIFEST_FILE_NAME} in the directory)')
+    parser.add_argument('-n', '--dry-run', action='store_true', help='Show what would be processed without writing any file')
+    parser.add_argument('--diff', nargs='?', const='unified', choices=['unified', 'summary'],
+                        help='Print a unified diff (default) or a summary line of the changes of every file')
+    parser.add_argument('--include', action='append', metavar='PATTERN',
+                        help="Process files matching this .gitignore-style pattern instead of '*.sql' (repeatable)")
+    parser.add_argument('--exclude', action='append', metavar='PATTERN',
+                        help='Skip files and directories matching this .gitignore-style pattern (repeatable); '
+                             '.git and node_modules are always skipped')
+    parser.add_argument('--index', action='store_true',
+                        help='Keep a table index of the directory and only open the files it lists for the tables')
+    parser.add_argument('--index-file', metavar='PATH',
+                        help=f'Table index to use (default: {INDEX_FILE_NAME} in the directory); implies --index')
+    parser.add_argument('--index-only', action='store_true',
+                        help='Create or update the table index and exit without processing any file')
+    parser.add_argument('--data-dump', nargs='?', const=AUTO, default=NEVER, choices=DATA_DUMP_MODES,
+                        help="Clean data dumps in place, copying all unaffected bytes: 'auto' (without a mode) "
+                             "for files that turn out to be data dumps, 'always' for every file")
+    parser.add_argument('--large-files', nargs='?', type=float, const=_DEFAULT_LARGE_FILE_MB, metavar='MB',
+                        help='Process files of at least this many MB (default: %(const)s) one statement at a time '
+                             'with bounded memory, replacing them through a temporary file; --data-dump and '
+                             '--diff do not apply to them')
     
     args = parser.parse_args()
     
-    process_sql_files(args.directory, args.tables, args.tables_file)
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.large_files is not None and args.large_files < 0:
+        parser.error('--large-files must not be negative')
+    
+    if args.index_only:
+        build_index(args.directory, args.index_file, args.include, args.exclude)
+        return
+    
+    process_sql_files(args.directory, args.tables, args.tables_file, args.jobs, args.profile_report,
+                      args.incremental or args.manifest is not None, args.manifest, args.dry_run, args.diff,
+                      args.include, args.exclude, args.index or args.index_file is not None, args.index_file,
+                      args.data_dump, int(args.large_files * 1024 * 1024) if args.large_files is not None else None)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,96 @@
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import Executor
+from typing import AsyncIterator, Deque, Iterable, List, NamedTuple, Optional, Union
+
+from sql_cleaner.processor.sql_processor import worker_processor
+
+
+class ProcessedFile(NamedTuple):
+    """Outcome of processing one file with process_files_async."""
+    path: Union[str, os.PathLike]
+    content: Optional[str]
+    processed_content: Optional[str]
+    error: Optional[Exception] = None
+
+    @property
+    def changed(self) -> bool:
+        return self.error is None and self.processed_content != self.content
+
+
+def _process_content(content: str, tables_to_process: List[str]) -> str:
+    """
+    Process SQL content with the processor of the current process.
+
+    Args:
+        content: SQL content to process
+        tables_to_process: List of tables to process
+
+    Returns:
+        Processed SQL content
+    """
+    return worker_processor().process_sql_content(content, tables_to_process)
+
+
+def _read_file(path: Union[str, os.PathLike]) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _write_file(path: Union[str, os.PathLike], content: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+async def process_files_async(paths: Iterable[Union[str, os.PathLike]], tables_to_process: List[str],
+                              executor: Optional[Executor] = None, concurrency: Optional[int] = None,
+                              write: bool = False) -> AsyncIterator[ProcessedFile]:
+    """
+    Process SQL files without blocking the event loop, yielding the results in input order.
+
+    Files are read and written in the loop's default executor, and the handler chain runs in
+    the given executor, e.g. a ProcessPoolExecutor to use several CPUs. At most concurrency
+    files are in flight at once, which also bounds the memory held by finished files that
+    wait for an earlier one. An error in one file is returned with its result and does not
+    stop the others.
+
+    Args:
+        paths: Paths of the SQL files
+        tables_to_process: List of tables to process
+        executor: Executor to run the handlers in (defaults to the loop's default executor)
+        concurrency: Maximum number of files in flight (defaults to the number of CPUs)
+        write: Write processed content back to files whose content changed
+
+    Yields:
+        One result per path, in the order of paths
+    """
+    loop = asyncio.get_running_loop()
+    concurrency = max(1, concurrency or os.cpu_count() or 1)
+    # A plain list pickles cheaply when the executor is a process pool
+    tables = list(tables_to_process)
+
+    async def process(path: Union[str, os.PathLike]) -> ProcessedFile:
+        content = None
+        try:
+            content = await loop.run_in_executor(None, _read_file, path)
+            processed_content = await loop.run_in_executor(executor, _process_content, content, tables)
+            if write and processed_content != content:
+                await loop.run_in_executor(None, _write_file, path, processed_content)
+            return ProcessedFile(path, content, processed_content)
+        except Exception as e:
+            return ProcessedFile(path, content, None, e)
+
+    pending: Deque[asyncio.Future] = deque()
+    try:
+        for path in paths:
+            pending.append(asyncio.ensure_future(process(path)))
+            if len(pending) >= concurrency:
+                yield await pending.popleft()
+
+        while pending:
+            yield await pending.popleft()
+    finally:
+        # The consumer stopped early or was cancelled; do not leave work behind
+        for future in pending:
+            future.cancel()
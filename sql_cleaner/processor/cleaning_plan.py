@@ -0,0 +1,95 @@
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from sql_cleaner.processor.table_prefilter import TablePrefilter
+from sql_cleaner.processor.utils import get_table_id_column
+
+
+class TablePlan:
+    """
+    Names derived from one table (or table alias).
+    """
+
+    def __init__(self, name: str):
+        """
+        Derive the names the handlers look for.
+
+        Args:
+            name: Name of the table
+        """
+        self.name = name
+        self.lower = name.lower()
+        self.id_column = get_table_id_column(name)
+        self.id_column_lower = self.id_column.lower()
+
+    def __repr__(self) -> str:
+        return f"TablePlan({self.name!r})"
+
+
+class CleaningPlan:
+    """
+    Everything the handlers need to know about the tables to process, compiled once per run.
+
+    A plan iterates over the table names like the list it was built from, so it can be passed
+    anywhere a list of tables is expected. Handlers and the processor turn a plain list into a
+    plan with CleaningPlan.of, which keeps recently used plans, so the patterns for a table
+    list are compiled once no matter how many files and statements are processed.
+    """
+
+    def __init__(self, tables: Iterable[str]):
+        """
+        Build the plan for the given tables.
+
+        Args:
+            tables: Names of the tables to process
+        """
+        self.tables: List[str] = [table for table in tables if table]
+        self.table_set = frozenset(table.lower() for table in self.tables)
+        self.id_columns = frozenset(get_table_id_column(table).lower() for table in self.tables)
+        self.prefilter = TablePrefilter(self.tables)
+
+        self._table_plans: Dict[str, TablePlan] = {}
+
+    @classmethod
+    def of(cls, tables: Union['CleaningPlan', Iterable[str]]) -> 'CleaningPlan':
+        """
+        Get the plan for a list of tables.
+
+        Args:
+            tables: A plan, which is returned as is, or a list of table names
+
+        Returns:
+            Plan for the tables, shared with earlier calls for the same list
+        """
+        if isinstance(tables, CleaningPlan):
+            return tables
+        return _cached_plan(tuple(tables or ()))
+
+    def table(self, name: str) -> TablePlan:
+        """
+        Get the names derived from a table or alias, deriving them on first use.
+
+        Args:
+            name: Name of the table or alias
+
+        Returns:
+            Names for the table
+        """
+        table_plan = self._table_plans.get(name)
+        if table_plan is None:
+            table_plan = self._table_plans[name] = TablePlan(name)
+        return table_plan
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tables)
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def __repr__(self) -> str:
+        return f"CleaningPlan({self.tables!r})"
+
+
+@lru_cache(maxsize=16)
+def _cached_plan(tables: Tuple[str, ...]) -> CleaningPlan:
+    return CleaningPlan(tables)
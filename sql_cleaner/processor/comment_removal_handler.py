@@ -1,5 +1,6 @@
-import re
+from sql_cleaner.processor.comment_stripper import CommentStripper
 from sql_cleaner.processor.handler import SQLHandler
+from sql_cleaner.processor.statement import Statement
 from typing import List
 
 
@@ -20,62 +21,43 @@ class CommentRemovalHandler(SQLHandler):
         Returns:
             SQL content with comments removed
         """
-        # Process the SQL content to handle nested comments and string literals
-        result = ""
-        i = 0
-        in_string = False
-        in_comment = False
-        comment_depth = 0  # Track nesting level of comments
+        return self.remove_comments(content)
+    
+    def process_statements(self, statements: List[Statement], tables_to_process: List[str]) -> List[Statement]:
+        """
+        Remove comments from each statement, dropping statements that only contained comments.
+        
+        The statements are normalized rather than rewritten: one that no other handler changes
+        is written back with its comments and formatting.
         
-        while i < len(content):
-            # Handle string literals
-            if content[i:i+1] == "'" and comment_depth == 0 and not in_comment:
-                in_string = not in_string
-                result += content[i]
-                i += 1
-                continue
-                
-            # Skip everything inside string literals
-            if in_string:
-                result += content[i]
-                i += 1
-                continue
-                
-            # Handle single-line comments
-            if content[i:i+2] == "--" and comment_depth == 0:
-                in_comment = True
-                i += 2
-                continue
-                
-            # End single-line comment at newline
-            if in_comment and content[i:i+1] in ["\n", "\r"]:
-                in_comment = False
-                result += " "  # Add a space to replace the comment
-                
-            # Handle multi-line comments - opening
-            if content[i:i+2] == "/*" and not in_comment:
-                comment_depth += 1
-                i += 2
-                continue
-                
-            # Handle multi-line comments - closing
-            if content[i:i+2] == "*/" and comment_depth > 0:
-                comment_depth -= 1
-                i += 2
-                if comment_depth == 0:
-                    result += " "  # Add a space to replace the comment
-                continue
-                
-            # Skip over commented content
-            if in_comment or comment_depth > 0:
-                i += 1
-                continue
-                
-            # Normal character
-            result += content[i]
-            i += 1
+        Args:
+            statements: Parsed SQL statements to process
+            tables_to_process: List of tables to process
             
-        # Replace multiple spaces with a single space
-        result = re.sub(r'\s+', ' ', result)
+        Returns:
+            Statements with comments removed
+        """
+        processed_statements = []
+        
+        for statement in statements:
+            text = self.remove_comments(statement.text)
+            if text:
+                statement.normalize(text)
+                processed_statements.append(statement)
+        
+        return processed_statements
+    
+    def remove_comments(self, content: str) -> str:
+        """
+        Remove both single-line (--) and multi-line (/* */) SQL comments and collapse whitespace.
+        
+        The work is linear in the size of the content; see CommentStripper for chunked input.
+        A stripper is created per call, so one handler can be used from several threads.
         
-        return result.strip() 
\ No newline at end of file
+        Args:
+            content: SQL content to process
+            
+        Returns:
+            SQL content with comments removed
+        """
+        return CommentStripper().strip(content) 
\ No newline at end of file
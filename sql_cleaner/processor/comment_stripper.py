@@ -0,0 +1,191 @@
+import re
+from typing import Iterable, Iterator
+
+
+# Scanner states
+_CODE = 0
+_STRING = 1
+_LINE_COMMENT = 2
+_BLOCK_COMMENT = 3
+
+# A '-' or '/' (or '*' inside a block comment) at the very end of a chunk may be the first
+# half of a two-character delimiter, so it is kept back until the next chunk arrives
+_CODE_PATTERN = re.compile(r"'|--|/\*|[-/]\Z")
+_BLOCK_PATTERN = re.compile(r"/\*|\*/|[/*]\Z")
+_LINE_END_PATTERN = re.compile(r"[\n\r]")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+class CommentStripper:
+    """
+    Removes single-line (--) and nested multi-line (/* */) comments from SQL text in chunks.
+
+    Text is fed in chunks of any size and the state (inside a string, a single-line comment
+    or a block comment, and the nesting depth) is carried across chunk boundaries. Every
+    character is looked at a constant number of times, so the total work is linear in the
+    size of the input. Each comment is replaced by a space, whitespace is collapsed to single
+    spaces and the output is stripped, exactly as if the whole text had been processed at once.
+    """
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        """Return to the initial state, at the start of a new text."""
+        self._state = _CODE
+        self._depth = 0
+        self._carry = ''
+        self._started = False
+        self._pending_space = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Process the next chunk of text.
+
+        Args:
+            chunk: SQL text
+
+        Returns:
+            Text without comments that is ready to be written
+        """
+        return self._collapse(self._scan(self._carry + chunk, final=False))
+
+    def flush(self) -> str:
+        """
+        Process whatever was kept back and reset the stripper for the next text.
+
+        Returns:
+            The remaining text without comments
+        """
+        text = self._collapse(self._scan(self._carry, final=True))
+        self._reset()
+        return text
+
+    def strip(self, content: str) -> str:
+        """
+        Remove comments from a complete text.
+
+        Args:
+            content: SQL text
+
+        Returns:
+            Text without comments and with collapsed whitespace
+        """
+        return self.feed(content) + self.flush()
+
+    def strip_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Remove comments from a stream of text chunks.
+
+        Args:
+            chunks: Iterable of SQL text chunks
+
+        Returns:
+            Iterator over chunks of text without comments
+        """
+        for chunk in chunks:
+            text = self.feed(chunk)
+            if text:
+                yield text
+        text = self.flush()
+        if text:
+            yield text
+
+    def _scan(self, text: str, final: bool) -> str:
+        """
+        Remove comments from text, starting in the current state.
+
+        Args:
+            text: Text to scan
+            final: Whether this is the end of the input, so nothing can be kept back
+
+        Returns:
+            Text with comments replaced by spaces, before whitespace is collapsed
+        """
+        output = []
+        pos = 0
+        length = len(text)
+        self._carry = ''
+
+        while pos < length:
+            if self._state == _CODE:
+                match = _CODE_PATTERN.search(text, pos)
+                if match is None or (final and len(match.group()) == 1 and match.group() != "'"):
+                    output.append(text[pos:])
+                    break
+                output.append(text[pos:match.start()])
+                token = match.group()
+                if token == "'":
+                    output.append(token)
+                    self._state = _STRING
+                elif token == '--':
+                    self._state = _LINE_COMMENT
+                elif token == '/*':
+                    self._state = _BLOCK_COMMENT
+                    self._depth = 1
+                else:
+                    self._carry = token
+                pos = match.end()
+
+            elif self._state == _STRING:
+                end = text.find("'", pos)
+                if end == -1:
+                    output.append(text[pos:])
+                    break
+                output.append(text[pos:end + 1])
+                self._state = _CODE
+                pos = end + 1
+
+            elif self._state == _LINE_COMMENT:
+                match = _LINE_END_PATTERN.search(text, pos)
+                if match is None:
+                    break
+                # The line break itself is kept
+                output.append(' ')
+                self._state = _CODE
+                pos = match.start()
+
+            else:
+                match = _BLOCK_PATTERN.search(text, pos)
+                if match is None or (final and len(match.group()) == 1):
+                    break
+                token = match.group()
+                if token == '/*':
+                    self._depth += 1
+                elif token == '*/':
+                    self._depth -= 1
+                    if self._depth == 0:
+                        output.append(' ')
+                        self._state = _CODE
+                else:
+                    self._carry = token
+                pos = match.end()
+
+        return ''.join(output)
+
+    def _collapse(self, text: str) -> str:
+        """
+        Collapse whitespace to single spaces, continuing from the previous output.
+
+        Whitespace at the end of the text is held back, so it is only written when more text
+        follows and the output ends up stripped.
+
+        Args:
+            text: Text to collapse
+
+        Returns:
+            Collapsed text
+        """
+        if not text:
+            return ''
+
+        text = _WHITESPACE_PATTERN.sub(' ', text)
+        core = text.strip(' ')
+        if not core:
+            self._pending_space = True
+            return ''
+
+        separator = ' ' if self._started and (self._pending_space or text[0] == ' ') else ''
+        self._started = True
+        self._pending_space = text[-1] == ' '
+        return separator + core
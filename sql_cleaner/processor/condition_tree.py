@@ -0,0 +1,329 @@
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Tuple
+
+from sql_cleaner.processor.lexer import LPAREN, RPAREN, SEMICOLON, WORD, Token, iter_significant_tokens
+
+
+# Keywords that end a WHERE clause at the nesting level of its WHERE
+_CLAUSE_END_KEYWORDS = frozenset([
+    "ORDER", "GROUP", "HAVING", "LIMIT", "OFFSET", "FETCH", "WINDOW", "UNION", "EXCEPT", "INTERSECT",
+    "RETURNING", "FOR",
+])
+
+# Comparisons that make a bare 'table_id' a reference in a WHERE condition
+_COMPARISON = r'\s*(?:=|!=|<>|>|<|>=|<=|IS\s+NULL|IS\s+NOT\s+NULL|IN|LIKE|NOT|BETWEEN)'
+
+# A qualifier, e.g. 't' of 't.column'
+_QUALIFIER_PATTERN = re.compile(r'(?<!\w)(\w+)\.')
+
+_STRING_PATTERN = re.compile(r"'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'")
+
+
+class Condition(NamedTuple):
+    """
+    A node of a boolean expression, located by indexes into the text it was parsed from.
+
+    kind is one of 'leaf' (a predicate such as 'a = 1' or 'x BETWEEN 1 AND 2'), 'group'
+    (a parenthesized expression), 'not', 'and' or 'or'. Groups and NOT have a single child.
+    """
+    kind: str
+    start: int
+    end: int
+    children: Tuple['Condition', ...] = ()
+
+
+class WhereClause(NamedTuple):
+    """A WHERE clause of a statement: the WHERE keyword and the span of its condition."""
+    start: int
+    condition_start: int
+    condition_end: int
+
+
+def _is_keyword(token: Token, keyword: str) -> bool:
+    return token.type == WORD and len(token.value) == len(keyword) and token.value.upper() == keyword
+
+
+def find_where_clauses(text: str, tokens: Optional[List[Token]] = None) -> List[WhereClause]:
+    """
+    Find the WHERE clauses of a statement, including those of subqueries.
+
+    A condition ends before a clause keyword such as ORDER BY or GROUP BY, a semicolon or a
+    closing parenthesis at the nesting level of its WHERE. Clauses inside the condition of
+    another clause are not returned, as they are part of that condition.
+
+    Args:
+        text: SQL statement
+        tokens: Significant tokens of the statement, when they are at hand
+
+    Returns:
+        Clauses in order of appearance, with non-empty conditions
+    """
+    clauses = []
+    # Open clauses as (WHERE token, condition start, last token end, depth)
+    open_clauses: List[List] = []
+    depth = 0
+
+    def close(clause):
+        where, condition_start, condition_end, _ = clause
+        if condition_start is not None:
+            clauses.append(WhereClause(where.start, condition_start, condition_end))
+
+    for token in (tokens if tokens is not None else iter_significant_tokens(text)):
+        if token.type == RPAREN:
+            while open_clauses and open_clauses[-1][3] == depth:
+                close(open_clauses.pop())
+            depth = max(depth - 1, 0)
+        elif token.type == SEMICOLON or (token.type == WORD and token.value.upper() in _CLAUSE_END_KEYWORDS):
+            while open_clauses and open_clauses[-1][3] == depth:
+                close(open_clauses.pop())
+
+        for clause in open_clauses:
+            if clause[1] is None:
+                clause[1] = token.start
+            clause[2] = token.end
+
+        if token.type == LPAREN:
+            depth += 1
+        elif _is_keyword(token, "WHERE"):
+            open_clauses.append([token, None, token.end, depth])
+
+    while open_clauses:
+        close(open_clauses.pop())
+
+    # Clauses of subqueries close before the clauses they are nested in
+    clauses.sort()
+    outermost = []
+    for clause in clauses:
+        if not outermost or clause.start >= outermost[-1].condition_end:
+            outermost.append(clause)
+    return outermost
+
+
+class _Parser:
+    """Recursive descent parser of boolean expressions over significant tokens."""
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.pos = 0
+        # Index of the matching parenthesis of every parenthesis
+        self.matching: Dict[int, int] = {}
+        stack = []
+        for i, token in enumerate(tokens):
+            if token.type == LPAREN:
+                stack.append(i)
+            elif token.type == RPAREN and stack:
+                j = stack.pop()
+                self.matching[i] = j
+                self.matching[j] = i
+
+    def _at_keyword(self, end: int, keyword: str) -> bool:
+        return self.pos < end and _is_keyword(self.tokens[self.pos], keyword)
+
+    def parse_or(self, end: int) -> Condition:
+        return self._parse_operator(end, "OR", self.parse_and)
+
+    def parse_and(self, end: int) -> Condition:
+        return self._parse_operator(end, "AND", self.parse_not)
+
+    def _parse_operator(self, end: int, operator: str, parse_operand: Callable[[int], Condition]) -> Condition:
+        children = [parse_operand(end)]
+        while self._at_keyword(end, operator) and self.pos + 1 < end:
+            self.pos += 1
+            children.append(parse_operand(end))
+        if len(children) == 1:
+            return children[0]
+        return Condition(operator.lower(), children[0].start, children[-1].end, tuple(children))
+
+    def parse_not(self, end: int) -> Condition:
+        if self._at_keyword(end, "NOT") and self.pos + 1 < end:
+            start = self.tokens[self.pos].start
+            self.pos += 1
+            child = self.parse_not(end)
+            return Condition('not', start, child.end, (child,))
+        return self.parse_primary(end)
+
+    def parse_primary(self, end: int) -> Condition:
+        tokens = self.tokens
+        first = self.pos
+
+        # A parenthesized operand is a group; '(a + b) > 1' or '(SELECT ...) = 1' are predicates
+        close = self.matching.get(first) if tokens[first].type == LPAREN else None
+        if close is not None and close < end and close > first + 1 and (
+                close + 1 == end or tokens[close + 1].type == RPAREN
+                or _is_keyword(tokens[close + 1], "AND") or _is_keyword(tokens[close + 1], "OR")):
+            self.pos = first + 1
+            child = self.parse_or(close)
+            if self.pos == close:
+                self.pos = close + 1
+                return Condition('group', tokens[first].start, tokens[close].end, (child,))
+            self.pos = first
+
+        # A predicate runs to the next AND or OR outside of parentheses and CASE expressions;
+        # the AND of a BETWEEN belongs to it
+        depth = 0
+        case_depth = 0
+        between = False
+        pos = first
+        while pos < end:
+            token = tokens[pos]
+            if token.type == LPAREN:
+                depth += 1
+            elif token.type == RPAREN:
+                if depth == 0:
+                    break
+                depth -= 1
+            elif token.type == WORD and depth == 0:
+                keyword = token.value.upper()
+                if keyword == "CASE":
+                    case_depth += 1
+                elif keyword == "END" and case_depth:
+                    case_depth -= 1
+                elif case_depth == 0 and pos > first:
+                    if keyword == "BETWEEN":
+                        between = True
+                    elif keyword == "AND" and between:
+                        between = False
+                    elif keyword in ("AND", "OR"):
+                        break
+            pos += 1
+
+        # Always consume a token, so that stray operators cannot stop the parser
+        pos = max(pos, first + 1)
+        self.pos = pos
+        return Condition('leaf', tokens[first].start, tokens[pos - 1].end)
+
+
+def parse_condition(text: str, start: int = 0, end: Optional[int] = None,
+                    tokens: Optional[List[Token]] = None) -> Optional[Condition]:
+    """
+    Parse a condition, e.g. the part of a WHERE clause after the keyword, into an expression tree.
+
+    AND binds tighter than OR and NOT applies to the operand that follows it. Parentheses
+    around an operand make a group, other parentheses (function calls, IN lists, subqueries)
+    stay inside the predicate they belong to, as do strings, comments and CASE expressions.
+
+    Args:
+        text: Text containing the condition
+        start: Start of the condition
+        end: End of the condition (defaults to the end of the text)
+        tokens: Significant tokens of the whole text, when they are at hand; the condition
+            must then start and end at token boundaries
+
+    Returns:
+        Root of the tree, or None if the condition has no tokens
+    """
+    if tokens is None:
+        tokens = list(iter_significant_tokens(text, start, end))
+    else:
+        if end is None:
+            end = len(text)
+        tokens = [token for token in tokens if start <= token.start and token.end <= end]
+    if not tokens:
+        return None
+
+    parser = _Parser(tokens)
+    try:
+        root = parser.parse_or(len(tokens))
+    except RecursionError:
+        root = None
+    if root is None or parser.pos != len(tokens):
+        # Unbalanced or absurdly deep parentheses; treat everything as a single predicate
+        return Condition('leaf', tokens[0].start, tokens[-1].end)
+    return root
+
+
+def prune_condition(text: str, node: Condition, references: Callable[[str], bool]) -> Tuple[Optional[str], bool]:
+    """
+    Remove the predicates that reference a target from an expression tree.
+
+    A predicate is removed when references() is true for its text. An AND or OR keeps its
+    remaining operands, and a group or NOT without operands left is removed as a whole.
+    Parts of the tree that keep all of their predicates are copied from the text verbatim.
+
+    Args:
+        text: Text the tree was parsed from
+        node: Root of the tree to prune
+        references: Check whether the text of a predicate references a target
+
+    Returns:
+        The text of the pruned condition, or None if nothing is left, and whether it changed
+    """
+    kind = node.kind
+    if kind == 'leaf':
+        source = text[node.start:node.end]
+        return (None, True) if references(source) else (source, False)
+
+    if kind in ('group', 'not'):
+        child, changed = prune_condition(text, node.children[0], references)
+        if not changed:
+            return text[node.start:node.end], False
+        if child is None:
+            return None, True
+        return (f"({child})" if kind == 'group' else f"NOT {child}"), True
+
+    kept = []
+    changed = False
+    for child_node in node.children:
+        child, child_changed = prune_condition(text, child_node, references)
+        changed = changed or child_changed
+        if child is not None:
+            kept.append(child)
+
+    if not changed:
+        return text[node.start:node.end], False
+    if not kept:
+        return None, True
+    return f" {kind.upper()} ".join(kept), True
+
+
+@lru_cache(maxsize=256)
+def _id_column_pattern(id_columns: Tuple[str, ...], compared: bool) -> Optional[Pattern]:
+    if not id_columns:
+        return None
+    columns = '|'.join(re.escape(column) for column in sorted(id_columns, key=len, reverse=True))
+    return re.compile(
+        rf'(?:^|\W)\w+\.(?:{columns})\b|(?:^|\W)(?:{columns})\b' + (_COMPARISON if compared else ''),
+        re.IGNORECASE
+    )
+
+
+class ReferenceCheck:
+    """
+    Checks predicates for references to a set of tables, remembering the answer per predicate.
+
+    A predicate references a table when it has a column qualified with the table name or one
+    of the aliases ('t.column'), or the reference column of the table ('table_id'). Text in
+    string literals is data and never a reference.
+    """
+
+    def __init__(self, names: Iterable[str], id_columns: Iterable[str], compared: bool = True):
+        """
+        Prepare the check; the pattern for the reference columns is shared with earlier checks.
+
+        Args:
+            names: Names of the tables and their aliases
+            id_columns: Reference columns of the tables, e.g. 'company_id'
+            compared: Only count a bare reference column that is compared with something, as
+                in 'company_id = 1'; a qualified one ('x.company_id') always counts
+        """
+        # Aliases differ from statement to statement, so qualifiers are looked up in a set
+        # rather than compiled into the pattern
+        self._names = frozenset(name.lower() for name in names)
+        pattern = _id_column_pattern(tuple(sorted(set(column.lower() for column in id_columns))), compared)
+        self._search = pattern.search if pattern is not None else None
+        self._answers: Dict[str, bool] = {}
+
+    def __call__(self, condition: str) -> bool:
+        answer = self._answers.get(condition)
+        if answer is None:
+            text = _STRING_PATTERN.sub("''", condition) if "'" in condition else condition
+            answer = self._answers[condition] = self._references(text)
+        return answer
+
+    def _references(self, text: str) -> bool:
+        if self._names and '.' in text:
+            names = self._names
+            if any(match.group(1).lower() in names for match in _QUALIFIER_PATTERN.finditer(text)):
+                return True
+        return self._search is not None and self._search(text) is not None
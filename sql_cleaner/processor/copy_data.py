@@ -0,0 +1,344 @@
+import re
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from sql_cleaner.processor.cleaning_plan import CleaningPlan
+from sql_cleaner.processor.edits import apply_edits
+from sql_cleaner.processor.lexer import iter_significant_tokens, iter_statement_spans, iter_statement_texts
+from sql_cleaner.processor.utils import unqualified_table_name
+from sql_cleaner.processor.values_parser import ValueTuple, iter_value_tuples, remove_fields
+
+
+# Kinds of the sections of a stream read by iter_copy_sections
+STATEMENT = 'statement'
+COPY_HEADER = 'copy_header'
+COPY_DATA = 'copy_data'
+END_OF_DATA = 'end_of_data'
+
+# A line holding nothing but a COPY statement, as pg_dump writes them; only a candidate until
+# the lexer agrees that a statement starts there
+_COPY_LINE_PATTERN = re.compile(r'^[ \t]*(copy\s[^\n]*;)[ \t\r]*(?:\n|\Z)', re.IGNORECASE | re.MULTILINE)
+
+_NAME = r'(?:"[^"]*"|\w+)'
+_COPY_TABLE_PATTERN = re.compile(rf'copy\s+({_NAME}(?:\.{_NAME})?)\s*', re.IGNORECASE)
+# Anything between stdin and the semicolon is an option, e.g. WITH (FORMAT csv) or DELIMITER '|'
+_FROM_STDIN_PATTERN = re.compile(r'\s*from\s+stdin\b([^\n]*);\s*\Z', re.IGNORECASE)
+
+# The line '\.' that ends the data of a COPY statement
+_END_OF_DATA_PATTERN = re.compile(r'^\\\.[ \t\r]*(?:\n|\Z)', re.MULTILINE)
+_END_OF_DATA_LINE_PATTERN = re.compile(r'^\\\.[ \t\r]*\n', re.MULTILINE)
+
+
+class CopyHeader(NamedTuple):
+    """The table and column list of a COPY ... FROM stdin statement, with spans into its text."""
+    table: str
+    # Column list, or None when the statement has none
+    columns: Optional[ValueTuple]
+    # Options after stdin, empty for the default text format
+    options: str = ''
+
+
+class CopyBlock(NamedTuple):
+    """A COPY ... FROM stdin statement and its data in a text, as found by iter_copy_blocks."""
+    # Start of the COPY keyword, start of the first row, end of the last row and end of the '\.' line
+    start: int
+    data_start: int
+    data_end: int
+    end: int
+
+
+def parse_copy_header(text: str, start: int = 0, end: Optional[int] = None) -> Optional[CopyHeader]:
+    """
+    Parse a COPY statement that reads its rows from stdin.
+
+    Args:
+        text: Text the statement is in
+        start: Position of the COPY keyword
+        end: Position after the semicolon and the whitespace after it, the end of the text by default
+
+    Returns:
+        The table and columns, or None if this is not a COPY ... FROM stdin statement
+    """
+    if end is None:
+        end = len(text)
+    match = _COPY_TABLE_PATTERN.match(text, start, end)
+    if match is None:
+        return None
+
+    pos = match.end()
+    columns = None
+    if text.startswith('(', pos):
+        columns = next(iter_value_tuples(text, pos), None)
+        if columns is None:
+            return None
+        pos = columns.end
+
+    from_stdin = _FROM_STDIN_PATTERN.match(text, pos, end)
+    if from_stdin is None:
+        return None
+    return CopyHeader(match.group(1), columns, from_stdin.group(1).strip())
+
+
+class CopyDataFilter:
+    """
+    Removes the tables from one COPY ... FROM stdin statement and its rows.
+
+    The rows of a table to process are removed together with the statement. From the rows
+    of other tables the reference columns are removed; the text format escapes tabs and line
+    breaks in values, so splitting a line at tabs gives its fields. A statement with options,
+    such as another format or delimiter, is kept with its rows as it is. Rows are filtered in
+    chunks of any number of complete lines, so a block never has to be held in memory as a
+    whole, at the speed of a line-oriented filter.
+    """
+
+    def __init__(self, statement: str, plan: CleaningPlan):
+        """
+        Decide what happens to the statement and its rows.
+
+        Args:
+            statement: Text of the COPY statement, up to the end of its line; comments and
+                whitespace before it are kept as they are
+            plan: Cleaning plan of the tables
+
+        Raises:
+            ValueError: If the text is not a COPY ... FROM stdin statement
+        """
+        start = _first_token_start(statement)
+        end = statement.rfind(';') + 1
+        header = parse_copy_header(statement, start, end)
+        if header is None:
+            raise ValueError(f"Not a COPY ... FROM stdin statement: {statement!r}")
+
+        self.prefix = statement[:start]
+        self.removed = unqualified_table_name(header.table) in plan.table_set
+        self.header = statement[start:]
+        self._field_count = 0
+        self._kept_fields: Optional[Callable[[List[str]], Sequence[str]]] = None
+
+        if self.removed or header.columns is None or header.options:
+            return
+
+        fields = header.columns.fields
+        drop = set(i for i, (field_start, field_end) in enumerate(fields)
+                   if unqualified_table_name(statement[field_start:field_end]) in plan.id_columns)
+        if not drop:
+            return
+
+        self.header = apply_edits(statement, remove_fields(statement, fields, drop))[start:]
+        self._field_count = len(fields)
+        keep = [i for i in range(len(fields)) if i not in drop]
+        if len(keep) > 1:
+            self._kept_fields = itemgetter(*keep)
+        else:
+            self._kept_fields = lambda row: [row[i] for i in keep]
+
+    @property
+    def changed(self) -> bool:
+        """Whether the statement or its rows change at all."""
+        return self.removed or self._kept_fields is not None
+
+    def filter_rows(self, rows: str) -> str:
+        """
+        Remove the reference columns from rows of the statement.
+
+        Args:
+            rows: Complete lines of data, without the '\\.' line
+
+        Returns:
+            The rows without the columns, or an empty string if the statement is removed
+
+        Raises:
+            ValueError: If a row does not have a field for every column of the statement,
+                which would leave its fields out of line with the rewritten column list
+        """
+        if self.removed:
+            return ''
+        kept_fields = self._kept_fields
+        if kept_fields is None or not rows:
+            return rows
+
+        # Complete lines leave an empty piece after the last line break
+        line_break = '\n' if rows.endswith('\n') else ''
+        lines = rows[:len(rows) - len(line_break)].split('\n')
+        count = self._field_count
+        filtered = ['\t'.join(kept_fields(fields)) for fields in [line.split('\t') for line in lines]
+                    if len(fields) == count]
+        if len(filtered) != len(lines):
+            line = next(line for line in lines if line.count('\t') != count - 1)
+            raise ValueError(f"COPY row does not have {count} fields: {line[:80]!r}")
+        return '\n'.join(filtered) + line_break
+
+
+def iter_row_chunks(content: str, start: int, end: int, chunk_size: int = 1 << 16) -> Iterator[str]:
+    """
+    Cut the rows of a COPY statement into chunks of complete lines, for CopyDataFilter.filter_rows.
+
+    Args:
+        content: Text the rows are in
+        start: Start of the first row
+        end: End of the last row
+        chunk_size: Number of characters after which a chunk ends with the line
+
+    Returns:
+        Iterator over the chunks
+    """
+    while start < end:
+        cut = content.find('\n', min(start + chunk_size, end - 1), end) + 1 or end
+        yield content[start:cut]
+        start = cut
+
+
+def _first_token_start(text: str, start: int = 0, end: Optional[int] = None) -> int:
+    for token in iter_significant_tokens(text, start, end):
+        return token.start
+    return len(text) if end is None else end
+
+
+def iter_copy_blocks(content: str) -> Iterator[CopyBlock]:
+    """
+    Find the COPY ... FROM stdin statements of SQL content and the data that follows each of them.
+
+    A statement is found when it is on a line of its own, as in the output of pg_dump, and
+    the lexer agrees that it is a statement; the text between two blocks is only lexed when
+    such a line is found in it. The data ends with the line '\\.', or with the content.
+
+    Args:
+        content: SQL content as a string
+
+    Returns:
+        Iterator over the blocks, in order
+    """
+    segment_start = 0
+    pos = 0
+    while True:
+        match = _COPY_LINE_PATTERN.search(content, pos)
+        if match is None:
+            return
+        pos = match.end()
+        if parse_copy_header(content, match.start(1), match.end(1)) is None or not _starts_statement(
+                content, segment_start, match.start(1), match.end(1)):
+            continue
+
+        end_of_data = _END_OF_DATA_PATTERN.search(content, pos)
+        if end_of_data is None:
+            yield CopyBlock(match.start(1), pos, len(content), len(content))
+            return
+        yield CopyBlock(match.start(1), pos, end_of_data.start(), end_of_data.end())
+        segment_start = pos = end_of_data.end()
+
+
+def _starts_statement(content: str, segment_start: int, start: int, end: int) -> bool:
+    """Check whether the lexer sees a statement from start to end after the statements of a segment."""
+    statement_start = 0
+    segment = content[segment_start:end]
+    for statement_start, _ in iter_statement_spans(segment):
+        pass
+    return _first_token_start(segment, statement_start) == start - segment_start
+
+
+def iter_copy_sections(chunks: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    Split a stream of SQL text into statements and the data of COPY ... FROM stdin statements.
+
+    Statements are split as by iter_statement_texts. A COPY statement found as by
+    iter_copy_blocks is followed by its data, in chunks of complete lines as they are read,
+    and the line '\\.' that ends it. Joining the texts gives back the input, and only a
+    statement or a chunk of data is held in memory at a time.
+
+    Args:
+        chunks: Iterable of text chunks, e.g. a file object or blocks read from one
+
+    Returns:
+        Iterator over (kind, text) pairs: STATEMENT, COPY_HEADER (the text of the COPY
+        statement, up to the end of its line), COPY_DATA or END_OF_DATA
+    """
+    reader = _SectionReader(chunks)
+    carried: List[str] = []
+
+    while True:
+        # The last statement and the whitespace after it are held back: they may be a COPY statement
+        held: List[str] = []
+        for text in iter_statement_texts(chain(carried, reader.statement_chunks())):
+            if held and text.strip():
+                for held_text in held:
+                    yield STATEMENT, held_text
+                held = []
+            held.append(text)
+
+        if not reader.at_copy:
+            for held_text in held:
+                yield STATEMENT, held_text
+            return
+
+        statement = ''.join(held)
+        start = _first_token_start(statement)
+        if parse_copy_header(statement, start, statement.rfind(';') + 1) is None:
+            # A line inside a string or comment; read on with the statement that holds it
+            carried = [statement]
+            continue
+
+        carried = []
+        yield COPY_HEADER, statement
+        for kind, text in reader.data_chunks():
+            yield kind, text
+
+
+class _SectionReader:
+    """Reads a stream of chunks up to a COPY line, then up to the end of its data."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._pending = ''
+        # Whether statement_chunks stopped after a COPY line rather than at the end of the stream
+        self.at_copy = False
+
+    def _read(self) -> bool:
+        for chunk in self._chunks:
+            if chunk:
+                self._pending += chunk
+                return True
+        return False
+
+    def statement_chunks(self) -> Iterator[str]:
+        """Complete lines of the stream up to and including the next COPY line."""
+        self.at_copy = False
+        while True:
+            pending = self._pending
+            cut = pending.rfind('\n') + 1
+            match = _COPY_LINE_PATTERN.search(pending, 0, cut) if cut else None
+            if match is not None:
+                self._pending = pending[match.end():]
+                self.at_copy = True
+                yield pending[:match.end()]
+                return
+            if cut:
+                self._pending = pending[cut:]
+                yield pending[:cut]
+            if not self._read():
+                if self._pending:
+                    text, self._pending = self._pending, ''
+                    yield text
+                return
+
+    def data_chunks(self) -> Iterator[Tuple[str, str]]:
+        """Complete lines of data, then the line that ends them."""
+        while True:
+            pending = self._pending
+            end_of_data = _END_OF_DATA_LINE_PATTERN.search(pending)
+            if end_of_data is not None:
+                self._pending = pending[end_of_data.end():]
+                if end_of_data.start():
+                    yield COPY_DATA, pending[:end_of_data.start()]
+                yield END_OF_DATA, end_of_data.group()
+                return
+            cut = pending.rfind('\n') + 1
+            if cut:
+                self._pending = pending[cut:]
+                yield COPY_DATA, pending[:cut]
+            if not self._read():
+                # The stream ends in the data, possibly with a '\.' line without a line break
+                text, self._pending = self._pending, ''
+                if text:
+                    yield (END_OF_DATA if _END_OF_DATA_PATTERN.fullmatch(text) else COPY_DATA), text
+                return
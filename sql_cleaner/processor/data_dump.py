@@ -0,0 +1,203 @@
+import re
+from typing import List, Optional
+
+from sql_cleaner.processor.cleaning_plan import CleaningPlan
+from sql_cleaner.processor.edits import Edit, apply_edits
+from sql_cleaner.processor.handler import SQLHandler
+from sql_cleaner.processor.insert_handler import reference_column_edits
+from sql_cleaner.processor.lexer import STATEMENT_KEYWORDS, iter_significant_tokens, iter_statement_spans
+from sql_cleaner.processor.statement import DELETE, INSERT, UPDATE, Statement, parse_statement, render_statements
+from sql_cleaner.processor.utils import unqualified_table_name
+
+
+# Modes of SQLProcessor: never use the data dump path, use it when a file turns out to be a
+# data dump, or always use it and send only the statements it cannot handle through the chain
+NEVER = 'never'
+AUTO = 'auto'
+ALWAYS = 'always'
+DATA_DUMP_MODES = (NEVER, AUTO, ALWAYS)
+
+# One statement up to and including its semicolon, with the whitespace and comments before it.
+# Strings, quoted names and line comments are skipped as a whole, as the lexer skips them, so
+# every semicolon matched here ends a statement for the lexer as well. Block comments and
+# dollar quotes are not matched at all; the lexer reads the rest of the content then.
+_STATEMENT = r"""
+    [^;'"`\-/$]*
+    (?:
+        (?: '[^'\\]*(?:\\.[^'\\]*)*'
+          | "[^"]*"
+          | `[^`]*`
+          | --[^\r\n]*(?![^\r\n])
+          | -(?!-)
+          | /(?!\*)
+          | \$(?!(?:[A-Za-z_]\w*)?\$)
+        )
+        [^;'"`\-/$]*
+    )*
+    ;
+"""
+_STATEMENT_PATTERN = re.compile(_STATEMENT, re.VERBOSE)
+# As many whole statements as there are, e.g. all statements before a reference to a table
+_STATEMENTS_PATTERN = re.compile(f'(?:{_STATEMENT})*', re.VERBOSE)
+
+# A line that may start a statement of its own for the lexer, although no semicolon ends the one before
+_SPLIT_KEYWORD_PATTERN = re.compile(r'\n[ \t\r\f\v]*(?:%s)(?!\w)' % '|'.join(sorted(STATEMENT_KEYWORDS)),
+                                    re.IGNORECASE)
+
+# The rest of the line after a removed statement, when there is nothing else on it
+_LINE_END_PATTERN = re.compile(r'[ \t]*(?:\n|\Z)')
+
+_WHITESPACE_PATTERN = re.compile(r'\s*')
+
+
+class DataDumpCleaner:
+    """
+    Cleans data dumps, such as the output of pg_dump --inserts or seed files, in place.
+
+    Only the statements that reference one of the tables are looked at: INSERT, UPDATE and
+    DELETE statements of the tables are removed with their line, and the reference columns
+    are removed from the column list and every row of the other INSERT statements. All other
+    bytes, including comments, line breaks and the formatting of the rows that are kept, are
+    copied from the input unchanged. Statements are located with two patterns that run over
+    the content at once, so content between references costs no more than a regex scan.
+
+    The result is the same as that of the handler chain, up to formatting, as long as every
+    referencing statement is one of the above or has no WHERE or JOIN clause. A statement
+    that does need the chain, e.g. a SELECT with a condition on a table, is sent through it
+    when a chain is given; without one the content is not a data dump. A cleaner is created
+    per call, so one processor can be used from several threads.
+    """
+
+    def __init__(self, tables_to_process: List[str], chain: Optional[SQLHandler] = None):
+        """
+        Prepare the cleaner.
+
+        Args:
+            tables_to_process: List of tables to process
+            chain: First handler of the chain, for the statements that need it
+        """
+        self.plan = CleaningPlan.of(tables_to_process)
+        self.chain = chain
+        # Statements that reference a table, and how many of them are kept
+        self.statements_in = 0
+        self.statements_out = 0
+
+    def clean(self, content: str) -> Optional[str]:
+        """
+        Clean SQL content.
+
+        Args:
+            content: SQL content to process
+
+        Returns:
+            Processed SQL content, or None if a statement needs the chain and there is none
+        """
+        find = self.plan.prefilter.find
+        edits: List[Edit] = []
+        boundary = 0
+
+        while boundary < len(content):
+            reference = find(content, boundary)
+            if reference < 0:
+                break
+
+            # Skip the statements before the reference in one match
+            start = _STATEMENTS_PATTERN.match(content, boundary, reference).end()
+            match = _STATEMENT_PATTERN.match(content, start)
+            end = match.end() if match is not None else len(content)
+            if match is not None and _SPLIT_KEYWORD_PATTERN.search(
+                    content, _first_token_start(content, start, end), end) is None:
+                statements = [parse_statement(content, start, end)]
+            else:
+                # The lexer may find more than one statement here, or reads the rest of the content
+                statements = [parse_statement(content, start + span_start, start + span_end)
+                              for span_start, span_end in iter_statement_spans(content[start:end])]
+
+            for statement in statements:
+                if len(statements) > 1 and not self.plan.prefilter.contains(statement.text):
+                    continue
+                if _first_token_start(content, statement.start, statement.end) == statement.end:
+                    # Comments after the last statement mention a table, but there is nothing to clean
+                    continue
+                if not self._add_edits(content, statement, edits):
+                    return None
+            boundary = end
+
+        return apply_edits(content, edits)
+
+    def _add_edits(self, content: str, statement: Statement, edits: List[Edit]) -> bool:
+        """
+        Add the edits of a statement that references a table.
+
+        Args:
+            content: SQL content
+            statement: Statement of the content
+            edits: Edits of the content to add to
+
+        Returns:
+            False if the statement needs the chain and there is none
+        """
+        self.statements_in += 1
+        statement_edits = self._statement_edits(statement)
+        if statement_edits is None:
+            if self.chain is None:
+                return False
+            processed = self.chain.handle_statements([statement], self.plan)
+            if processed and not processed[0].rewritten:
+                statement_edits = []
+            else:
+                statement_edits = [Edit(statement.start, statement.end, render_statements(processed))]
+
+        for start, end, replacement in statement_edits:
+            if (start, end) == (statement.start, statement.end):
+                # The statement keeps the comments and whitespace before it, and a removed one
+                # takes the rest of its line
+                start = _first_token_start(statement.buffer, statement.start, statement.end)
+                line_end = _LINE_END_PATTERN.match(content, end) if not replacement else None
+                if line_end is not None:
+                    end = line_end.end()
+            edits.append(Edit(start, end, replacement))
+
+        if statement_edits != [Edit(statement.start, statement.end)]:
+            self.statements_out += 1
+        return True
+
+    def _statement_edits(self, statement: Statement) -> Optional[List[Edit]]:
+        """
+        Find the edits of a statement that references a table.
+
+        Args:
+            statement: Statement to clean
+
+        Returns:
+            Edits relative to the text the statement was parsed from; one edit of the whole
+            statement with an empty replacement removes it. None if it needs the chain.
+        """
+        plan = self.plan
+        if statement.kind == INSERT:
+            # Same decisions as InsertHandler
+            if statement.table is not None and unqualified_table_name(statement.table) in plan.table_set:
+                return [Edit(statement.start, statement.end)]
+            if statement.is_data:
+                return reference_column_edits(statement.buffer, plan.id_columns,
+                                              _first_token_start(statement.buffer, statement.start, statement.end),
+                                              statement.end)
+        elif (statement.kind in (UPDATE, DELETE) and statement.table is not None
+              and unqualified_table_name(statement.table) in plan.table_set):
+            # Same decisions as UpdateHandler and DeleteHandler
+            return [Edit(statement.start, statement.end)]
+
+        # WhereHandler and JoinHandler leave statements without these keywords alone
+        lower = statement.lower
+        if 'where' in lower or 'join' in lower:
+            return None
+        return []
+
+
+def _first_token_start(content: str, start: int, end: int) -> int:
+    pos = _WHITESPACE_PATTERN.match(content, start, end).end()
+    if not content.startswith(('--', '/*'), pos):
+        return pos
+    for token in iter_significant_tokens(content, pos, end):
+        return token.start
+    return end
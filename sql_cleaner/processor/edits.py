@@ -0,0 +1,66 @@
+from typing import Iterable, List, NamedTuple
+
+
+class Edit(NamedTuple):
+    """Replacement of the text between two indexes; an empty replacement removes the text."""
+    start: int
+    end: int
+    replacement: str = ''
+
+
+def check_edits(edits: Iterable[Edit]) -> List[Edit]:
+    """
+    Order edits by position and make sure they can be applied together.
+
+    An edit that lies within another one is dropped: it changes a part of the text that the
+    other edit replaces as a whole, e.g. a condition of a subquery in a removed JOIN. Edits
+    that overlap only partly cannot both be applied and are an error.
+
+    Args:
+        edits: Edits of one text, in any order
+
+    Returns:
+        The edits to apply, in order of position
+
+    Raises:
+        ValueError: If two edits overlap partly
+    """
+    # The wider of two edits at the same position comes first and takes the other one in
+    ordered = []
+    for edit in sorted(edits, key=lambda edit: (edit.start, -edit.end)):
+        if ordered and edit.start < ordered[-1].end:
+            if edit.end > ordered[-1].end:
+                raise ValueError(f"Overlapping edits: {ordered[-1]!r} and {edit!r}")
+            continue
+        ordered.append(edit)
+    return ordered
+
+
+def apply_edits(text: str, edits: Iterable[Edit]) -> str:
+    """
+    Apply edits to a text in one pass, building the result once.
+
+    The text between the edits is copied as is. Edits are validated with check_edits.
+
+    Args:
+        text: Original text
+        edits: Edits referring to indexes of the original text, in any order
+
+    Returns:
+        The edited text, or the text itself when there are no edits
+
+    Raises:
+        ValueError: If two edits overlap partly
+    """
+    pieces = []
+    pos = 0
+    for start, end, replacement in check_edits(edits):
+        pieces.append(text[pos:start])
+        pieces.append(replacement)
+        pos = end
+
+    if not pieces:
+        return text
+
+    pieces.append(text[pos:])
+    return ''.join(pieces)
@@ -1,12 +1,92 @@
+import os
 import pathlib
-from typing import List
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+
+# Files to find, when no include patterns are given
+DEFAULT_INCLUDES = ('*.sql',)
+
+# Directories that are never entered, in addition to the exclude patterns given
+DEFAULT_EXCLUDES = ('.git/', 'node_modules/')
+
+
+class _GlobPattern:
+    """
+    A .gitignore-style pattern.
+    
+    A pattern without a slash matches the name of a file or directory at any depth, a pattern
+    with a slash matches the path relative to the root. '*' and '?' do not match '/', '**'
+    matches any number of directories, and a trailing '/' only matches directories.
+    """
+    
+    def __init__(self, pattern: str):
+        self.directory_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        self.anchored = '/' in pattern
+        self._regex = re.compile(self._translate(pattern.lstrip('/')))
+    
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                parts.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                parts.append('[^/]')
+                i += 1
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        return '(?s:' + ''.join(parts) + r')\Z'
+    
+    def matches(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        if self.directory_only and not is_dir:
+            return False
+        return self._regex.match(relative_path if self.anchored else name) is not None
+
+
+class _Listing(NamedTuple):
+    """What one directory contains, as far as the finder is concerned."""
+    directory_id: Optional[Tuple[int, int]]
+    files: List[Tuple[str, Tuple[int, int]]]
+    directories: List[Tuple[str, str]]
 
 
 class SQLFileFinder:
-    """Finds all SQL files in the provided directory recursively."""
+    """
+    Finds all SQL files in the provided directory recursively.
     
-    def __init__(self, root_dir: str):
+    Directories are listed with os.scandir by a pool of threads, ahead of the consumer, while
+    files are yielded in a deterministic depth-first order with names sorted in each directory.
+    Excluded directories are never entered. Symbolic links are followed, and a file or
+    directory reached through several links or hard links is only visited once.
+    """
+    
+    def __init__(self, root_dir: str, include: Optional[Iterable[str]] = None,
+                 exclude: Optional[Iterable[str]] = None, workers: Optional[int] = None):
+        """
+        Initialize the finder.
+        
+        Args:
+            root_dir: Directory to search
+            include: Patterns of the files to find (defaults to DEFAULT_INCLUDES)
+            exclude: Patterns of files and directories to skip, in addition to DEFAULT_EXCLUDES
+            workers: Number of threads listing directories (defaults to the executor's default)
+        """
         self.root_dir = root_dir
+        self.include = [_GlobPattern(pattern) for pattern in (include or DEFAULT_INCLUDES)]
+        self.exclude = [_GlobPattern(pattern) for pattern in list(DEFAULT_EXCLUDES) + list(exclude or ())]
+        self.workers = workers
     
     def find_sql_files(self) -> List[pathlib.Path]:
         """
@@ -15,11 +95,83 @@ class SQLFileFinder:
         Returns:
             List of Path objects representing SQL files.
         """
-        sql_files = []
-        root_path = pathlib.Path(self.root_dir)
+        return list(self.iter_sql_files())
+    
+    def iter_sql_files(self) -> Iterator[pathlib.Path]:
+        """
+        Recursively find SQL files in the root directory, yielding each as soon as its directory is listed.
+        
+        Returns:
+            Iterator of Path objects representing SQL files.
+        """
+        visited_directories: Set[Tuple[int, int]] = set()
+        seen_files: Set[Tuple[int, int]] = set()
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        stack: List[Future] = [pool.submit(self._list_directory, self.root_dir, '')]
+        
+        try:
+            while stack:
+                listing = stack.pop().result()
+                if listing.directory_id is None or listing.directory_id in visited_directories:
+                    continue
+                visited_directories.add(listing.directory_id)
+                
+                # Subdirectories are listed in the background while the files are consumed;
+                # reversed, so that the first one is popped first
+                for path, relative_path in reversed(listing.directories):
+                    stack.append(pool.submit(self._list_directory, path, relative_path))
+                
+                for path, file_id in listing.files:
+                    if file_id not in seen_files:
+                        seen_files.add(file_id)
+                        yield pathlib.Path(path)
+        finally:
+            # The consumer may stop early; do not list the rest of the tree
+            for future in stack:
+                future.cancel()
+            pool.shutdown()
+    
+    def _is_excluded(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        return any(pattern.matches(relative_path, name, is_dir) for pattern in self.exclude)
+    
+    def _list_directory(self, directory: str, relative_directory: str) -> _Listing:
+        """
+        List the files to find and the directories to enter in a directory.
+        
+        Args:
+            directory: Path of the directory
+            relative_directory: Path of the directory relative to the root, with a trailing '/'
+        
+        Returns:
+            The listing; unreadable directories are listed as empty
+        """
+        try:
+            directory_stat = os.stat(directory)
+            with os.scandir(directory) as scanner:
+                entries = sorted(scanner, key=lambda entry: entry.name)
+        except OSError:
+            return _Listing(None, [], [])
         
-        for file_path in root_path.glob("**/*.sql"):
-            if file_path.is_file():
-                sql_files.append(file_path)
+        files = []
+        directories = []
+        for entry in entries:
+            relative_path = relative_directory + entry.name
+            try:
+                if entry.is_dir():
+                    if not self._is_excluded(relative_path, entry.name, True):
+                        directories.append((entry.path, relative_path + '/'))
+                elif (entry.is_file()
+                      and any(pattern.matches(relative_path, entry.name, False) for pattern in self.include)
+                      and not self._is_excluded(relative_path, entry.name, False)):
+                    # Only links need a stat call; other files share the device of their directory
+                    if entry.is_symlink():
+                        stat = entry.stat()
+                        file_id = (stat.st_dev, stat.st_ino)
+                    else:
+                        file_id = (directory_stat.st_dev, entry.inode())
+                    files.append((entry.path, file_id))
+            except OSError:
+                # Broken links and entries removed while listing
+                continue
         
-        return sql_files 
\ No newline at end of file
+        return _Listing((directory_stat.st_dev, directory_stat.st_ino), files, directories) 
\ No newline at end of file
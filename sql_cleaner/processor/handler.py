@@ -1,14 +1,31 @@
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import FrozenSet, List, Optional
+
+from sql_cleaner.processor.profiler import Profiler
+from sql_cleaner.processor.statement import ChangeRenderer, Statement, parse_statements, render_changes
 
 
 class SQLHandler(ABC):
     """
     Abstract base class for SQL handlers in a chain of responsibility pattern.
+    
+    Handlers operate on a list of parsed statements, so content is split once at the
+    start of the chain, and at its end the changes are applied to the content in one pass
+    (see render_changes). The tables to process can be given as a list of names or as a
+    CleaningPlan with their patterns compiled in advance.
+    
+    Statements are classified once when they are parsed, and each handler only gets the
+    statements it accepts; see statement_types and accepts().
     """
     
+    # Kinds of statements (INSERT, SELECT, ...) the handler can change; None for all of them
+    statement_types: Optional[FrozenSet[str]] = None
+    
     def __init__(self):
         self._next_handler: Optional[SQLHandler] = None
+        # Set by SQLProcessor.set_profiler; None keeps the chain free of measuring
+        self.profiler: Optional[Profiler] = None
     
     def set_next(self, handler: 'SQLHandler') -> 'SQLHandler':
         """
@@ -23,28 +40,124 @@ class SQLHandler(ABC):
         self._next_handler = handler
         return handler
     
-    def handle(self, content: str, tables_to_process: List[str]) -> str:
+    def handle(self, content: str, tables_to_process: List[str], renderer: Optional[ChangeRenderer] = None) -> str:
         """
-        Process the content and pass it to the next handler if one exists.
+        Process the content with this handler and the rest of the chain.
         
         Args:
             content: SQL content to process
             tables_to_process: List of tables to process
+            renderer: Renderer of the content this is a piece of, for content read piece by piece
             
         Returns:
             Processed SQL content
         """
-        processed_content = self.process(content, tables_to_process)
+        if self.profiler is None:
+            statements = parse_statements(content)
+            return render_changes(content, statements, self.handle_statements(statements, tables_to_process),
+                                  renderer)
         
-        if self._next_handler:
-            return self._next_handler.handle(processed_content, tables_to_process)
+        start = time.perf_counter()
+        statements = parse_statements(content)
+        self.profiler.record_handler('parse', time.perf_counter() - start, 0, len(statements),
+                                     len(content), len(content))
+        
+        processed = self.handle_statements(statements, tables_to_process)
         
+        start = time.perf_counter()
+        processed_content = render_changes(content, statements, processed, renderer)
+        self.profiler.record_handler('render', time.perf_counter() - start, len(processed), len(processed),
+                                     _statements_size(processed), len(processed_content))
         return processed_content
     
-    @abstractmethod
+    def handle_statements(self, statements: List[Statement], tables_to_process: List[str]) -> List[Statement]:
+        """
+        Process the statements and pass them to the next handler if one exists.
+        
+        Args:
+            statements: Parsed SQL statements to process
+            tables_to_process: List of tables to process
+            
+        Returns:
+            Processed SQL statements
+        """
+        processed_statements = self._route_statements(statements, tables_to_process)
+        
+        if self._next_handler:
+            return self._next_handler.handle_statements(processed_statements, tables_to_process)
+        
+        return processed_statements
+    
+    def accepts(self, statement: Statement) -> bool:
+        """
+        Check whether the handler can change a statement, from its classification only.
+        
+        Args:
+            statement: Parsed SQL statement
+            
+        Returns:
+            True if the statement has to be passed to process_statements
+        """
+        return self.statement_types is None or statement.kind in self.statement_types
+    
+    def _route_statements(self, statements: List[Statement], tables_to_process: List[str]) -> List[Statement]:
+        """
+        Process the statements this handler accepts, passing the others through untouched.
+        
+        Args:
+            statements: Parsed SQL statements to process
+            tables_to_process: List of tables to process
+            
+        Returns:
+            Processed SQL statements, in their original order
+        """
+        if self.statement_types is None:
+            accepted = statements
+        else:
+            accepted = [statement for statement in statements if self.accepts(statement)]
+            if not accepted:
+                return statements
+        
+        if self.profiler is None:
+            processed = self.process_statements(accepted, tables_to_process)
+        else:
+            processed = self._profile_statements(accepted, tables_to_process)
+        
+        if accepted is statements or len(accepted) == len(statements):
+            return processed
+        
+        # Handlers rewrite statements in place and may drop some; put the kept ones back in
+        # between the statements that were not routed to this handler
+        kept = set(map(id, processed))
+        accepted_ids = set(map(id, accepted))
+        return [statement for statement in statements if id(statement) not in accepted_ids or id(statement) in kept]
+    
+    def _profile_statements(self, statements: List[Statement], tables_to_process: List[str]) -> List[Statement]:
+        """
+        Process the statements with this handler, recording the call with the profiler.
+        
+        Args:
+            statements: Parsed SQL statements to process
+            tables_to_process: List of tables to process
+            
+        Returns:
+            Processed SQL statements
+        """
+        # Statements are rewritten in place, so the input is measured before processing
+        statements_in = len(statements)
+        size_in = _statements_size(statements)
+        
+        start = time.perf_counter()
+        processed_statements = self.process_statements(statements, tables_to_process)
+        seconds = time.perf_counter() - start
+        
+        self.profiler.record_handler(type(self).__name__, seconds, statements_in, len(processed_statements),
+                                     size_in, _statements_size(processed_statements))
+        return processed_statements
+    
     def process(self, content: str, tables_to_process: List[str]) -> str:
         """
-        Process the SQL content according to the handler's specific logic.
+        Process the SQL content with this handler only.
         
         Args:
             content: SQL content to process
@@ -53,4 +166,23 @@ class SQLHandler(ABC):
         Returns:
             Processed SQL content
         """
-        pass 
\ No newline at end of file
+        statements = parse_statements(content)
+        return render_changes(content, statements, self._route_statements(statements, tables_to_process))
+    
+    @abstractmethod
+    def process_statements(self, statements: List[Statement], tables_to_process: List[str]) -> List[Statement]:
+        """
+        Process the SQL statements according to the handler's specific logic.
+        
+        Args:
+            statements: Parsed SQL statements to process
+            tables_to_process: List of tables to process
+            
+        Returns:
+            Processed SQL statements; statements may be rewritten in place or dropped
+        """
+        pass
+
+
+def _statements_size(statements: List[Statement]) -> int:
+    return sum(len(statement.text) for statement in statements) 
\ No newline at end of file
@@ -1,8 +1,59 @@
 import re
-from typing import Dict, List, Tuple
+from typing import List, Optional, Set
 
+from sql_cleaner.processor.cleaning_plan import CleaningPlan
+from sql_cleaner.processor.edits import Edit, apply_edits
 from sql_cleaner.processor.handler import SQLHandler
-from sql_cleaner.processor.utils import split_into_statements, split_with_nested_commas, get_table_id_column
+from sql_cleaner.processor.statement import INSERT, Statement
+from sql_cleaner.processor.utils import unqualified_table_name
+from sql_cleaner.processor.values_parser import iter_value_tuples, remove_fields
+
+
+# The start of an INSERT statement up to its column list, and the VALUES keyword after the list
+_INSERT_COLUMNS_PATTERN = re.compile(r'\s*insert\s+into\s+\w+(?:\.\w+)?\s*(?=\()', re.IGNORECASE)
+_VALUES_PATTERN = re.compile(r'\s*values\b', re.IGNORECASE)
+
+
+def reference_column_edits(text: str, reference_columns: Set[str], start: int = 0,
+                           end: Optional[int] = None) -> Optional[List[Edit]]:
+    """
+    Find the edits that remove reference columns from the column list and every row of an INSERT statement.
+    
+    Only the removed columns and values are edited, so the rest of the statement keeps its
+    formatting, and the rows are read one by one without splitting the statement.
+    
+    Args:
+        text: Text the statement is in
+        reference_columns: Lower-cased column names to remove
+        start: Position where the statement starts
+        end: Position where the statement ends, the end of the text by default
+        
+    Returns:
+        Edits of the column list and the rows, or None if the column list or the VALUES
+        keyword cannot be read
+    """
+    if end is None:
+        end = len(text)
+    header = _INSERT_COLUMNS_PATTERN.match(text, start, end)
+    if header is None:
+        return None
+    
+    columns = next(iter_value_tuples(text, header.end()), None)
+    if columns is None:
+        return None
+    drop = set(i for i, (field_start, field_end) in enumerate(columns.fields)
+               if unqualified_table_name(text[field_start:field_end]) in reference_columns)
+    if not drop:
+        return []
+    
+    values = _VALUES_PATTERN.match(text, columns.end, end)
+    if values is None:
+        return None
+    
+    edits = remove_fields(text, columns.fields, drop)
+    for row in iter_value_tuples(text, values.end()):
+        edits.extend(remove_fields(text, row.fields, drop))
+    return edits
 
 
 class InsertHandler(SQLHandler):
@@ -11,308 +62,66 @@ class InsertHandler(SQLHandler):
     for specified tables and references to specified tables in other INSERT statements.
     """
     
-    def process(self, content: str, tables_to_process: List[str]) -> str:
-        """
-        Process the SQL content to remove direct inserts and modify references.
-        
-        Args:
-            content: SQL content to process
-            tables_to_process: List of tables to process
-            
-        Returns:
-            Processed SQL content
-        """
-        processed_content = content
-        
-        for table_name in tables_to_process:
-            processed_content = self._remove_direct_inserts(processed_content, table_name)
-            processed_content = self._modify_reference_inserts(processed_content, table_name)
-        
-        return processed_content
+    statement_types = frozenset([INSERT])
     
-    def _remove_direct_inserts(self, content: str, table_name: str) -> str:
+    def process_statements(self, statements: List[Statement], tables_to_process: List[str]) -> List[Statement]:
         """
-        Remove INSERT statements directly targeting the specified table.
+        Process the SQL statements to remove direct inserts and modify references.
         
-        Args:
-            content: SQL content as a string
-            table_name: Table name to remove inserts for
-            
-        Returns:
-            SQL content with direct inserts removed
-        """
-        statements = split_into_statements(content)
-        processed_statements = []
-        
-        for stmt in statements:
-            # Check if this statement is an insert into the target table
-            if not re.search(rf'insert\s+into\s+(?:public\.)?{table_name}\s*\(', stmt, re.IGNORECASE):
-                processed_statements.append(stmt)
-        
-        # Join statements back together
-        return '\n\n'.join(processed_statements)
-    
-    def _modify_reference_inserts(self, content: str, table_name: str) -> str:
-        """
-        Modify INSERT statements that reference the specified table.
+        Every statement is visited once: its target table is looked up in the set of tables
+        to process, and all reference columns of all tables are removed in a single pass of
+        edits, so the cost does not depend on the number of tables.
         
         Args:
-            content: SQL content as a string
-            table_name: Table name to remove references for
+            statements: Parsed SQL statements to process
+            tables_to_process: List of tables to process
             
         Returns:
-            SQL content with references modified
+            Processed SQL statements
         """
-        statements = split_into_statements(content)
+        plan = CleaningPlan.of(tables_to_process)
+        target_tables = plan.table_set
+        reference_columns = plan.id_columns
         processed_statements = []
         
-        for stmt in statements:
-            # Skip direct inserts into the table (handled by _remove_direct_inserts)
-            if re.search(rf'insert\s+into\s+(?:public\.)?{table_name}\s*\(', stmt, re.IGNORECASE):
-                continue
+        for statement in statements:
+            if statement.kind == INSERT:
+                # Direct inserts into the table are dropped entirely
+                if self._is_direct_insert(statement, target_tables):
+                    continue
                 
-            # Check if this statement is an insert that references the target table
-            reference_column = get_table_id_column(table_name)
-            if reference_column.lower() in stmt.lower():
-                # Process this statement to remove the reference
-                stmt = self._process_reference_insert(stmt, reference_column)
-                
-            processed_statements.append(stmt)
+                stmt = statement.text
+                processed = self._process_reference_insert(stmt, reference_columns)
+                if processed is not stmt:
+                    statement.text = processed
+            
+            processed_statements.append(statement)
         
-        # Join statements back together
-        return '\n\n'.join(processed_statements)
+        return processed_statements
     
-    def _process_reference_insert(self, statement: str, reference_column: str) -> str:
+    def _is_direct_insert(self, statement: Statement, target_tables: Set[str]) -> bool:
         """
-        Process an INSERT statement to remove references to the specified column.
+        Check if a statement is an INSERT directly targeting one of the specified tables.
         
         Args:
-            statement: SQL statement to process
-            reference_column: Column name to remove references to
+            statement: Parsed SQL statement to check
+            target_tables: Lower-cased names of the tables to check for
             
         Returns:
-            Processed SQL statement
+            True if the statement inserts into one of the tables, False otherwise
         """
-        # Create a clean/normalized version for parsing
-        clean_stmt = re.sub(r'\s+', ' ', statement)
-        
-        # Extract column list from the INSERT statement
-        column_match = re.search(r'insert\s+into\s+\w+(?:\.?\w+)?\s*\(([^)]+)\)', clean_stmt, re.IGNORECASE)
-        if not column_match:
-            return statement
-            
-        column_str = column_match.group(1)
-        columns = [col.strip() for col in split_with_nested_commas(column_str)]
-        
-        # Check for multi-value INSERT
-        if 'values' in clean_stmt.lower() and re.search(r'\)\s*,\s*\(', clean_stmt):
-            return self._process_multi_value_insert(statement, reference_column, columns)
-        
-        # Find the exact column by name
-        reference_idx = -1
-        for i, col in enumerate(columns):
-            if reference_column.lower() == col.lower():
-                reference_idx = i
-                break
-                
-        if reference_idx == -1:
-            return statement  # Column not found
-            
-        # Build new column list excluding the reference column
-        new_columns = [col for i, col in enumerate(columns) if i != reference_idx]
-        new_column_str = ', '.join(new_columns)
-        
-        # Get the prefix (everything before column list)
-        prefix = statement[:statement.find('(', statement.lower().find('insert'))]
-        
-        # Find 'VALUES' keyword
-        values_idx = statement.lower().find('values')
-        if values_idx == -1:
-            return statement
-            
-        # The part between closing column parenthesis and 'VALUES'
-        middle_part = statement[statement.find(')', statement.find('(')) + 1:values_idx]
-        
-        # Extract values from after VALUES
-        after_values = statement[values_idx + 6:].strip()
-        
-        # Parse values using nested parenthesis counting to find balanced closing paren
-        open_count = 0
-        values_end_pos = -1
-        in_string = False
-        string_char = None
-        
-        for i, char in enumerate(after_values):
-            if char in ['"', "'"]:
-                if not in_string:
-                    in_string = True
-                    string_char = char
-                elif string_char == char and (i == 0 or after_values[i-1] != '\\'):
-                    in_string = False
-                    string_char = None
-            
-            if not in_string:
-                if char == '(':
-                    open_count += 1
-                elif char == ')':
-                    open_count -= 1
-                    if open_count == 0:
-                        values_end_pos = i
-                        break
-        
-        if values_end_pos == -1:
-            return statement  # Failed to extract values
-        
-        # Extract values content and split into individual values
-        values_content = after_values[:values_end_pos].strip()
-        if values_content.startswith('('):
-            values_content = values_content[1:]  # Remove opening paren
-        
-        values = split_with_nested_commas(values_content)
-        
-        # Remove the value at reference_idx
-        if reference_idx < len(values):
-            values.pop(reference_idx)
-        
-        # Get what comes after the values parenthesis
-        rest_of_stmt = after_values[values_end_pos+1:].strip() 
-        
-        # Rebuild the SQL statement
-        rebuilt_sql = f"{prefix}({new_column_str}){middle_part}values ("
-        rebuilt_sql += ', '.join(values)
-        rebuilt_sql += ')'
-        
-        # Add any remaining parts (typically just a semicolon)
-        if rest_of_stmt:
-            rebuilt_sql += rest_of_stmt
-        
-        return rebuilt_sql
+        return statement.table is not None and unqualified_table_name(statement.table) in target_tables
     
-    def _process_multi_value_insert(self, statement: str, reference_column: str, columns=None) -> str:
+    def _process_reference_insert(self, statement: str, reference_columns: Set[str]) -> str:
         """
-        Process a multi-value INSERT statement to remove references to the specified column.
+        Process an INSERT statement to remove references to the specified columns.
         
         Args:
             statement: SQL statement to process
-            reference_column: Column name to remove references to
-            columns: Pre-parsed column list if available
+            reference_columns: Lower-cased column names to remove references to
             
         Returns:
             Processed SQL statement
         """
-        # Create a clean/normalized version for parsing
-        clean_stmt = re.sub(r'\s+', ' ', statement)
-        
-        # Extract column list if not provided
-        if columns is None:
-            column_match = re.search(r'insert\s+into\s+\w+(?:\.?\w+)?\s*\(([^)]+)\)', clean_stmt, re.IGNORECASE)
-            if not column_match:
-                return statement
-                
-            column_str = column_match.group(1)
-            columns = [col.strip() for col in split_with_nested_commas(column_str)]
-        
-        # Find the exact column by name
-        reference_idx = -1
-        for i, col in enumerate(columns):
-            if reference_column.lower() == col.lower():
-                reference_idx = i
-                break
-                
-        if reference_idx == -1:
-            return statement  # Column not found
-            
-        # Remove the column from the column list
-        new_columns = [col for i, col in enumerate(columns) if i != reference_idx]
-        new_column_str = ', '.join(new_columns)
-        
-        # Get the parts of the SQL statement
-        prefix = statement[:statement.find('(', statement.lower().find('insert'))]
-        
-        # Find 'VALUES' keyword
-        values_idx = statement.lower().find('values')
-        if values_idx == -1:
-            return statement
-            
-        # The part between closing column parenthesis and 'VALUES'
-        middle_part = statement[statement.find(')', statement.find('(')) + 1:values_idx]
-        
-        # Process the multi-value section
-        after_values = statement[values_idx + 6:].strip()
-        
-        # Trace through each value set
-        value_sets = []
-        open_count = 0
-        current_set = ""
-        in_string = False
-        string_char = None
-        
-        i = 0
-        while i < len(after_values):
-            char = after_values[i]
-            
-            # Handle string boundaries
-            if char in ['"', "'"]:
-                if not in_string:
-                    in_string = True
-                    string_char = char
-                elif string_char == char and (i == 0 or after_values[i-1] != '\\'):
-                    in_string = False
-                    string_char = None
-            
-            # Process parentheses
-            if not in_string:
-                if char == '(':
-                    if open_count == 0:
-                        # Start of a new value set
-                        current_set = ""
-                    open_count += 1
-                elif char == ')':
-                    open_count -= 1
-                    if open_count == 0:
-                        # End of a value set
-                        value_sets.append(current_set)
-                        current_set = ""
-                        
-                        # Check if there are more value sets
-                        j = i + 1
-                        while j < len(after_values) and after_values[j] in ', \t\n\r':
-                            j += 1
-                        
-                        if j < len(after_values) and after_values[j] == '(':
-                            # There's another value set
-                            i = j - 1  # Will be incremented in the loop
-                        else:
-                            # No more value sets
-                            rest_of_stmt = after_values[i+1:].strip()
-                            break
-            
-            # Add character to current set if we're in one
-            if open_count > 0 and char != '(' and (open_count > 1 or char != ')'):
-                current_set += char
-            
-            i += 1
-        
-        # Process each value set to remove the reference column's value
-        processed_sets = []
-        for value_set in value_sets:
-            values = split_with_nested_commas(value_set)
-            
-            # Remove the reference value
-            if reference_idx < len(values):
-                values.pop(reference_idx)
-                
-            processed_sets.append(f"({', '.join(values)})")
-        
-        # Get what's left after the last value set
-        rest_of_stmt = after_values[after_values.rfind(')')+1:].strip()
-        
-        # Rebuild the SQL with modified column list and value sets
-        rebuilt_sql = f"{prefix}({new_column_str}){middle_part}values "
-        rebuilt_sql += ', '.join(processed_sets)
-        
-        # Add any remaining parts (typically just a semicolon)
-        if rest_of_stmt:
-            rebuilt_sql += " " + rest_of_stmt
-            
-        return rebuilt_sql 
\ No newline at end of file
+        edits = reference_column_edits(statement, reference_columns)
+        return apply_edits(statement, edits) if edits else statement 
\ No newline at end of file
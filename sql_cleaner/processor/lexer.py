@@ -0,0 +1,291 @@
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Token types produced by tokenize()
+WHITESPACE = 'whitespace'
+COMMENT = 'comment'
+STRING = 'string'
+QUOTED_IDENTIFIER = 'quoted_identifier'
+WORD = 'word'
+LPAREN = 'lparen'
+RPAREN = 'rparen'
+COMMA = 'comma'
+DOT = 'dot'
+SEMICOLON = 'semicolon'
+OPERATOR = 'operator'
+
+# Keywords that start a new statement when they begin a line of an unterminated statement
+STATEMENT_KEYWORDS = frozenset(["SELECT", "UPDATE", "DELETE", "INSERT", "CREATE", "ALTER", "DROP"])
+
+# Statements that may be left without a semicolon and followed by another statement on the next line
+_SPLITTABLE_STATEMENTS = frozenset(["SELECT", "UPDATE", "DELETE", "INSERT"])
+
+
+class Token(NamedTuple):
+    """A single lexical token with its position in the tokenized text."""
+    type: str
+    value: str
+    start: int
+    end: int
+
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<whitespace>\s+)
+  | (?P<line_comment>--[^\r\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<string>[eEnNbBxX]?'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'?)
+  | (?P<dollar_quote>\$(?:[A-Za-z_]\w*)?\$)
+  | (?P<quoted_identifier>"[^"]*(?:""[^"]*)*"?|`[^`]*`?)
+  | (?P<word>\w+)
+  | (?P<lparen>\()
+  | (?P<rparen>\))
+  | (?P<comma>,)
+  | (?P<dot>\.)
+  | (?P<semicolon>;)
+  | (?P<operator>.)
+""", re.VERBOSE | re.DOTALL)
+
+# Only the constructs that matter for statement boundaries; everything else is skipped by search()
+_SPLIT_PATTERN = re.compile(r"""
+    '[^'\\]*(?:\\.[^'\\]*)*'?
+  | "[^"]*"?
+  | `[^`]*`?
+  | --[^\r\n]*
+  | /\*
+  | \$(?:[A-Za-z_]\w*)?\$
+  | [;()]
+  | \n[ \t\r\f\v]*(?=[A-Za-z])
+""", re.VERBOSE)
+
+_BLOCK_COMMENT_DELIMITER = re.compile(r'/\*|\*/')
+_WORD_PATTERN = re.compile(r'\w+')
+
+
+def _skip_block_comment(content: str, pos: int) -> int:
+    """
+    Find the end of a (possibly nested) block comment.
+
+    Args:
+        content: Text being scanned
+        pos: Position right after the opening '/*'
+
+    Returns:
+        Position right after the matching '*/', or the end of the text
+    """
+    depth = 1
+    while depth:
+        match = _BLOCK_COMMENT_DELIMITER.search(content, pos)
+        if match is None:
+            return len(content)
+        depth += 1 if match.group() == '/*' else -1
+        pos = match.end()
+    return pos
+
+
+def _skip_dollar_quote(content: str, tag: str, pos: int) -> int:
+    """
+    Find the end of a dollar-quoted string such as $$...$$ or $body$...$body$.
+
+    Args:
+        content: Text being scanned
+        tag: The opening tag, including both dollar signs
+        pos: Position right after the opening tag
+
+    Returns:
+        Position right after the closing tag, or the end of the text
+    """
+    close = content.find(tag, pos)
+    if close == -1:
+        return len(content)
+    return close + len(tag)
+
+
+def tokenize(content: str, start: int = 0, end: Optional[int] = None) -> Iterator[Token]:
+    """
+    Split SQL text into tokens.
+
+    Handles string literals (including doubled quotes, backslash escapes and dollar quoting),
+    quoted identifiers, single-line and nested multi-line comments.
+
+    Args:
+        content: SQL content as a string
+        start: Position to start tokenizing from
+        end: Position to stop tokenizing at (defaults to the end of the content)
+
+    Returns:
+        Iterator over tokens; token positions refer to the original content
+    """
+    if end is None:
+        end = len(content)
+    pos = start
+    match_token = _TOKEN_PATTERN.match
+
+    while pos < end:
+        match = match_token(content, pos, end)
+        kind = match.lastgroup
+        token_end = match.end()
+
+        if kind == 'line_comment':
+            kind = COMMENT
+        elif kind == 'block_comment':
+            kind = COMMENT
+            token_end = min(_skip_block_comment(content, token_end), end)
+        elif kind == 'dollar_quote':
+            kind = STRING
+            token_end = min(_skip_dollar_quote(content, match.group(), token_end), end)
+
+        yield Token(kind, content[pos:token_end], pos, token_end)
+        pos = token_end
+
+
+def iter_significant_tokens(content: str, start: int = 0, end: Optional[int] = None) -> Iterator[Token]:
+    """
+    Tokenize SQL text lazily, dropping whitespace and comments.
+
+    Args:
+        content: SQL content as a string
+        start: Position to start tokenizing from
+        end: Position to stop tokenizing at (defaults to the end of the content)
+
+    Returns:
+        Iterator over tokens that carry meaning
+    """
+    for token in tokenize(content, start, end):
+        if token.type not in (WHITESPACE, COMMENT):
+            yield token
+
+
+def significant_tokens(content: str) -> List[Token]:
+    """
+    Tokenize SQL text, dropping whitespace and comments.
+
+    Args:
+        content: SQL content as a string
+
+    Returns:
+        List of tokens that carry meaning
+    """
+    return list(iter_significant_tokens(content))
+
+
+def leading_keyword(content: str, start: int = 0, end: Optional[int] = None) -> Optional[str]:
+    """
+    Get the first keyword of a statement, skipping leading whitespace and comments.
+
+    Args:
+        content: SQL content as a string
+        start: Start of the statement
+        end: End of the statement
+
+    Returns:
+        The upper-cased first word, or None if the statement does not start with a word
+    """
+    for token in tokenize(content, start, end):
+        if token.type in (WHITESPACE, COMMENT):
+            continue
+        return token.value.upper() if token.type == WORD else None
+    return None
+
+
+def iter_statement_spans(content: str) -> Iterator[Tuple[int, int]]:
+    """
+    Find statement boundaries in SQL content.
+
+    Statements end after a semicolon outside of strings, identifiers and comments. A statement
+    that is missing its semicolon also ends when one of STATEMENT_KEYWORDS starts a new line
+    outside of parentheses. The spans are contiguous, so whitespace and comments between
+    statements belong to the statement that follows them.
+
+    Args:
+        content: SQL content as a string
+
+    Returns:
+        Iterator over (start, end) positions of statements
+    """
+    start = 0
+    pos = 0
+    depth = 0
+    statement_keyword = None
+    length = len(content)
+    search = _SPLIT_PATTERN.search
+
+    while pos < length:
+        match = search(content, pos)
+        if match is None:
+            break
+
+        token = match.group()
+        first = token[0]
+        pos = match.end()
+
+        if first == ';':
+            yield start, pos
+            start = pos
+            depth = 0
+            statement_keyword = None
+        elif first == '(':
+            depth += 1
+        elif first == ')':
+            depth = max(depth - 1, 0)
+        elif token == '/*':
+            pos = _skip_block_comment(content, pos)
+        elif first == '$':
+            pos = _skip_dollar_quote(content, token, pos)
+        elif first == '\n' and depth == 0:
+            word = _WORD_PATTERN.match(content, pos)
+            if word.group().upper() not in STATEMENT_KEYWORDS:
+                continue
+            if statement_keyword is None:
+                statement_keyword = leading_keyword(content, start, match.start())
+            if statement_keyword in _SPLITTABLE_STATEMENTS and not (
+                    word.group().upper() == "SELECT" and statement_keyword in ("SELECT", "INSERT")):
+                yield start, match.start()
+                start = match.start()
+                statement_keyword = word.group().upper()
+
+    if start < length:
+        yield start, length
+
+
+
+def iter_statement_texts(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Split a stream of SQL text into statements without reading it all into memory.
+
+    Statements are found exactly as iter_statement_spans would find them in the joined text,
+    and the yielded texts are contiguous, so joining them gives back the input. Only the
+    statement that is still being read is kept in memory.
+
+    Args:
+        chunks: Iterable of text chunks, e.g. a file object or blocks read from one
+
+    Returns:
+        Iterator over the texts of the statements
+    """
+    pending = ''
+    scanned = 0
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        pending += chunk
+
+        # A boundary found in the last line may move once the rest of the line arrives, and
+        # a long statement is not rescanned until it has at least doubled since the last scan
+        cut = pending.rfind('\n')
+        if cut <= 0 or cut < 2 * scanned:
+            continue
+
+        start = 0
+        for start, end in iter_statement_spans(pending[:cut]):
+            if end == cut:
+                break
+            yield pending[start:end]
+
+        pending = pending[start:]
+        scanned = cut - start
+
+    if pending:
+        for start, end in iter_statement_spans(pending):
+            yield pending[start:end]
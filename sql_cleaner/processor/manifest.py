@@ -0,0 +1,170 @@
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, NamedTuple, Optional, Union
+
+
+MANIFEST_FILE_NAME = '.sql_cleaner_manifest.json'
+
+# Bump when the output of the handlers or the files they apply to change, so that files are processed again
+MANIFEST_VERSION = 7
+
+
+class ManifestEntry(NamedTuple):
+    """What is known about a file after a run."""
+    size: int
+    mtime_ns: int
+    sha256: str
+    fingerprint: str
+    outcome: str
+
+
+# Raw file content, e.g. bytes or a memory-mapped file
+Data = Union[bytes, bytearray, memoryview]
+
+
+def content_hash(data: Data) -> str:
+    """
+    Hash file content.
+
+    Args:
+        data: Raw file content
+
+    Returns:
+        Hex SHA-256 digest of the content
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def tables_fingerprint(tables: Iterable[str]) -> str:
+    """
+    Identify a set of tables, independent of order, case and duplicates.
+
+    Args:
+        tables: Table names
+
+    Returns:
+        Hex SHA-256 digest of the table set
+    """
+    names = sorted(set(table.lower() for table in tables))
+    return hashlib.sha256('\n'.join([f"v{MANIFEST_VERSION}"] + names).encode('utf-8')).hexdigest()
+
+
+def make_entry(path: str, data: Data, fingerprint: str, outcome: str) -> ManifestEntry:
+    """
+    Describe a file as it is on disk now.
+
+    Args:
+        path: Path of the file
+        data: Raw content of the file as it was last read or written
+        fingerprint: Fingerprint of the tables the file was processed with
+        outcome: What happened to the file
+
+    Returns:
+        Manifest entry for the file
+    """
+    stat = os.stat(path)
+    return ManifestEntry(stat.st_size, stat.st_mtime_ns, content_hash(data), fingerprint, outcome)
+
+
+class RunManifest:
+    """
+    Records the state of every file after a run, so later runs can skip unchanged files.
+
+    The manifest is a JSON file, by default in the processed directory. Entries are keyed by
+    the path of the file relative to that directory.
+    """
+
+    def __init__(self, directory: str, path: Optional[str] = None):
+        """
+        Load the manifest of a directory, starting empty when there is none or it is unreadable.
+
+        Args:
+            directory: Directory the files are in
+            path: Path of the manifest file (defaults to MANIFEST_FILE_NAME in the directory)
+        """
+        self.directory = directory
+        self.path = path or os.path.join(directory, MANIFEST_FILE_NAME)
+        self.entries: Dict[str, ManifestEntry] = {}
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                self.entries = {key: ManifestEntry(**value) for key, value in data['files'].items()}
+        except (OSError, ValueError, KeyError, TypeError):
+            self.entries = {}
+
+    def _key(self, file_path: str) -> str:
+        return os.path.relpath(str(file_path), self.directory)
+
+    def get(self, file_path: str) -> Optional[ManifestEntry]:
+        """
+        Get the entry of a file.
+
+        Args:
+            file_path: Path of the file
+
+        Returns:
+            The entry from the last run, or None
+        """
+        return self.entries.get(self._key(file_path))
+
+    def update(self, file_path: str, entry: Optional[ManifestEntry]):
+        """
+        Set or, with None, remove the entry of a file.
+
+        Args:
+            file_path: Path of the file
+            entry: New entry
+        """
+        if entry is None:
+            self.entries.pop(self._key(file_path), None)
+        else:
+            self.entries[self._key(file_path)] = entry
+
+    def retain(self, file_paths: Iterable[str]):
+        """
+        Forget the files that no longer exist.
+
+        Args:
+            file_paths: Paths of the files found in this run
+        """
+        keys = set(self._key(file_path) for file_path in file_paths)
+        self.entries = {key: entry for key, entry in self.entries.items() if key in keys}
+
+    def save(self):
+        """Write the manifest, replacing the previous one atomically."""
+        data = {
+            'version': MANIFEST_VERSION,
+            'files': {key: entry._asdict() for key, entry in sorted(self.entries.items())},
+        }
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(temp_path, self.path)
+
+
+def is_unchanged(entry: Optional[ManifestEntry], fingerprint: str, size: int, mtime_ns: int,
+                 data: Optional[Data] = None) -> bool:
+    """
+    Check whether a file is provably in the state recorded in its entry.
+
+    A file whose size and modification time both match is taken as unchanged without reading
+    it. When only the size matches, the content hash decides, provided the content is given.
+
+    Args:
+        entry: Entry of the file from the last run
+        fingerprint: Fingerprint of the tables of this run
+        size: Current size of the file
+        mtime_ns: Current modification time of the file
+        data: Current raw content of the file, if it has been read
+
+    Returns:
+        True if the file need not be processed again
+    """
+    if entry is None or entry.fingerprint != fingerprint or entry.size != size:
+        return False
+    if entry.mtime_ns == mtime_ns:
+        return True
+    return data is not None and content_hash(data) == entry.sha256
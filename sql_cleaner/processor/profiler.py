@@ -0,0 +1,133 @@
+import json
+from typing import Dict, Iterable, Optional
+
+
+def _add(target: Dict[str, float], values: Dict[str, float]):
+    for key, value in values.items():
+        target[key] = target.get(key, 0) + value
+
+
+class Profiler:
+    """
+    Collects wall time, sizes and statement counts per handler, per table and per file.
+
+    A profiler is attached to the handlers with SQLProcessor.set_profiler; without one the
+    handlers do not measure anything. Sizes are counted in characters, which equals bytes
+    for ASCII content. Table figures attribute the whole cost of a file to every target
+    table referenced in it, so they answer which tables make a run slow rather than adding
+    up to the total.
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, Dict[str, float]] = {}
+        self.tables: Dict[str, Dict[str, float]] = {}
+        self.files: Dict[str, Dict] = {}
+        self._file_handlers: Optional[Dict[str, Dict[str, float]]] = None
+
+    def record_handler(self, name: str, seconds: float, statements_in: int, statements_out: int,
+                       size_in: int, size_out: int):
+        """
+        Record one call of a handler (or of the 'parse' and 'render' stages).
+
+        Args:
+            name: Name of the handler or stage
+            seconds: Wall time of the call
+            statements_in: Number of statements the handler received
+            statements_out: Number of statements the handler returned
+            size_in: Size of the statements the handler received
+            size_out: Size of the statements the handler returned
+        """
+        values = {
+            'calls': 1,
+            'seconds': seconds,
+            'statements_in': statements_in,
+            'statements_out': statements_out,
+            'size_in': size_in,
+            'size_out': size_out,
+        }
+        _add(self.handlers.setdefault(name, {}), values)
+        if self._file_handlers is not None:
+            _add(self._file_handlers.setdefault(name, {}), values)
+
+    def begin_file(self):
+        """Start collecting the handler figures of a file."""
+        self._file_handlers = {}
+
+    def end_file(self, path: str, seconds: float, size_in: int, size_out: int, tables: Iterable[str],
+                 outcome: str):
+        """
+        Record a processed file together with the handler figures collected since begin_file.
+
+        Args:
+            path: Path of the file
+            seconds: Wall time spent on the file
+            size_in: Size of the file before processing
+            size_out: Size of the file after processing
+            tables: Target tables referenced in the file
+            outcome: What happened to the file, e.g. 'processed' or 'skipped'
+        """
+        tables = sorted(tables)
+        self.files[path] = {
+            'seconds': seconds,
+            'size_in': size_in,
+            'size_out': size_out,
+            'tables': tables,
+            'outcome': outcome,
+            'handlers': self._file_handlers or {},
+        }
+        self._file_handlers = None
+
+        for table in tables:
+            _add(self.tables.setdefault(table, {}), {
+                'files': 1,
+                'seconds': seconds,
+                'size_in': size_in,
+                'size_out': size_out,
+            })
+
+    def merge(self, other: 'Profiler'):
+        """
+        Add the figures of another profiler, e.g. one filled in a worker process.
+
+        Args:
+            other: Profiler to merge into this one
+        """
+        for name, values in other.handlers.items():
+            _add(self.handlers.setdefault(name, {}), values)
+        for table, values in other.tables.items():
+            _add(self.tables.setdefault(table, {}), values)
+        self.files.update(other.files)
+
+    def to_dict(self) -> Dict:
+        """
+        Build the report.
+
+        Returns:
+            Totals and the figures per handler, per table and per file
+        """
+        outcomes: Dict[str, int] = {}
+        for values in self.files.values():
+            outcomes[values['outcome']] = outcomes.get(values['outcome'], 0) + 1
+
+        return {
+            'totals': {
+                'files': len(self.files),
+                'outcomes': outcomes,
+                'seconds': sum(values['seconds'] for values in self.files.values()),
+                'size_in': sum(values['size_in'] for values in self.files.values()),
+                'size_out': sum(values['size_out'] for values in self.files.values()),
+            },
+            'handlers': self.handlers,
+            'tables': self.tables,
+            'files': self.files,
+        }
+
+    def write_report(self, path: str):
+        """
+        Write the report as JSON.
+
+        Args:
+            path: Path of the report file
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
@@ -1,6 +1,12 @@
-from typing import List, Set
-import re
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from itertools import chain, islice
+from typing import IO, Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
 
+from sql_cleaner.processor.cleaning_plan import CleaningPlan
 from sql_cleaner.processor.handler import SQLHandler
 from sql_cleaner.processor.insert_handler import InsertHandler
 from sql_cleaner.processor.where_handler import WhereHandler
@@ -8,16 +14,50 @@ from sql_cleaner.processor.join_handler import JoinHandler
 from sql_cleaner.processor.delete_handler import DeleteHandler
 from sql_cleaner.processor.update_handler import UpdateHandler
 from sql_cleaner.processor.comment_removal_handler import CommentRemovalHandler
-from sql_cleaner.processor.utils import extract_table_names, find_table_aliases
+from sql_cleaner.processor.copy_data import COPY_DATA, COPY_HEADER, STATEMENT, CopyBlock, CopyDataFilter, \
+    iter_copy_blocks, iter_copy_sections, iter_row_chunks
+from sql_cleaner.processor.data_dump import ALWAYS, DATA_DUMP_MODES, NEVER, DataDumpCleaner
+from sql_cleaner.processor.profiler import Profiler
+from sql_cleaner.processor.statement import ChangeRenderer
+from sql_cleaner.processor.utils import extract_table_names, iter_chunks
+
+
+class ProcessStats(NamedTuple):
+    """Figures of one piece of content processed by SQLProcessor.process_many."""
+    size_in: int
+    size_out: int
+    seconds: float
+    # False when the content references none of the tables and was returned as is
+    matched: bool
 
 
 class SQLProcessor:
     """
     Main processor that chains together handlers to process SQL content.
+    
+    Wherever a list of tables is expected, a CleaningPlan built once for the whole run
+    can be passed instead.
+    
+    Data dumps (INSERT, UPDATE and DELETE statements only) can be cleaned without the chain,
+    keeping every byte that does not have to change; see DataDumpCleaner and data_dump.
+    
+    The rows of COPY ... FROM stdin statements never go through the chain: they are filtered
+    line by line with CopyDataFilter, and only the SQL between them is processed as usual.
     """
     
-    def __init__(self):
-        """Initialize the chain of responsibility for SQL processing."""
+    def __init__(self, profiler: Optional[Profiler] = None, data_dump: str = NEVER):
+        """
+        Initialize the chain of responsibility for SQL processing.
+        
+        Args:
+            profiler: Profiler to record the work of every handler with, if any
+            data_dump: 'never' to process all content with the chain, 'auto' to clean content
+                that turns out to be a data dump in place, 'always' to clean all content in
+                place and send only the statements that need it through the chain
+        """
+        if data_dump not in DATA_DUMP_MODES:
+            raise ValueError(f"Unknown data dump mode: {data_dump!r}")
+        self.data_dump = data_dump
         # Create handlers
         comment_removal_handler = CommentRemovalHandler()
         insert_handler = InsertHandler()
@@ -33,6 +73,21 @@ class SQLProcessor:
         delete_handler.set_next(update_handler)
         # The first handler in the chain
         self.handler = comment_removal_handler
+        self.profiler: Optional[Profiler] = None
+        self.set_profiler(profiler)
+    
+    def set_profiler(self, profiler: Optional[Profiler]):
+        """
+        Attach a profiler to every handler in the chain, or detach it with None.
+        
+        Args:
+            profiler: Profiler to record the work of the handlers with
+        """
+        self.profiler = profiler
+        handler = self.handler
+        while handler is not None:
+            handler.profiler = profiler
+            handler = handler._next_handler
     
     def extract_table_names(self, content: str) -> Set[str]:
         """
@@ -67,88 +122,395 @@ class SQLProcessor:
         if not self.content_contains_tables(content, tables_to_process):
             return content
         
-        # Process the content through the chain of handlers
-        processed_content = self.handler.handle(content, tables_to_process)
+        return self._process_matched(content, tables_to_process)
+    
+    def _process_matched(self, content: str, tables_to_process: List[str]) -> str:
+        """
+        Process content that references the tables, keeping the file when nothing is left of it.
+        
+        Args:
+            content: SQL content to process
+            tables_to_process: List of tables to process
+            
+        Returns:
+            Processed SQL content
+        """
+        blocks = iter_copy_blocks(content)
+        first_block = next(blocks, None)
+        if first_block is None:
+            processed_content = self._clean(content, tables_to_process)
+        else:
+            processed_content = self._clean_with_copy_data(content, tables_to_process, chain([first_block], blocks))
         
         # If the processed content is empty, add a comment to preserve the file
         if not processed_content.strip():
-            original_table_list = ", ".join(sorted(self.extract_table_names(content)))
-            return f"-- All content was removed by sql_cleaner\n-- Original tables: {original_table_list}\n"
+            return _removed_content_placeholder(self.extract_table_names(content))
+        return processed_content
+    
+    def _clean(self, content: str, tables_to_process: List[str]) -> str:
+        """
+        Clean SQL content without COPY data, as a data dump or through the chain.
+        
+        Args:
+            content: SQL content to process
+            tables_to_process: List of tables to process
+            
+        Returns:
+            Processed SQL content, empty when everything was removed
+        """
+        if self.data_dump == NEVER:
+            return self._process_through_chain(content, tables_to_process)
+        
+        start = time.perf_counter()
+        cleaner = DataDumpCleaner(tables_to_process, self.handler if self.data_dump == ALWAYS else None)
+        processed_content = cleaner.clean(content)
+        if self.profiler is not None:
+            self.profiler.record_handler('data_dump', time.perf_counter() - start, cleaner.statements_in,
+                                         cleaner.statements_out, len(content),
+                                         len(processed_content) if processed_content is not None else len(content))
         
+        if processed_content is None:
+            # Not a data dump
+            return self._process_through_chain(content, tables_to_process)
         return processed_content
     
-    def content_contains_tables(self, content: str, tables_to_process: List[str]) -> bool:
+    def _clean_with_copy_data(self, content: str, tables_to_process: List[str], blocks: Iterable[CopyBlock]) -> str:
         """
-        Check if any of the target tables exist in the content.
+        Clean SQL content with COPY ... FROM stdin statements, filtering their rows without the chain.
         
         Args:
-            content: SQL content to check
-            tables_to_process: List of tables to check for
+            content: SQL content to process
+            tables_to_process: List of tables to process
+            blocks: The COPY statements of the content and their data
             
         Returns:
-            True if any target table exists in the content, False otherwise
+            Processed SQL content, empty when everything was removed
+        """
+        plan = CleaningPlan.of(tables_to_process)
+        pieces = []
+        pos = 0
+        # Whether the last line of the output so far is blank; the rows of a kept statement start
+        # on the line after it, so the statement needs a line of its own
+        at_line_start = True
+        seconds = 0.0
+        blocks_in = blocks_out = size_in = size_out = 0
+        
+        for block in blocks:
+            segment = self._clean_segment(content[pos:block.start], plan)
+            pieces.append(segment)
+            at_line_start = _at_line_start(segment, at_line_start)
+            
+            start = time.perf_counter()
+            copy_filter = CopyDataFilter(content[block.start:block.data_start], plan)
+            blocks_in += 1
+            size_in += block.end - block.start
+            if not copy_filter.removed:
+                if not at_line_start:
+                    pieces.append('\n')
+                at_line_start = True
+                if not copy_filter.changed:
+                    # Neither the statement nor its rows change; copy the block in one piece
+                    block_pieces = [content[block.start:block.end]]
+                else:
+                    block_pieces = [copy_filter.header]
+                    block_pieces.extend(copy_filter.filter_rows(rows)
+                                        for rows in iter_row_chunks(content, block.data_start, block.data_end))
+                    block_pieces.append(content[block.data_end:block.end])
+                pieces.extend(block_pieces)
+                blocks_out += 1
+                size_out += sum(len(piece) for piece in block_pieces)
+            seconds += time.perf_counter() - start
+            pos = block.end
+        
+        pieces.append(self._clean_segment(content[pos:], plan))
+        if self.profiler is not None:
+            self.profiler.record_handler('copy_data', seconds, blocks_in, blocks_out, size_in, size_out)
+        return ''.join(pieces)
+    
+    def _clean_segment(self, segment: str, plan: CleaningPlan) -> str:
+        """Clean the SQL between two COPY statements, if it references the tables."""
+        if not plan.prefilter.contains(segment):
+            return segment
+        return self._clean(segment, plan)
+    
+    def _process_through_chain(self, content: str, tables_to_process: List[str]) -> str:
+        """
+        Process content that references the tables through the chain of handlers.
+        
+        Args:
+            content: SQL content to process
+            tables_to_process: List of tables to process
+            
+        Returns:
+            Processed SQL content, empty when everything was removed
+        """
+        return self.handler.handle(content, tables_to_process)
+    
+    def process_many(self, items: Iterable[Tuple[Any, str]], tables_to_process: List[str],
+                     executor: Optional[Executor] = None, batch_size: int = 64) -> Iterator[Tuple[Any, str, ProcessStats]]:
+        """
+        Process many pieces of SQL content with the same tables, lazily and in order.
+        
+        The table patterns are compiled once for the whole batch. Content that references none
+        of the tables is returned as is after a single prefilter scan. With an executor, the
+        items are sent to it in batches and only a bounded number of batches is in flight, so
+        items may come from a generator of any length; a ProcessPoolExecutor spreads the work
+        over several CPUs, with one processor per worker.
+        
+        Args:
+            items: Pairs of a key, returned with the result, and SQL content
+            tables_to_process: List of tables to process; when empty, every piece of content is
+                processed for the tables found in it, as with process_sql_content
+            executor: Executor to process the items in (defaults to processing them in this thread)
+            batch_size: Number of items sent to the executor at a time
+            
+        Yields:
+            The key, the processed content and its figures, in the order of items
+        """
+        if executor is None:
+            plan = CleaningPlan.of(tables_to_process)
+            for key, content in items:
+                result, stats = self._process_one(content, plan)
+                yield key, result, stats
+            return
+        
+        tables = list(tables_to_process or ())
+        # Enough batches to keep every worker busy while the results of the first are consumed
+        max_pending = 2 * (getattr(executor, '_max_workers', None) or os.cpu_count() or 1)
+        pending: Deque[Future] = deque()
+        items = iter(items)
+        while True:
+            batch = list(islice(items, batch_size))
+            if batch:
+                pending.append(executor.submit(_process_batch, batch, tables, self.data_dump))
+            if pending and (not batch or len(pending) >= max_pending):
+                yield from pending.popleft().result()
+            elif not batch:
+                return
+    
+    def _process_one(self, content: str, plan: CleaningPlan) -> Tuple[str, ProcessStats]:
+        """
+        Process one piece of content for process_many.
+        
+        Args:
+            content: SQL content to process
+            plan: Plan of the tables to process; an empty plan uses the tables found in the content
+            
+        Returns:
+            The processed content and its figures
+        """
+        start = time.perf_counter()
+        if content and not plan:
+            plan = CleaningPlan.of(sorted(self.extract_table_names(content)))
+        
+        # Stops at the first reference, unlike find_tables which scans all of the content
+        matched = bool(content) and plan.prefilter.contains(content)
+        result = self._process_matched(content, plan) if matched else content
+        
+        return result, ProcessStats(len(content), len(result), time.perf_counter() - start, matched)
+    
+    async def process_async(self, content: str, tables_to_process: List[str] = None,
+                            executor: Optional[Executor] = None) -> str:
+        """
+        Process SQL content without blocking the event loop.
+        
+        The handler chain runs in the executor; the processor holds no per-call state, so
+        concurrent calls from a thread pool are safe. With a process pool the processor is
+        pickled with every call; process_files_async avoids that for whole files.
+        
+        Args:
+            content: SQL content to process
+            tables_to_process: List of tables to process
+            executor: Executor to run the handlers in (defaults to the loop's default executor)
+            
+        Returns:
+            Processed SQL content
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.process_sql_content, content, tables_to_process)
+    
+    def process_stream(self, chunks: Union[IO[str], Iterable[str]], tables_to_process: List[str]) -> Iterator[str]:
+        """
+        Process SQL content from a stream, one statement at a time.
+        
+        Only the statement being read is held in memory, so the input may be larger than
+        the available memory. Statements that do not reference any of the tables are passed
+        through verbatim; the others go through the chain of handlers, which keeps what it
+        does not change as it is. The rows of COPY ... FROM stdin statements are filtered in
+        chunks of lines as they are read.
+        
+        Args:
+            chunks: File object opened in text mode, or an iterable of text chunks
+            tables_to_process: List of tables to process; without tables the input is passed through
+            
+        Returns:
+            Iterator over processed SQL chunks
         """
         if not tables_to_process:
-            return False
+            yield from iter_chunks(chunks)
+            return
         
-        content_lower = content.lower()
+        plan = CleaningPlan.of(tables_to_process)
+        prefilter = plan.prefilter
+        original_tables = set()
+        # Whether any statement references the tables, as content_contains_tables checks
+        matched = False
+        # Whitespace output before anything else, which only stays if something follows
+        leading = ''
+        emitted = False
+        # Statements are rendered like those of the content between COPY blocks in _clean_with_copy_data
+        renderer = ChangeRenderer()
+        at_line_start = True
+        copy_filter: Optional[CopyDataFilter] = None
         
-        # Extract table names from the content
-        tables_in_content = self.extract_table_names(content)
+        def give(output: str) -> str:
+            nonlocal leading, emitted
+            if emitted or not output:
+                return output
+            if output.isspace():
+                leading += output
+                return ''
+            emitted = True
+            output, leading = leading + output, ''
+            return output
         
-        # Check against each table to process (case insensitive)
-        for table in tables_to_process:
-            table_lower = table.lower()
+        for kind, text in iter_copy_sections(iter_chunks(chunks)):
+            if kind != STATEMENT and kind != COPY_HEADER:
+                # Rows of the last COPY statement and the line that ends them
+                output = '' if copy_filter.removed else give(
+                    copy_filter.filter_rows(text) if kind == COPY_DATA else text)
+                if output:
+                    yield output
+                continue
             
-            # Check if table exists in set of extracted tables
-            if table_lower in tables_in_content:
-                return True
+            # Table names are only needed for the placeholder of a fully removed file
+            if not emitted:
+                original_tables.update(self.extract_table_names(text))
             
-            # Look for other references that might not be caught by extract_table_names
-            if self._check_table_references(content, table):
-                return True
+            if kind == COPY_HEADER:
+                copy_filter = CopyDataFilter(text, plan)
+                matched = matched or prefilter.contains(text)
+                output = renderer.keep(copy_filter.prefix) + renderer.finish()
+                renderer = ChangeRenderer()
+                at_line_start = _at_line_start(output, at_line_start)
+                if not copy_filter.removed:
+                    # The rows start on the line after the statement
+                    if not at_line_start:
+                        output += '\n'
+                    output += copy_filter.header
+                    at_line_start = True
+            elif not prefilter.contains(text):
+                output = renderer.keep(text)
+            else:
+                matched = True
+                output = self.handler.handle(text, tables_to_process, renderer)
             
-            # Check for table ID references (like 'table_id' column)
-            if f"{table_lower}_id" in content_lower:
-                return True
+            if output:
+                if kind == STATEMENT:
+                    at_line_start = _at_line_start(output, at_line_start)
+                output = give(output)
+                if output:
+                    yield output
         
-        return False
+        output = give(renderer.finish())
+        if output:
+            yield output
+        elif not emitted and matched:
+            # Same placeholder as process_sql_content, so the file is preserved
+            yield _removed_content_placeholder(original_tables)
+        elif leading:
+            yield leading
     
-    def _check_table_references(self, content: str, table_name: str) -> bool:
+    def content_contains_tables(self, content: str, tables_to_process: List[str]) -> bool:
         """
-        Check for table references in ways not caught by extract_table_names.
+        Check if any of the target tables exist in the content.
         
         Args:
             content: SQL content to check
-            table_name: Table name to check for
+            tables_to_process: List of tables to check for
             
         Returns:
-            True if table is referenced, False otherwise
+            True if any target table exists in the content, False otherwise
+        """
+        if not tables_to_process:
+            return False
+        
+        return CleaningPlan.of(tables_to_process).prefilter.contains(content)
+    
+    def data_may_contain_tables(self, data: Union[bytes, bytearray, memoryview], tables_to_process: List[str]) -> bool:
         """
-        content_lower = content.lower()
-        table_lower = table_name.lower()
+        Check raw UTF-8 content for the target tables without decoding it.
         
-        # Check for table name in joins
-        if f"join {table_lower}" in content_lower:
-            return True
+        Used to rule out files before reading them as text; when this returns False,
+        content_contains_tables would return False for the decoded content as well.
         
-        # Check for table name in WHERE clauses (table reference or table_id reference)
-        if f"{table_lower}." in content_lower or f"{table_lower}_id" in content_lower:
-            return True
+        Args:
+            data: UTF-8 encoded SQL content, e.g. a memory-mapped file
+            tables_to_process: List of tables to check for
+            
+        Returns:
+            False if no target table is referenced, True if one may be
+        """
+        if not tables_to_process:
+            return False
         
-        # Check for direct table name mentioned in FROM clause
-        if re.search(rf'from\s+{table_lower}\b', content_lower):
-            return True
+        return CleaningPlan.of(tables_to_process).prefilter.may_contain(data)
+    
+    def find_target_tables(self, content: str, tables_to_process: List[str]) -> Set[str]:
+        """
+        Find which of the target tables are referenced in the content.
         
-        # Check for direct table name mentioned in INSERT, UPDATE, DELETE
-        if re.search(rf'insert\s+into\s+{table_lower}\b', content_lower) or \
-           re.search(rf'update\s+{table_lower}\b', content_lower) or \
-           re.search(rf'delete\s+from\s+{table_lower}\b', content_lower):
-            return True
+        Args:
+            content: SQL content to check
+            tables_to_process: List of tables to check for
+            
+        Returns:
+            Set of lower-cased names of the referenced target tables
+        """
+        if not tables_to_process:
+            return set()
         
-        # Find table aliases and check for references through them
-        for alias in find_table_aliases(content, table_name):
-            if f"{alias}." in content_lower:
-                return True
+        return CleaningPlan.of(tables_to_process).prefilter.find_tables(content)
+
+
+def _at_line_start(text: str, at_line_start: bool) -> bool:
+    """Check whether output is at the start of a line after text, given whether it was before."""
+    line_start = text.rfind('\n') + 1
+    if line_start:
+        return not text[line_start:].strip(' \t')
+    return at_line_start and not text.strip(' \t')
+
+
+def _removed_content_placeholder(original_tables: Set[str]) -> str:
+    """Content that keeps a file whose statements were all removed, naming the tables it had."""
+    original_table_list = ", ".join(sorted(original_tables))
+    return f"-- All content was removed by sql_cleaner\n-- Original tables: {original_table_list}\n"
+
+
+# Processors of the current process, one per data dump mode, created on first use
+_worker_processors: Dict[str, SQLProcessor] = {}
+
+
+def worker_processor(data_dump: str = NEVER) -> SQLProcessor:
+    """
+    Get the processor of the current process for work sent to an executor.
+    
+    Every worker of a process pool builds its own processor once. The threads of a thread
+    pool share it; it is never changed after it is built, so calls with different modes
+    can run at the same time.
+    
+    Args:
+        data_dump: Data dump mode of the processor
         
-        return False 
\ No newline at end of file
+    Returns:
+        Processor without a profiler
+    """
+    processor = _worker_processors.get(data_dump)
+    if processor is None:
+        processor = _worker_processors.setdefault(data_dump, SQLProcessor(data_dump=data_dump))
+    return processor
+
+
+def _process_batch(batch: List[Tuple[Any, str]], tables_to_process: List[str],
+                   data_dump: str = NEVER) -> List[Tuple[Any, str, ProcessStats]]:
+    return list(worker_processor(data_dump).process_many(batch, tables_to_process))
@@ -0,0 +1,454 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sql_cleaner.processor.edits import Edit, apply_edits, check_edits
+from sql_cleaner.processor.lexer import (
+    LPAREN, RPAREN, WORD, Token, iter_significant_tokens, iter_statement_spans, leading_keyword, significant_tokens
+)
+from sql_cleaner.processor.utils import get_statement_target
+
+
+# Statement kinds
+INSERT = 'INSERT'
+SELECT = 'SELECT'
+UPDATE = 'UPDATE'
+DELETE = 'DELETE'
+DDL = 'DDL'
+OTHER = 'OTHER'
+
+_DDL_KEYWORDS = frozenset(["CREATE", "ALTER", "DROP", "TRUNCATE", "COMMENT", "GRANT", "REVOKE"])
+
+# Leading keywords of the statements that have a target table, and how to read it
+_TARGET_KEYWORDS = {
+    INSERT: ("insert", "into"),
+    UPDATE: ("update",),
+    DELETE: ("delete", "from"),
+}
+
+# Keywords that start the rows of an INSERT statement
+VALUES = 'VALUES'
+_INSERT_SOURCES = frozenset([VALUES, "VALUE", "SELECT", "WITH", "DEFAULT", "TABLE"])
+_DATA_SOURCES = frozenset([VALUES, "VALUE", "DEFAULT"])
+
+# Every statement kind
+STATEMENT_KINDS = frozenset([INSERT, SELECT, UPDATE, DELETE, DDL, OTHER])
+
+# The common INSERT header, without comments or quoted names in the column list
+_INSERT_HEADER_PATTERN = re.compile(
+    r'\s*insert\s+into\s+(\w+(?:\.\w+)*)\s*(?:\([^()\'"`;/-]*\)\s*)?(\(\s*)?([a-z]+)\b', re.IGNORECASE)
+
+_NON_WHITESPACE = re.compile(r'\S')
+_SPACES_PATTERN = re.compile(r'[ \t]*')
+_LINE_BREAK_PATTERN = re.compile(r'\r?\n')
+_ALIAS_PATTERN = re.compile(r'(?:from|join)\s+(\w+)(?=\s+(?:as\s+)?(\w+))', re.IGNORECASE)
+
+
+class Statement:
+    """
+    A single SQL statement in the handler chain.
+
+    The statement refers to its text by offsets into the buffer it was parsed from, so
+    parsing a file does not copy it. Once a handler rewrites a statement, the new text
+    replaces the buffer slice; the offsets keep pointing at the text it was parsed from.
+    """
+
+    __slots__ = ('buffer', 'start', 'end', 'kind', 'table', 'source', '_text', '_lower', '_aliases', '_normalized',
+                 '_tokens')
+
+    def __init__(self, buffer: str, start: int, end: int, kind: Optional[str] = None, table: Optional[str] = None,
+                 source: Optional[str] = None):
+        """
+        Initialize the statement.
+
+        Args:
+            buffer: Text the statement was parsed from
+            start: Start offset of the statement in the buffer
+            end: End offset of the statement in the buffer
+            kind: Statement kind (INSERT, SELECT, UPDATE, DELETE, DDL or OTHER)
+            table: Lower-cased target table for INSERT, UPDATE and DELETE statements
+            source: Keyword that starts the rows of an INSERT statement, e.g. VALUES or SELECT
+        """
+        self.buffer = buffer
+        self.start = start
+        self.end = end
+        self.kind = kind
+        self.table = table
+        self.source = source
+        self._text = None
+        self._lower = None
+        self._aliases = None
+        self._normalized = None
+        self._tokens = None
+
+    @property
+    def text(self) -> str:
+        """The current text of the statement."""
+        if self._text is None:
+            return self.buffer[self.start:self.end]
+        return self._text
+
+    @text.setter
+    def text(self, value: str):
+        self._text = value
+        self._lower = None
+        self._aliases = None
+        self._tokens = None
+
+    def normalize(self, text: str):
+        """
+        Replace the text with an equivalent one for the handlers to work on, e.g. without comments.
+
+        Args:
+            text: Normalized text of the statement
+        """
+        self.text = text
+        self._normalized = text
+
+    @property
+    def rewritten(self) -> bool:
+        """Whether a handler changed the statement, beyond normalizing its text."""
+        return self._text is not None and self._text != self._normalized
+
+    @property
+    def lower(self) -> str:
+        """The lower-cased text of the statement, computed once per text change."""
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def tokens(self) -> List[Token]:
+        """The significant tokens of the text, lexed once per text change and shared by the handlers."""
+        if self._tokens is None:
+            self._tokens = significant_tokens(self.text)
+        return self._tokens
+
+    @property
+    def is_data(self) -> bool:
+        """Whether the statement is an INSERT of literal rows (VALUES or DEFAULT VALUES), without a query."""
+        return self.kind == INSERT and self.source in _DATA_SOURCES
+
+    @property
+    def aliases(self) -> Dict[str, List[str]]:
+        """Mapping of lower-cased table names to the aliases they are given in FROM/JOIN clauses."""
+        if self._aliases is None:
+            aliases = {}
+            for match in _ALIAS_PATTERN.finditer(self.text):
+                aliases.setdefault(match.group(1).lower(), []).append(match.group(2).lower())
+            self._aliases = aliases
+        return self._aliases
+
+    def __repr__(self) -> str:
+        return f"Statement({self.kind}, {self.table!r}, {self.text!r})"
+
+
+def classify_statement(buffer: str, start: int, end: int) -> str:
+    """
+    Determine the kind of a statement from its leading keyword.
+
+    Args:
+        buffer: Text the statement is in
+        start: Start offset of the statement
+        end: End offset of the statement
+
+    Returns:
+        Statement kind
+    """
+    keyword = leading_keyword(buffer, start, end)
+    if keyword in (INSERT, SELECT, UPDATE, DELETE):
+        return keyword
+    if keyword in _DDL_KEYWORDS:
+        return DDL
+    return OTHER
+
+
+def _match_insert_header(buffer: str, start: int, end: int) -> Optional[Tuple[str, str]]:
+    """Read the target table and row source of a plain INSERT statement with one pattern."""
+    match = _INSERT_HEADER_PATTERN.match(buffer, start, end)
+    if match is None:
+        return None
+    keyword = match.group(3).upper()
+    if keyword not in _INSERT_SOURCES or (match.group(2) is not None and keyword not in ("SELECT", "WITH")):
+        return None
+    return match.group(1).lower(), keyword
+
+
+def insert_source(buffer: str, start: int, end: int) -> Optional[str]:
+    """
+    Find out where the rows of an INSERT statement come from, reading only its header.
+
+    Args:
+        buffer: Text the statement is in
+        start: Start offset of the statement
+        end: End offset of the statement
+
+    Returns:
+        The upper-cased keyword that starts the rows (VALUES, SELECT, WITH, DEFAULT, ...),
+        or None if there is none
+    """
+    header = _match_insert_header(buffer, start, end)
+    if header is not None:
+        return header[1]
+
+    # Anything else, e.g. comments in the header, is read token by token
+    depth = 0
+    for token in iter_significant_tokens(buffer, start, end):
+        if token.type == LPAREN:
+            depth += 1
+        elif token.type == RPAREN:
+            depth -= 1
+        elif token.type == WORD and depth <= 1:
+            keyword = token.value.upper()
+            # 'INSERT INTO t (SELECT ...)' has its query in parentheses, like a column list
+            if keyword in _INSERT_SOURCES and (depth == 0 or keyword in ("SELECT", "WITH")):
+                return keyword
+    return None
+
+
+def parse_statement(content: str, start: int, end: int) -> Statement:
+    """
+    Classify one statement of SQL content and read its target table.
+
+    Args:
+        content: SQL content as a string
+        start: Start offset of the statement
+        end: End offset of the statement
+
+    Returns:
+        Statement referring to the content by offsets
+    """
+    kind = classify_statement(content, start, end)
+    table = source = None
+    if kind == INSERT:
+        header = _match_insert_header(content, start, end)
+        if header is not None:
+            table, source = header
+        else:
+            table = get_statement_target(content, _TARGET_KEYWORDS[kind], start, end)
+            source = insert_source(content, start, end)
+    elif kind in _TARGET_KEYWORDS:
+        table = get_statement_target(content, _TARGET_KEYWORDS[kind], start, end)
+    return Statement(content, start, end, kind, table, source)
+
+
+def parse_statements(content: str) -> List[Statement]:
+    """
+    Split SQL content into statements in a single pass.
+
+    Args:
+        content: SQL content as a string
+
+    Returns:
+        List of statements referring to the content by offsets
+    """
+    return [parse_statement(content, start, end) for start, end in iter_statement_spans(content)
+            if _NON_WHITESPACE.search(content, start, end) is not None]
+
+
+def rewrite_statement(text: str, edits: Iterable[Edit]) -> str:
+    """
+    Replace spans of a statement's text, building the new text once.
+
+    A removed span takes the whitespace before it along, so that no gap is left where it
+    was; everything else is copied as is. An edit within another one is dropped, as the
+    other edit replaces that part of the statement as a whole.
+
+    Args:
+        text: Text of the statement
+        edits: Spans of the text to replace
+
+    Returns:
+        The rewritten statement, or the text as is when there are no edits
+    """
+    widened = []
+    pos = 0
+    for start, end, replacement in check_edits(edits):
+        if not replacement:
+            while start > pos and text[start - 1].isspace():
+                start -= 1
+        widened.append(Edit(start, end, replacement))
+        pos = end
+    return apply_edits(text, widened)
+
+
+def render_changes(content: str, statements: Iterable[Statement], processed: Iterable[Statement],
+                   renderer: Optional['ChangeRenderer'] = None) -> str:
+    """
+    Apply what the handlers did to the statements to the content they were parsed from.
+
+    Everything the handlers did not change is copied as is: statements that were not
+    rewritten, with their formatting and comments, and the comments and whitespace between
+    statements. The changes are rendered by a ChangeRenderer.
+
+    Args:
+        content: SQL content the statements were parsed from
+        statements: Statements parsed from the content, in order
+        processed: Statements the handlers kept
+        renderer: Renderer of the content this is a piece of, when content is read piece by
+            piece; the output is then only complete with what its finish() returns
+
+    Returns:
+        SQL content with the changes applied, empty when the handlers left nothing but whitespace
+    """
+    kept = set(map(id, processed))
+    rendering = renderer if renderer is not None else ChangeRenderer()
+    pieces = []
+    # End of the content given to the renderer, and of the last statement
+    pos = statement_end = 0
+    for statement in statements:
+        piece_start, statement_end = statement_end, statement.end
+        removed = id(statement) not in kept
+        if not removed and not statement.rewritten:
+            continue
+        first = next(iter_significant_tokens(content, statement.start, statement.end), None)
+        if first is None:
+            # Nothing but comments, which the handlers drop; they stay as they are
+            continue
+        pieces.append(rendering.keep(content[pos:piece_start]))
+        text = content[piece_start:statement.end]
+        if removed:
+            pieces.append(rendering.drop(text, first.start - piece_start))
+        else:
+            pieces.append(rendering.rewrite(text, first.start - piece_start, statement.text.strip()))
+        pos = statement.end
+    pieces.append(rendering.keep(content[pos:]))
+    if renderer is None:
+        pieces.append(rendering.finish())
+    return ''.join(pieces)
+
+
+class ChangeRenderer:
+    """
+    Renders the changes of the handlers to SQL content given piece by piece, in order.
+
+    The content is given as the text the handlers kept as it is and as the statements they
+    rewrote or dropped, each with the comments and whitespace before it, so the output does
+    not depend on how the content is cut: a whole file and the statements of a stream render
+    alike. A rewritten statement is replaced from its first token on. A dropped statement
+    leaves no empty line or gap: when it ends its line it takes the line break before it, or
+    at the start of the content the one after it; otherwise the spaces after it. Statements
+    dropped one after another, with only whitespace between them, are dropped as one.
+
+    Only the whitespace at the end of the output is held back, as a dropped statement may take
+    part of it; what comes after a dropped statement decides how much.
+    """
+
+    def __init__(self):
+        # Whitespace at the end of the output, not given out yet
+        self._held = ''
+        # Whether statements are being dropped, and the whitespace before the first of them
+        self._dropping = False
+        self._before = ''
+        # Whether only spaces and tabs come before the statements being dropped
+        self._at_start = False
+        # Whether anything but whitespace was given out, and whether anything was changed
+        self._emitted = False
+        self._changed = False
+
+    def keep(self, text: str) -> str:
+        """
+        Render text the handlers kept as it is.
+
+        Args:
+            text: Text after what was given so far
+
+        Returns:
+            Output, without the whitespace at its end
+        """
+        if self._dropping and text:
+            text = text[self._settle(text):]
+        return self._give(text)
+
+    def rewrite(self, text: str, start: int, new_text: str) -> str:
+        """
+        Render a statement the handlers rewrote.
+
+        Args:
+            text: Text of the statement and of the comments and whitespace before it
+            start: Position of the statement's first token in text
+            new_text: Text that replaces the statement
+
+        Returns:
+            Output, without the whitespace at its end
+        """
+        cut = self._settle(text) if self._dropping else 0
+        self._changed = True
+        return self._give(text[cut:start] + new_text)
+
+    def drop(self, text: str, start: int) -> str:
+        """
+        Render a statement the handlers dropped.
+
+        Args:
+            text: Text of the statement and of the comments and whitespace before it
+            start: Position of the statement's first token in text
+
+        Returns:
+            Output, without the whitespace at its end
+        """
+        cut = 0
+        if self._dropping:
+            if _NON_WHITESPACE.search(text, 0, start) is None:
+                return ''
+            cut = self._settle(text)
+        given = self._give(text[cut:start])
+        self._before, self._held = self._held, ''
+        self._at_start = not self._emitted and not self._changed and not self._before.strip(' \t')
+        self._dropping = self._changed = True
+        return given
+
+    def finish(self) -> str:
+        """
+        Render the end of the content.
+
+        Returns:
+            The rest of the output: the whitespace at its end, or nothing when there were
+            changes and nothing but whitespace is left
+        """
+        if self._dropping:
+            self._settle('')
+        held, self._held = self._held, ''
+        return held if self._emitted or not self._changed else ''
+
+    def _give(self, text: str) -> str:
+        end = len(text)
+        while end and text[end - 1].isspace():
+            end -= 1
+        if not end:
+            self._held += text
+            return ''
+        given = self._held + text[:end] if self._held else text[:end]
+        self._held = text[end:]
+        self._emitted = True
+        return given
+
+    def _settle(self, text: str) -> int:
+        """Decide what the dropped statements take along, from the text after them; returns how much of it."""
+        self._dropping = False
+        after = _SPACES_PATTERN.match(text).end()
+        line_break = _LINE_BREAK_PATTERN.match(text, after)
+        before = self._before
+        line = before.rstrip(' \t')
+        if after < len(text) and line_break is None:
+            # Something follows on the same line
+            self._held = before
+        elif line.endswith('\n'):
+            self._held = line[:-2] if line.endswith('\r\n') else line[:-1]
+        elif self._at_start and line_break is not None:
+            return line_break.end()
+        else:
+            self._held = line
+        return after
+
+
+def render_statements(statements: Iterable[Statement]) -> str:
+    """
+    Serialize statements back into SQL content.
+
+    Args:
+        statements: Statements to serialize
+
+    Returns:
+        SQL content with statements separated by single spaces
+    """
+    return ' '.join(text for text in (statement.text.strip() for statement in statements) if text)
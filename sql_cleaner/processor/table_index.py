@@ -0,0 +1,255 @@
+import os
+import pathlib
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sql_cleaner.processor.table_prefilter import _UNICODE_CASE_VARIANTS
+
+
+INDEX_FILE_NAME = '.sql_cleaner_index.sqlite'
+
+# Bump when the names recorded for a file change, so that every file is scanned again
+INDEX_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+CREATE TABLE IF NOT EXISTS mentions (
+    name_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    offsets TEXT NOT NULL,
+    PRIMARY KEY (name_id, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS mentions_by_file ON mentions (file_id);
+"""
+
+# Every way the table prefilter can see a table in a file, as the word that contains the
+# table name: the word after FROM, UPDATE, INTO, JOIN or COPY and after its schema, a word
+# followed by '.', and a word containing '_id'. Lookaheads keep one match from hiding the next one.
+_NAME_PATTERNS = [
+    re.compile(r'(?:from|update|into|join|copy)\s+(?=(\w+))', re.IGNORECASE),
+    re.compile(r'(?:from|update|into|join|copy)\s+\w+\.(?=(\w+))', re.IGNORECASE),
+    re.compile(r'(\w+)\.'),
+    re.compile(r'(\w*_id\w*)', re.IGNORECASE),
+]
+
+# Case folding of the names, matching the case-insensitive patterns of the handlers
+_FOLD = str.maketrans({variant: letter for letter, variants in _UNICODE_CASE_VARIANTS.items()
+                       for variant in variants})
+
+_WORD = re.compile(r'\w+')
+
+# Maximum number of variables in one SQLite statement on old versions
+_MAX_VARIABLES = 900
+
+
+def _fold(name: str) -> str:
+    return name.translate(_FOLD).lower()
+
+
+def scan_names(data: bytes) -> Dict[str, List[int]]:
+    """
+    Find the words in a file that may refer to a table, with their byte offsets.
+
+    A table that the table prefilter finds in the file is always part of one of these words,
+    e.g. 'company' of 'company_id' or 'public.company'.
+
+    Args:
+        data: Raw UTF-8 content of the file
+
+    Returns:
+        Lower-cased words mapped to the sorted byte offsets where they occur
+    """
+    text = data.decode('utf-8', errors='surrogateescape')
+    positions = sorted(set((match.start(1), match.group(1))
+                           for pattern in _NAME_PATTERNS for match in pattern.finditer(text)))
+
+    names: Dict[str, List[int]] = {}
+    # Character positions equal byte offsets unless the file has multi-byte characters
+    ascii_only = len(text) == len(data)
+    offset = last = 0
+    for position, word in positions:
+        if ascii_only:
+            offset = position
+        else:
+            offset += len(text[last:position].encode('utf-8', errors='surrogateescape'))
+            last = position
+        names.setdefault(_fold(word), []).append(offset)
+
+    return names
+
+
+class TableIndex:
+    """
+    Inverted index from table and column names to the files that mention them, kept in SQLite.
+
+    The index is updated incrementally: only files whose size or modification time changed
+    since they were last scanned are read again. Queries return a superset of the files that
+    reference a table, so an indexed run opens only those files and lets the processor decide.
+    Paths are stored relative to the indexed directory.
+    """
+
+    def __init__(self, directory: str, path: Optional[str] = None, read_only: bool = False):
+        """
+        Open the index of a directory, creating it when there is none.
+
+        Args:
+            directory: Directory the files are in
+            path: Path of the index file (defaults to INDEX_FILE_NAME in the directory)
+            read_only: Never write to disk; the index is copied into memory, where it is
+                created or rebuilt when needed and updated as usual, and save() keeps the
+                changes there
+        """
+        self.directory = directory
+        self.path = path or os.path.join(directory, INDEX_FILE_NAME)
+        self.read_only = read_only
+        if not read_only:
+            self._connection = sqlite3.connect(self.path)
+        else:
+            self._connection = sqlite3.connect(':memory:')
+            if os.path.exists(self.path):
+                source = sqlite3.connect(pathlib.Path(os.path.abspath(self.path)).as_uri() + '?mode=ro', uri=True)
+                try:
+                    source.backup(self._connection)
+                finally:
+                    source.close()
+        self._connection.executescript(_SCHEMA)
+
+        version = self._connection.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if version is None or version[0] != str(INDEX_VERSION):
+            self._connection.executescript("DELETE FROM mentions; DELETE FROM names; DELETE FROM files;")
+            self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+            self._connection.commit()
+
+    def _key(self, file_path) -> str:
+        return os.path.relpath(str(file_path), self.directory)
+
+    def update(self, file_paths: Iterable) -> int:
+        """
+        Scan new and changed files and forget files that are gone.
+
+        The changes are visible to this index at once and written to disk by save().
+
+        Args:
+            file_paths: Paths of all files that belong in the index
+
+        Returns:
+            Number of files that were scanned
+        """
+        connection = self._connection
+        known: Dict[str, Tuple[int, int, int]] = {
+            path: (file_id, size, mtime_ns)
+            for file_id, path, size, mtime_ns in connection.execute("SELECT id, path, size, mtime_ns FROM files")
+        }
+        name_ids: Dict[str, int] = dict(connection.execute("SELECT name, id FROM names"))
+        seen = set()
+        scanned = 0
+
+        for file_path in file_paths:
+            key = self._key(file_path)
+            seen.add(key)
+            try:
+                stat = os.stat(file_path)
+                row = known.get(key)
+                if row is not None and row[1:] == (stat.st_size, stat.st_mtime_ns):
+                    continue
+
+                with open(file_path, 'rb') as f:
+                    names = scan_names(f.read())
+            except OSError:
+                # Files that cannot be read are left to the processor to report
+                continue
+
+            if row is None:
+                file_id = connection.execute("INSERT INTO files (path, size, mtime_ns) VALUES (?, ?, ?)",
+                                             (key, stat.st_size, stat.st_mtime_ns)).lastrowid
+            else:
+                file_id = row[0]
+                connection.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                                   (stat.st_size, stat.st_mtime_ns, file_id))
+                connection.execute("DELETE FROM mentions WHERE file_id = ?", (file_id,))
+
+            mentions = []
+            for name, offsets in names.items():
+                name_id = name_ids.get(name)
+                if name_id is None:
+                    name_id = name_ids[name] = connection.execute(
+                        "INSERT INTO names (name) VALUES (?)", (name,)).lastrowid
+                mentions.append((name_id, file_id, ','.join(map(str, offsets))))
+            connection.executemany("INSERT INTO mentions VALUES (?, ?, ?)", mentions)
+            scanned += 1
+
+        removed = [(known[key][0],) for key in known.keys() - seen]
+        connection.executemany("DELETE FROM mentions WHERE file_id = ?", removed)
+        connection.executemany("DELETE FROM files WHERE id = ?", removed)
+
+        return scanned
+
+    def files_for_tables(self, tables: Iterable[str]) -> Optional[Set[str]]:
+        """
+        Find the files that may reference any of the tables.
+
+        Args:
+            tables: Names of the tables
+
+        Returns:
+            Paths of the files, or None when a table name is not a plain word and the index
+            cannot answer, in which case every file has to be checked
+        """
+        names = sorted(set(_fold(table) for table in tables if table), key=len, reverse=True)
+        if not names:
+            return set()
+        if not all(_WORD.fullmatch(name) for name in names):
+            return None
+
+        pattern = re.compile('|'.join(re.escape(name) for name in names))
+        name_ids = [name_id for name_id, name in self._connection.execute("SELECT id, name FROM names")
+                    if pattern.search(name)]
+
+        paths = set()
+        for i in range(0, len(name_ids), _MAX_VARIABLES):
+            batch = name_ids[i:i + _MAX_VARIABLES]
+            placeholders = ','.join('?' * len(batch))
+            paths.update(path for path, in self._connection.execute(
+                f"SELECT DISTINCT files.path FROM mentions JOIN files ON files.id = mentions.file_id "
+                f"WHERE mentions.name_id IN ({placeholders})", batch))
+
+        return set(os.path.join(self.directory, path) for path in paths)
+
+    def mentions(self, name: str) -> Dict[str, List[int]]:
+        """
+        Look up where a table or column name is mentioned.
+
+        Args:
+            name: Table name, or reference column such as 'company_id'
+
+        Returns:
+            Paths of the files mapped to the byte offsets of the name in them
+        """
+        rows = self._connection.execute(
+            "SELECT files.path, mentions.offsets FROM names "
+            "JOIN mentions ON mentions.name_id = names.id JOIN files ON files.id = mentions.file_id "
+            "WHERE names.name = ?", (_fold(name),))
+        return {os.path.join(self.directory, path): [int(offset) for offset in offsets.split(',')]
+                for path, offsets in rows}
+
+    def save(self):
+        """Write the changes made by update() to disk, or keep them in memory for a read-only index."""
+        self._connection.commit()
+
+    def close(self):
+        """Close the index, discarding changes that were not saved."""
+        self._connection.close()
+
+    def __enter__(self) -> 'TableIndex':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,185 @@
+import re
+from typing import AnyStr, Callable, Dict, Iterable, Optional, Set, Union
+
+
+# UTF-8 encodings of the non-ASCII characters that Python's case-insensitive matching
+# treats as equal to an ASCII letter: dotted and dotless I, the Kelvin sign and long s
+_UNICODE_CASE_VARIANTS = {
+    'i': ['\u0130', '\u0131'],
+    'k': ['\u212a'],
+    's': ['\u017f'],
+}
+
+
+def _ascii_bytes_pattern(text: str) -> bytes:
+    """
+    Build a bytes pattern matching UTF-8 encoded text the way a case-insensitive str pattern would.
+
+    Args:
+        text: ASCII text to match
+
+    Returns:
+        Pattern source, to be compiled with re.IGNORECASE
+    """
+    parts = []
+    for char in text:
+        escaped = re.escape(char).encode('ascii')
+        variants = _UNICODE_CASE_VARIANTS.get(char.lower())
+        if variants:
+            escaped = b'(?:' + b'|'.join([escaped] + [re.escape(v.encode('utf-8')) for v in variants]) + b')'
+        parts.append(escaped)
+    return b''.join(parts)
+
+
+def _trie_pattern(names: Iterable[str], escape: Callable[[str], AnyStr]) -> AnyStr:
+    """
+    Build a pattern matching any of the names, with the names merged into a trie.
+
+    The regex engine tries every branch of a plain alternation at every position, so a scan
+    would slow down with the number of names; branching on one character at a time keeps it
+    linear in the content. Like the alternation of the names from longest to shortest, the
+    pattern tries a longer name before any name that is a prefix of it.
+
+    Args:
+        names: Names to match
+        escape: Pattern of a single character, as a str or bytes pattern
+
+    Returns:
+        Pattern source, without capturing groups
+    """
+    trie: Dict[str, dict] = {}
+    for name in names:
+        node = trie
+        for char in name:
+            node = node.setdefault(char, {})
+        # The empty key marks the end of a name
+        node[''] = {}
+
+    empty = escape('')
+    literal = (lambda text: text) if isinstance(empty, str) else (lambda text: text.encode('ascii'))
+
+    def node_pattern(node: Dict[str, dict]) -> AnyStr:
+        branches = [escape(char) + node_pattern(child) for char, child in node.items() if char]
+        if not branches:
+            return empty
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = literal('(?:') + literal('|').join(branches) + literal(')')
+        return group + literal('?') if '' in node else group
+
+    return node_pattern(trie)
+
+
+class TablePrefilter:
+    """
+    Detects references to a fixed set of tables with a single compiled pattern.
+
+    The pattern is built once per table list and combines every check that decides whether
+    a file needs processing: the table after INSERT INTO, UPDATE, FROM, JOIN or COPY, with
+    or without its schema, a qualified column ('table.column') and a reference column
+    ('table_id'). One linear scan answers the question for all tables at once.
+    """
+
+    def __init__(self, tables: Iterable[str]):
+        """
+        Build the combined pattern for the given tables.
+
+        Args:
+            tables: Names of the tables to look for
+        """
+        self.tables = frozenset(table.lower() for table in tables if table)
+
+        if not self.tables:
+            self._pattern = None
+            return
+
+        # 'price_history' wins over 'price' at the same position
+        names = sorted(self.tables)
+        alternation = _trie_pattern(names, re.escape)
+
+        # The table after a keyword may be qualified with its schema, as in pg_dump output
+        self._pattern = re.compile(
+            rf'(?:insert\s+into|update|from|copy)\s+(?:\w+\.)?({alternation})\b'
+            rf'|join(?:\s+(?:\w+\.)?({alternation})\b| ({alternation}))'
+            rf'|({alternation})(?:_id|\.)',
+            re.IGNORECASE
+        )
+
+        # A looser pattern for raw bytes: any name followed by '_id', '.' or a character that
+        # is not an ASCII word character, or preceded by a space. Everything the text pattern
+        # matches in decoded content, this one matches in the UTF-8 bytes.
+        self._bytes_pattern: Optional[re.Pattern] = None
+        if all(ord(char) < 128 for name in names for char in name):
+            byte_names = _trie_pattern(names, _ascii_bytes_pattern)
+            self._bytes_pattern = re.compile(
+                b'(?:' + byte_names + b')(?:' + _ascii_bytes_pattern('_id') + rb'|\.|(?![A-Za-z0-9_]))'
+                rb'|(?<= )(?:' + byte_names + b')',
+                re.IGNORECASE
+            )
+
+    def contains(self, content: str) -> bool:
+        """
+        Check whether the content references any of the tables, stopping at the first hit.
+
+        Args:
+            content: SQL content to check
+
+        Returns:
+            True if any table is referenced, False otherwise
+        """
+        return self._pattern is not None and self._pattern.search(content) is not None
+
+    def find(self, content: str, start: int = 0) -> int:
+        """
+        Find the next reference to any of the tables.
+
+        Args:
+            content: SQL content to search
+            start: Position to search from
+
+        Returns:
+            Position where the reference starts, or -1 if there is none
+        """
+        match = self._pattern.search(content, start) if self._pattern is not None else None
+        return match.start() if match is not None else -1
+
+    def may_contain(self, data: Union[bytes, bytearray, memoryview]) -> bool:
+        """
+        Check raw UTF-8 content, e.g. a memory-mapped file, without decoding it.
+
+        A negative answer is exact: contains() would be False for the decoded content too.
+        A positive answer only means the content has to be decoded and checked. Table names
+        that are not ASCII cannot be matched in bytes, so for them the answer is always True.
+
+        Args:
+            data: UTF-8 encoded SQL content, or any object supporting the buffer protocol
+
+        Returns:
+            False if none of the tables is referenced, True if any may be
+        """
+        if self._pattern is None:
+            return False
+        if self._bytes_pattern is None:
+            return True
+        return self._bytes_pattern.search(data) is not None
+
+    def find_tables(self, content: str) -> Set[str]:
+        """
+        Find which of the tables the content references.
+
+        Args:
+            content: SQL content to check
+
+        Returns:
+            Lower-cased names of the referenced tables
+        """
+        if self._pattern is None:
+            return set()
+
+        found = set()
+        for match in self._pattern.finditer(content):
+            found.add(match.group(match.lastindex).lower())
+            if len(found) == len(self.tables):
+                break
+
+        return found
@@ -1,5 +1,9 @@
 import re
-from typing import List, Dict, Set, Tuple
+from typing import IO, Iterable, Iterator, List, Dict, Optional, Set, Tuple, Union
+
+from sql_cleaner.processor.lexer import (
+    DOT, QUOTED_IDENTIFIER, WORD, iter_significant_tokens, iter_statement_spans, iter_statement_texts
+)
 
 
 def preprocess_content(content: str) -> str:
@@ -42,6 +46,8 @@ def extract_table_names(content: str) -> Set[str]:
     # Find table names from "FROM TABLE" statements
     from_pattern = re.compile(r'from\s+(\w+)(?:\s+|$|\s*;)', re.IGNORECASE)
     tables.update(match.group(1).lower() for match in from_pattern.finditer(content))
+    # COPY ... FROM stdin reads rows, not a table
+    tables.discard('stdin')
     
     # Find table names from "JOIN TABLE" statements
     join_pattern = re.compile(r'join\s+(\w+)', re.IGNORECASE)
@@ -55,6 +61,10 @@ def extract_table_names(content: str) -> Set[str]:
     update_pattern = re.compile(r'update\s+(\w+)', re.IGNORECASE)
     tables.update(match.group(1).lower() for match in update_pattern.finditer(content))
     
+    # Find table names from "COPY [schema.]TABLE" statements
+    copy_pattern = re.compile(r'copy\s+(?:\w+\.)?(\w+)', re.IGNORECASE)
+    tables.update(match.group(1).lower() for match in copy_pattern.finditer(content))
+    
     # Additional checks for references to fields with table_id suffix
     table_id_pattern = re.compile(r'(\w+)_id', re.IGNORECASE)
     potential_table_ids = [match.group(1) for match in table_id_pattern.finditer(content_lower)]
@@ -75,38 +85,74 @@ def split_into_statements(content: str) -> List[str]:
     Returns:
         List of SQL statements
     """
-    # Preprocess to ensure proper formatting
-    content = preprocess_content(content)
+    # Normalize line endings
+    content = content.replace('\r\n', '\n').replace('\r', '\n')
     
-    # Split on semicolons, but handle those within quotes
     statements = []
-    current_statement = []
-    in_string = False
-    string_delimiter = None
+    for start, end in iter_statement_spans(content):
+        statement = content[start:end].strip()
+        if statement:
+            statements.append(statement)
     
-    for char in content:
-        # Handle string boundaries
-        if char in ["'", '"']:
-            if not in_string:
-                in_string = True
-                string_delimiter = char
-            elif string_delimiter == char and current_statement and current_statement[-1] != '\\':
-                in_string = False
-                string_delimiter = None
+    return statements
+
+
+def iter_chunks(source: Union[IO[str], Iterable[str]], chunk_size: int = 1 << 16) -> Iterator[str]:
+    """
+    Iterate over a text source in chunks.
+    
+    Args:
+        source: File object opened in text mode, or an iterable of text chunks
+        chunk_size: Number of characters to read at a time from a file object
         
-        # Append to current statement
-        current_statement.append(char)
+    Returns:
+        Iterator over text chunks
+    """
+    if hasattr(source, 'read'):
+        return iter(lambda: source.read(chunk_size), '')
+    return iter(source)
+
+
+def _normalize_line_endings(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Convert CR and CRLF line endings in a stream of chunks to LF.
+    
+    Args:
+        chunks: Iterable of text chunks
         
-        # If we hit a semicolon and we're not inside a string, end the statement
-        if char == ';' and not in_string:
-            statements.append(''.join(current_statement).strip())
-            current_statement = []
+    Returns:
+        Iterator over normalized chunks; a CR at the end of a chunk is held back
+        until the next chunk shows whether it starts a CRLF
+    """
+    carry = ''
+    for chunk in chunks:
+        chunk = carry + chunk
+        carry = ''
+        if chunk.endswith('\r'):
+            chunk, carry = chunk[:-1], '\r'
+        yield chunk.replace('\r\n', '\n').replace('\r', '\n')
+    if carry:
+        yield '\n'
+
+
+def stream_statements(source: Union[IO[str], Iterable[str]], chunk_size: int = 1 << 16) -> Iterator[str]:
+    """
+    Split SQL from a file object or an iterable of chunks into statements lazily.
     
-    # Add any remaining content as a statement (if it's not just whitespace)
-    if current_statement and ''.join(current_statement).strip():
-        statements.append(''.join(current_statement).strip())
+    Unlike split_into_statements this never holds more than the statement being read
+    (plus one chunk) in memory.
     
-    return [stmt for stmt in statements if stmt.strip()]
+    Args:
+        source: File object opened in text mode, or an iterable of text chunks
+        chunk_size: Number of characters to read at a time from a file object
+        
+    Returns:
+        Iterator over SQL statements
+    """
+    for text in iter_statement_texts(_normalize_line_endings(iter_chunks(source, chunk_size))):
+        statement = text.strip()
+        if statement:
+            yield statement
 
 
 def find_table_aliases(content: str, table_name: str) -> List[str]:
@@ -193,4 +239,57 @@ def get_table_id_column(table_name: str) -> str:
     """
     if table_name.endswith('_'):
         return f"{table_name}id"
-    return f"{table_name}_id" 
\ No newline at end of file
+    return f"{table_name}_id"
+
+
+def get_statement_target(statement: str, keywords: Tuple[str, ...], start: int = 0,
+                         end: Optional[int] = None) -> Optional[str]:
+    """
+    Get the table targeted by a statement that starts with the given keywords,
+    e.g. ('delete', 'from') for DELETE statements.
+    
+    Args:
+        statement: SQL statement as a string
+        keywords: Leading keywords of the statement, in lower case
+        start: Start offset of the statement, when it is part of a larger buffer
+        end: End offset of the statement, when it is part of a larger buffer
+        
+    Returns:
+        The lower-cased (possibly schema-qualified) table name, or None if the statement
+        does not start with the keywords or is not followed by a table name
+    """
+    tokens = iter_significant_tokens(statement, start, end)
+    
+    for keyword in keywords:
+        token = next(tokens, None)
+        if token is None or token.type != WORD or token.value.lower() != keyword:
+            return None
+    
+    # Collect a possibly schema-qualified name: name(.name)*
+    parts = []
+    for token in tokens:
+        expects_name = len(parts) % 2 == 0
+        if expects_name and token.type in (WORD, QUOTED_IDENTIFIER):
+            parts.append(token.value)
+        elif not expects_name and token.type == DOT:
+            parts.append(token.value)
+        else:
+            break
+    
+    if not parts or len(parts) % 2 == 0:
+        return None
+    
+    return ''.join(parts).lower()
+
+
+def unqualified_table_name(name: str) -> str:
+    """
+    Strip the schema qualifier and identifier quotes from a table or column name.
+    
+    Args:
+        name: Possibly schema-qualified and quoted name, e.g. 'public."Company"'
+        
+    Returns:
+        The bare lower-cased name, e.g. 'company'
+    """
+    return name.rsplit('.', 1)[-1].strip().strip('"`').lower()
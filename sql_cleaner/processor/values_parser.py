@@ -0,0 +1,122 @@
+import re
+from typing import Iterator, List, NamedTuple, Set, Tuple
+
+from sql_cleaner.processor.edits import Edit
+
+
+# Everything that affects tuple and field boundaries; search() skips the rest in C
+_VALUES_PATTERN = re.compile(r"""
+    '[^'\\]*(?:\\.[^'\\]*)*'?
+  | "[^"\\]*(?:\\.[^"\\]*)*"?
+  | [(),]
+""", re.VERBOSE | re.DOTALL)
+
+# Characters allowed between two tuples of a VALUES list
+_TUPLE_SEPARATORS = ', \t\n\r'
+
+_WHITESPACE_PATTERN = re.compile(r'\s*')
+
+
+class ValueTuple(NamedTuple):
+    """One parenthesized tuple of a VALUES list, located by indexes into the statement."""
+    start: int
+    end: int
+    fields: List[Tuple[int, int]]
+
+
+def iter_value_tuples(statement: str, pos: int = 0) -> Iterator[ValueTuple]:
+    """
+    Locate the tuples of a VALUES list and the fields of each tuple.
+
+    Scanning starts at pos, right after the VALUES keyword, and stops at the first character
+    after a tuple that is neither a comma, whitespace nor the start of another tuple. Strings
+    with backslash escapes and nested parentheses are skipped as a whole, so each character of
+    the statement is looked at once and nothing is copied.
+
+    Args:
+        statement: SQL statement
+        pos: Index to start scanning at
+
+    Yields:
+        Tuples in order; start is the index of '(' and end the index after ')', fields are
+        (start, end) spans of the text between the commas, not stripped
+    """
+    length = len(statement)
+
+    while True:
+        while pos < length and statement[pos] in _TUPLE_SEPARATORS:
+            pos += 1
+        if pos >= length or statement[pos] != '(':
+            return
+
+        start = pos
+        field_start = pos + 1
+        fields = []
+        depth = 0
+
+        while True:
+            match = _VALUES_PATTERN.search(statement, pos)
+            # An unterminated string or tuple ends the list
+            if match is None:
+                return
+
+            pos = match.end()
+            char = match.group()
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+                if depth == 0:
+                    fields.append((field_start, pos - 1))
+                    break
+            elif char == ',' and depth == 1:
+                fields.append((field_start, pos - 1))
+                field_start = pos
+
+        yield ValueTuple(start, pos, fields)
+
+
+def remove_fields(statement: str, fields: List[Tuple[int, int]], drop: Set[int]) -> List[Edit]:
+    """
+    Find the edits that remove some fields of a tuple, keeping the separators of the others.
+
+    A removed field takes the separator after it along, or the one before it when no field
+    after it is kept, so '(1, 2, 3)' becomes '(1, 3)' or '(1, 2)'.
+
+    Args:
+        statement: Statement the tuple is in
+        fields: (start, end) spans of the fields, as in ValueTuple.fields
+        drop: Indexes of the fields to remove
+
+    Returns:
+        Edits removing the fields
+    """
+    count = len(fields)
+
+    # Where a field starts and ends, without the whitespace around it
+    def field_start(i: int) -> int:
+        return _WHITESPACE_PATTERN.match(statement, fields[i][0], fields[i][1]).end()
+
+    def field_end(i: int) -> int:
+        start, end = fields[i]
+        while end > start and statement[end - 1].isspace():
+            end -= 1
+        return end
+
+    edits = []
+    i = 0
+    while i < count:
+        if i not in drop:
+            i += 1
+            continue
+        last = i
+        while last + 1 < count and last + 1 in drop:
+            last += 1
+        if last + 1 < count:
+            edits.append(Edit(field_start(i), field_start(last + 1)))
+        elif i > 0:
+            edits.append(Edit(field_end(i - 1), field_end(last)))
+        else:
+            edits.append(Edit(field_start(0), field_end(last)))
+        i = last + 1
+    return edits
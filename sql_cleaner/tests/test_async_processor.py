@@ -0,0 +1,75 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from sql_cleaner.processor.async_processor import process_files_async
+from sql_cleaner.processor.sql_processor import SQLProcessor
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(results):
+    return [result async for result in results]
+
+
+class TestAsyncProcessor(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.paths = []
+        for i in range(8):
+            path = os.path.join(self.directory, f'file{i}.sql')
+            with open(path, 'w', encoding='utf-8') as f:
+                if i % 2:
+                    f.write(f"INSERT INTO target (id) VALUES ({i});\nINSERT INTO product (id, target_id) VALUES ({i}, 1);")
+                else:
+                    f.write(f"SELECT {i} FROM product;")
+            self.paths.append(path)
+    
+    def test_process_async(self):
+        processor = SQLProcessor()
+        content = "INSERT INTO target (id) VALUES (1);\nINSERT INTO product (id, target_id) VALUES (2, 1);"
+        
+        processed = run(processor.process_async(content, ['target']))
+        
+        self.assertEqual(processed, processor.process_sql_content(content, ['target']))
+    
+    def test_results_in_order_with_thread_pool(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = run(collect(process_files_async(self.paths, ['target'], executor, concurrency=3)))
+        
+        self.assertEqual([result.path for result in results], self.paths)
+        self.assertEqual([result.changed for result in results], [False, True] * 4)
+        self.assertEqual(results[1].processed_content, "INSERT INTO product (id) VALUES (1);")
+        # Without write the files are left alone
+        with open(self.paths[1], encoding='utf-8') as f:
+            self.assertIn("INSERT INTO target", f.read())
+    
+    def test_write_with_process_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = run(collect(process_files_async(self.paths, ['target'], executor, write=True)))
+        
+        self.assertTrue(all(result.error is None for result in results))
+        with open(self.paths[3], encoding='utf-8') as f:
+            self.assertEqual(f.read(), "INSERT INTO product (id) VALUES (3);")
+    
+    def test_errors_are_returned_per_file(self):
+        missing = os.path.join(self.directory, 'missing.sql')
+        results = run(collect(process_files_async([missing] + self.paths[:2], ['target'], concurrency=1)))
+        
+        self.assertIsInstance(results[0].error, FileNotFoundError)
+        self.assertIsNone(results[0].processed_content)
+        self.assertTrue(results[2].changed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from sql_cleaner.benchmarks.corpus import CorpusGenerator, CorpusSpec
+from sql_cleaner.benchmarks.runner import benchmark_handlers, format_results, run_benchmarks
+from sql_cleaner.processor.insert_handler import InsertHandler
+from sql_cleaner.processor.statement import INSERT, SELECT, parse_statements
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_generator_is_deterministic(self):
+        first = CorpusGenerator(["target"], seed=7).content(4096)
+        second = CorpusGenerator(["target"], seed=7).content(4096)
+        self.assertEqual(first, second)
+        self.assertGreaterEqual(len(first), 4096)
+        self.assertIn("target", first)
+    
+    def test_scenarios_generate_expected_statements(self):
+        generator = CorpusGenerator(["target"])
+        self.assertEqual(parse_statements(generator.wide_insert(rows=3))[0].kind, INSERT)
+        self.assertEqual(parse_statements(generator.many_joins(joins=3))[0].kind, SELECT)
+        self.assertEqual(generator.many_joins(joins=3).count("JOIN"), 3)
+    
+    def test_write_corpus(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        paths = CorpusGenerator(["target"]).write_corpus(directory, CorpusSpec(3, 512, 1, 2048))
+        self.assertEqual(len(paths), 4)
+        self.assertTrue(all(os.path.getsize(path) >= 512 for path in paths))
+    
+    def test_benchmark_handlers_reports_every_stage(self):
+        content = CorpusGenerator(["target"]).content(2048)
+        stages = [result.stage for result in benchmark_handlers(content, ["target"], "mixed", repeat=1)]
+        self.assertEqual(stages, [
+            "parse", "CommentRemovalHandler", "InsertHandler", "WhereHandler",
+            "JoinHandler", "DeleteHandler", "UpdateHandler", "end-to-end"
+        ])
+    
+    def test_benchmark_handlers_routes_statements(self):
+        content = CorpusGenerator(["target"]).content(2048)
+        kinds = set()
+        process_statements = InsertHandler.process_statements
+        
+        def record_kinds(handler, statements, tables):
+            kinds.update(statement.kind for statement in statements)
+            return process_statements(handler, statements, tables)
+        
+        with mock.patch.object(InsertHandler, 'process_statements', record_kinds):
+            benchmark_handlers(content, ["target"], "mixed", repeat=1)
+        self.assertEqual(kinds, {INSERT})
+    
+    def test_run_benchmarks(self):
+        results = run_benchmarks([1024], [1, 5], ["nested_where"], repeat=1)
+        self.assertEqual({result.tables for result in results}, {1, 5})
+        self.assertIn("nested_where", format_results(results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from sql_cleaner.processor.cleaning_plan import CleaningPlan
+from sql_cleaner.processor.sql_processor import SQLProcessor
+from sql_cleaner.processor.where_handler import WhereHandler
+
+
+class TestCleaningPlan(unittest.TestCase):
+    def test_plan_behaves_like_table_list(self):
+        plan = CleaningPlan(["Company", "price_type_"])
+        self.assertEqual(list(plan), ["Company", "price_type_"])
+        self.assertEqual(len(plan), 2)
+        self.assertEqual(plan.table_set, {"company", "price_type_"})
+        self.assertEqual(plan.id_columns, {"company_id", "price_type_id"})
+        self.assertFalse(CleaningPlan([]))
+    
+    def test_of_reuses_plans(self):
+        plan = CleaningPlan.of(["target", "other"])
+        self.assertIs(CleaningPlan.of(["target", "other"]), plan)
+        self.assertIs(CleaningPlan.of(plan), plan)
+    
+    def test_table_names_are_derived_once(self):
+        plan = CleaningPlan(["Target"])
+        table = plan.table("Target")
+        self.assertIs(plan.table("Target"), table)
+        self.assertEqual((table.lower, table.id_column_lower), ("target", "target_id"))
+    
+    def test_processor_accepts_plan(self):
+        sql = ("INSERT INTO target (id) VALUES (1);\n"
+               "SELECT * FROM product p JOIN target t ON t.id = p.target_id WHERE p.a = 1 AND t.b = 2;")
+        processor = SQLProcessor()
+        self.assertEqual(
+            processor.process_sql_content(sql, CleaningPlan(["target"])),
+            processor.process_sql_content(sql, ["target"])
+        )
+        self.assertEqual(processor.process_sql_content(sql, CleaningPlan(["target"])), "SELECT * FROM product p WHERE p.a = 1;")
+    
+    def test_where_handler_with_plan(self):
+        plan = CleaningPlan(["target"])
+        stmt = "SELECT * FROM product WHERE target_id = 5 AND price > 0;"
+        self.assertEqual(WhereHandler().process(stmt, plan), "SELECT * FROM product WHERE price > 0;")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,212 @@
+import io
+import os
+import shutil
+import stat
+import tempfile
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from sql_cleaner.cli import process_large_file, process_sql_files
+from sql_cleaner.processor.profiler import Profiler
+from sql_cleaner.processor.sql_processor import SQLProcessor
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.serial_dir = os.path.join(self.root, 'serial')
+        for i in range(12):
+            subdir = os.path.join(self.serial_dir, f'dir{i % 3}')
+            os.makedirs(subdir, exist_ok=True)
+            with open(os.path.join(subdir, f'file{i}.sql'), 'w', encoding='utf-8') as f:
+                f.write(f"INSERT INTO target (id) VALUES ({i});\n"
+                        f"INSERT INTO product (id, target_id, name) VALUES ({i}, 1, 'p{i}');\n")
+        with open(os.path.join(self.serial_dir, 'other.sql'), 'w', encoding='utf-8') as f:
+            f.write("SELECT * FROM product;\n")
+        self.parallel_dir = os.path.join(self.root, 'parallel')
+        shutil.copytree(self.serial_dir, self.parallel_dir)
+    
+    def run_cli(self, directory, jobs):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            process_sql_files(directory, ['target'], jobs=jobs)
+        return output.getvalue().replace(directory, '<dir>')
+    
+    def read_tree(self, directory):
+        contents = {}
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, encoding='utf-8') as f:
+                    contents[os.path.relpath(path, directory)] = f.read()
+        return contents
+    
+    def test_parallel_matches_serial(self):
+        serial_log = self.run_cli(self.serial_dir, jobs=1)
+        parallel_log = self.run_cli(self.parallel_dir, jobs=3)
+        
+        self.assertEqual(parallel_log, serial_log)
+        self.assertEqual(self.read_tree(self.parallel_dir), self.read_tree(self.serial_dir))
+        self.assertIn("No target tables found in file: <dir>/other.sql", serial_log)
+        self.assertEqual(
+            self.read_tree(self.serial_dir)[os.path.join('dir0', 'file0.sql')],
+            "INSERT INTO product (id, name) VALUES (0, 'p0');\n"
+        )
+
+    
+    def test_files_are_decoded_like_text_files(self):
+        crlf_file = os.path.join(self.serial_dir, 'crlf.sql')
+        with open(crlf_file, 'wb') as f:
+            f.write(b"INSERT INTO target (id) VALUES (1);\r\nSELECT 'caf\xc3\xa9' FROM product;\r\n")
+        empty_file = os.path.join(self.serial_dir, 'empty.sql')
+        open(empty_file, 'w').close()
+        
+        log = self.run_cli(self.serial_dir, jobs=1)
+        
+        self.assertIn("Processed file: <dir>/crlf.sql", log)
+        self.assertIn("No target tables found in file: <dir>/empty.sql", log)
+        with open(crlf_file, 'rb') as f:
+            self.assertEqual(f.read(), "SELECT 'café' FROM product;\n".encode('utf-8'))
+
+    
+    def test_unmodified_files_are_not_written(self):
+        other_file = os.path.join(self.serial_dir, 'other.sql')
+        with open(other_file, 'w', encoding='utf-8') as f:
+            f.write("SELECT * FROM product WHERE x = 1;")
+        os.utime(other_file, ns=(0, 0))
+        
+        output = io.StringIO()
+        with redirect_stdout(output):
+            process_sql_files(self.serial_dir, ['product'], jobs=1)
+        
+        self.assertIn(f"No changes needed in file: {other_file}", output.getvalue())
+        self.assertEqual(os.stat(other_file).st_mtime_ns, 0)
+    
+    def test_dry_run_writes_nothing(self):
+        before = self.read_tree(self.serial_dir)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            process_sql_files(self.serial_dir, ['target'], jobs=2, dry_run=True, diff='unified')
+        log = output.getvalue()
+        
+        self.assertEqual(self.read_tree(self.serial_dir), before)
+        first_file = os.path.join(self.serial_dir, 'dir0', 'file0.sql')
+        self.assertIn(f"Would process file: {first_file}\n--- {first_file}\n+++ {first_file}\n", log)
+        self.assertIn("-INSERT INTO target (id) VALUES (0);\n", log)
+        self.assertIn("@@ -1,2 +1 @@\n-INSERT INTO target (id) VALUES (0);\n"
+                      "-INSERT INTO product (id, target_id, name) VALUES (0, 1, 'p0');\n"
+                      "+INSERT INTO product (id, name) VALUES (0, 'p0');\n", log)
+    
+    def test_diff_summary(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            process_sql_files(self.serial_dir, ['target'], jobs=1, diff='summary')
+        
+        first_file = os.path.join(self.serial_dir, 'dir0', 'file0.sql')
+        self.assertIn(f"Processed file: {first_file}\n{first_file}: 1 lines added, 2 lines removed\n",
+                      output.getvalue())
+
+    
+    def test_data_dump_keeps_formatting(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            process_sql_files(self.serial_dir, ['target'], jobs=2, data_dump='auto')
+        
+        self.assertEqual(
+            self.read_tree(self.serial_dir)[os.path.join('dir0', 'file0.sql')],
+            "INSERT INTO product (id, name) VALUES (0, 'p0');\n"
+        )
+
+    
+    def test_large_files_are_replaced_through_a_temporary_file(self):
+        first_file = os.path.join(self.serial_dir, 'dir0', 'file0.sql')
+        os.chmod(first_file, 0o640)
+        before = self.read_tree(self.serial_dir)
+        
+        output = io.StringIO()
+        with redirect_stdout(output):
+            process_sql_files(self.serial_dir, ['target'], jobs=2, dry_run=True, large_file_size=0)
+        self.assertIn(f"Would process file: {first_file}\n", output.getvalue())
+        self.assertEqual(self.read_tree(self.serial_dir), before)
+        
+        with redirect_stdout(output):
+            process_sql_files(self.serial_dir, ['target'], jobs=2, large_file_size=0, incremental=True)
+        
+        after = self.read_tree(self.serial_dir)
+        self.assertEqual(after[os.path.join('dir0', 'file0.sql')],
+                         "INSERT INTO product (id, name) VALUES (0, 'p0');\n")
+        self.assertEqual(sorted(after), sorted(list(before) + ['.sql_cleaner_manifest.json']))
+        self.assertEqual(stat.S_IMODE(os.stat(first_file).st_mode), 0o640)
+    
+    def test_unmodified_large_files_are_not_written(self):
+        other_file = os.path.join(self.serial_dir, 'other.sql')
+        os.utime(other_file, ns=(0, 0))
+        
+        outcome = process_large_file(other_file, ['product'], SQLProcessor(Profiler()))
+        
+        self.assertEqual(outcome, ('unmodified', {'product'}, 23, 23))
+        self.assertEqual(os.stat(other_file).st_mtime_ns, 0)
+        self.assertEqual([name for name in os.listdir(self.serial_dir) if name.endswith('.tmp')], [])
+        self.assertEqual(process_large_file(other_file, ['target'], SQLProcessor(Profiler()))[0], 'skipped')
+    
+    @unittest.skipUnless(hasattr(os, 'symlink') and hasattr(os, 'link'), 'links are not supported')
+    def test_linked_large_files_are_cleaned_in_place(self):
+        outside = os.path.join(self.root, 'outside')
+        os.makedirs(outside)
+        first_file = os.path.join(self.serial_dir, 'dir0', 'file0.sql')
+        linked_file = os.path.join(outside, 'linked.sql')
+        shutil.move(first_file, linked_file)
+        os.symlink(linked_file, first_file)
+        second_file = os.path.join(self.serial_dir, 'dir1', 'file1.sql')
+        hard_link = os.path.join(self.serial_dir, 'dir2', 'hard.sql')
+        os.link(second_file, hard_link)
+        
+        with redirect_stdout(io.StringIO()):
+            process_sql_files(self.serial_dir, ['target'], large_file_size=0)
+        
+        self.assertTrue(os.path.islink(first_file))
+        with open(linked_file, encoding='utf-8') as f:
+            self.assertNotIn("INSERT INTO target", f.read())
+        self.assertEqual(os.listdir(outside), ['linked.sql'])
+        self.assertTrue(os.path.samefile(second_file, hard_link))
+        with open(hard_link, encoding='utf-8') as f:
+            self.assertNotIn("INSERT INTO target", f.read())
+    
+    def test_large_files_find_tables_only_when_profiling(self):
+        other_file = os.path.join(self.serial_dir, 'other.sql')
+        processor = SQLProcessor()
+        
+        with mock.patch.object(processor, 'find_target_tables') as find_target_tables:
+            outcome = process_large_file(other_file, ['product'], processor)
+        
+        find_target_tables.assert_not_called()
+        self.assertEqual(outcome, ('unmodified', set(), 23, 23))
+    
+    def test_large_file_memory_does_not_depend_on_size(self):
+        path = os.path.join(self.root, 'large.sql')
+        
+        def peak_memory(rows):
+            with open(path, 'w', encoding='utf-8') as f:
+                for i in range(rows):
+                    f.write(f"INSERT INTO product (id, name) VALUES ({i}, 'product {i}');\n")
+                    if i % 1000 == 0:
+                        f.write(f"INSERT INTO target (id) VALUES ({i});\n")
+            tracemalloc.start()
+            try:
+                with mock.patch('sql_cleaner.cli._LARGE_FILE_CHUNK_SIZE', 1 << 14):
+                    self.assertEqual(process_large_file(path, ['target'], SQLProcessor())[0], 'processed')
+                return tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        
+        small = peak_memory(10000)
+        large = peak_memory(40000)
+        self.assertLess(large, 2 * small)
+        self.assertLess(large, os.path.getsize(path) / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
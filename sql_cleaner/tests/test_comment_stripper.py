@@ -0,0 +1,49 @@
+import unittest
+from sql_cleaner.processor.comment_stripper import CommentStripper
+
+
+class TestCommentStripper(unittest.TestCase):
+    SQL = (
+        "SELECT col1, -- first; comment\n"
+        "  /* outer /* nested */ still outer */ col2,\r\n"
+        "  '-- not /* a comment */' AS literal, a - b / c * d\n"
+        "FROM table1 -- trailing"
+    )
+    EXPECTED = "SELECT col1, col2, '-- not /* a comment */' AS literal, a - b / c * d FROM table1"
+    
+    def test_strip(self):
+        self.assertEqual(CommentStripper().strip(self.SQL), self.EXPECTED)
+    
+    def test_chunks_of_any_size(self):
+        for size in range(1, 12):
+            chunks = [self.SQL[i:i + size] for i in range(0, len(self.SQL), size)]
+            self.assertEqual(''.join(CommentStripper().strip_stream(chunks)), self.EXPECTED, size)
+    
+    def test_delimiter_split_across_chunks(self):
+        stripper = CommentStripper()
+        output = stripper.feed("SELECT 1 -") + stripper.feed("- note\nFROM t /") + stripper.feed("* x *")
+        output += stripper.feed("/ WHERE a = 1") + stripper.flush()
+        self.assertEqual(output, "SELECT 1 FROM t WHERE a = 1")
+    
+    def test_trailing_characters_are_kept(self):
+        self.assertEqual(CommentStripper().strip("SELECT a -"), "SELECT a -")
+        self.assertEqual(CommentStripper().strip("SELECT a /"), "SELECT a /")
+    
+    def test_unterminated_comment(self):
+        self.assertEqual(CommentStripper().strip("SELECT 1 /* open /* nested */"), "SELECT 1")
+    
+    def test_reusable_after_flush(self):
+        stripper = CommentStripper()
+        stripper.feed("SELECT 1 /* open")
+        stripper.flush()
+        self.assertEqual(stripper.strip("SELECT 2"), "SELECT 2")
+    
+    def test_linear_on_large_input(self):
+        content = "INSERT INTO t VALUES (1, 'x'); -- c\n" * 20000
+        stripped = CommentStripper().strip(content)
+        self.assertEqual(stripped.count("INSERT"), 20000)
+        self.assertNotIn("--", stripped)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from sql_cleaner.processor.condition_tree import find_where_clauses, parse_condition, prune_condition
+
+
+def shape(text, node):
+    if node.kind == 'leaf':
+        return text[node.start:node.end]
+    return (node.kind,) + tuple(shape(text, child) for child in node.children)
+
+
+class TestConditionTree(unittest.TestCase):
+    def test_precedence_and_groups(self):
+        text = "a = 1 OR NOT (b = 2 AND c IN (1, 2)) AND d BETWEEN 1 AND 5"
+        self.assertEqual(shape(text, parse_condition(text)), (
+            'or', 'a = 1', ('and', ('not', ('group', ('and', 'b = 2', 'c IN (1, 2)'))), 'd BETWEEN 1 AND 5')
+        ))
+    
+    def test_predicates_keep_their_parentheses_strings_and_case(self):
+        text = "(a + b) > 1 AND name = 'x OR y' AND CASE WHEN p AND q THEN 1 END = 1"
+        self.assertEqual(shape(text, parse_condition(text)), (
+            'and', '(a + b) > 1', "name = 'x OR y'", 'CASE WHEN p AND q THEN 1 END = 1'
+        ))
+    
+    def test_prune_keeps_untouched_parts_verbatim(self):
+        text = "(a  =  1 OR b = 2) AND (x_id = 1 OR c = 3) AND x_id = 2"
+        pruned = prune_condition(text, parse_condition(text), lambda leaf: 'x_id' in leaf)
+        self.assertEqual(pruned, ("(a  =  1 OR b = 2) AND (c = 3)", True))
+        
+        self.assertEqual(prune_condition(text, parse_condition(text), lambda leaf: False), (text, False))
+        self.assertEqual(prune_condition(text, parse_condition(text), lambda leaf: True), (None, True))
+    
+    def test_deep_nesting(self):
+        text = "a = 1"
+        for i in range(100):
+            text = f"({text} AND (x_id = {i} OR b = {i}))"
+        pruned, changed = prune_condition(text, parse_condition(text), lambda leaf: 'x_id' in leaf)
+        self.assertTrue(changed)
+        self.assertNotIn('x_id', pruned)
+        self.assertEqual(pruned.count('b = '), 100)
+    
+    def test_where_clauses(self):
+        text = ("SELECT * FROM (SELECT * FROM t WHERE a = 1) s "
+                "WHERE b IN (SELECT c FROM u WHERE d = 2) GROUP BY e;")
+        clauses = [text[clause.condition_start:clause.condition_end] for clause in find_where_clauses(text)]
+        self.assertEqual(clauses, ["a = 1", "b IN (SELECT c FROM u WHERE d = 2)"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+import unittest
+from unittest import mock
+from sql_cleaner.processor.cleaning_plan import CleaningPlan
+from sql_cleaner.processor.copy_data import (
+    COPY_DATA, COPY_HEADER, END_OF_DATA, STATEMENT,
+    CopyDataFilter, iter_copy_blocks, iter_copy_sections, iter_row_chunks, parse_copy_header
+)
+from sql_cleaner.processor.profiler import Profiler
+from sql_cleaner.processor.sql_processor import SQLProcessor
+
+
+class TestCopyData(unittest.TestCase):
+    DUMP = (
+        "SET client_encoding = 'UTF8';\n"
+        "\n"
+        "--\n"
+        "-- Data for Name: company; Type: TABLE DATA\n"
+        "--\n"
+        "\n"
+        "COPY public.company (id, name) FROM stdin;\n"
+        "1\tAcme's; Inc\n"
+        "2\tOther\n"
+        "\\.\n"
+        "\n"
+        "COPY public.price (id, company_id, value, note) FROM stdin;\n"
+        "1\t1\t9.5\tcompany_id\n"
+        "2\t\\N\t10.0\t\\t\n"
+        "\\.\n"
+        "\n"
+        "COPY public.product (id, name) FROM stdin;\n"
+        "1\tp\n"
+        "\\.\n"
+    )
+
+    def chunked(self, text, size):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def test_parse_copy_header(self):
+        header = parse_copy_header('COPY public."Price" (id, "company_id") FROM stdin;')
+        self.assertEqual(header.table, 'public."Price"')
+        self.assertEqual(len(header.columns.fields), 2)
+        self.assertIsNone(parse_copy_header("COPY price FROM stdin;").columns)
+        self.assertIsNone(parse_copy_header("COPY price TO stdout;"))
+        self.assertIsNone(parse_copy_header("COPY price FROM '/tmp/price.csv';"))
+
+    def test_blocks(self):
+        blocks = list(iter_copy_blocks(self.DUMP))
+        self.assertEqual([self.DUMP[block.data_start:block.data_end] for block in blocks],
+                         ["1\tAcme's; Inc\n2\tOther\n", "1\t1\t9.5\tcompany_id\n2\t\\N\t10.0\t\\t\n", "1\tp\n"])
+        self.assertTrue(all(self.DUMP[block.data_end:block.end] == "\\.\n" for block in blocks))
+        self.assertTrue(self.DUMP.startswith("COPY public.company", blocks[0].start))
+
+    def test_copy_lines_in_strings_and_comments(self):
+        content = "SELECT '\nCOPY a FROM stdin;\n';\n/*\nCOPY b FROM stdin;\n*/\nCOPY c FROM stdin;\nx\n"
+        blocks = list(iter_copy_blocks(content))
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual(content[blocks[0].data_start:blocks[0].end], "x\n")
+
+        sections = list(iter_copy_sections(self.chunked(content, 3)))
+        self.assertEqual(''.join(text for _, text in sections), content)
+        self.assertEqual([kind for kind, _ in sections if kind != COPY_DATA], [STATEMENT, COPY_HEADER])
+
+    def test_sections_do_not_depend_on_chunking(self):
+        expected = None
+        for size in (1, 2, 7, 64, 10000):
+            sections = list(iter_copy_sections(self.chunked(self.DUMP, size)))
+            self.assertEqual(''.join(text for _, text in sections), self.DUMP)
+            merged = [(kind, ''.join(text for k, text in sections if k == kind)) for kind in
+                      (STATEMENT, COPY_HEADER, COPY_DATA, END_OF_DATA)]
+            if expected is None:
+                expected = merged
+            self.assertEqual(merged, expected)
+        self.assertEqual(expected[3], (END_OF_DATA, "\\.\n" * 3))
+        self.assertEqual(list(iter_copy_sections(["SELECT 1;\n"])), [(STATEMENT, "SELECT 1;"), (STATEMENT, "\n")])
+
+    def test_filter(self):
+        plan = CleaningPlan.of(['company'])
+        removed = CopyDataFilter("\n-- data\nCOPY public.company (id, name) FROM stdin;\n", plan)
+        self.assertTrue(removed.removed)
+        self.assertEqual(removed.prefix, "\n-- data\n")
+        self.assertEqual(removed.filter_rows("1\ta\n"), "")
+
+        price = CopyDataFilter("COPY price (id, company_id, value) FROM stdin;\n", plan)
+        self.assertEqual(price.header, "COPY price (id, value) FROM stdin;\n")
+        self.assertEqual(price.filter_rows("1\t2\t3\n4\t5\t6\n"), "1\t3\n4\t6\n")
+        self.assertEqual(price.filter_rows("1\t2\t3"), "1\t3")
+        # The column list has changed, so a row with a field too many or too few cannot be kept
+        for rows in ("1\t2\t3\nnot a row\n", "1\t2\t3\t4\n", "\n"):
+            with self.assertRaises(ValueError):
+                price.filter_rows(rows)
+
+        last = CopyDataFilter("COPY price (id, company_id) FROM stdin;\n", plan)
+        self.assertEqual(last.filter_rows("1\t2\n3\t4\n"), "1\n3\n")
+
+        unchanged = CopyDataFilter("COPY product (id, name) FROM stdin;\n", plan)
+        self.assertFalse(unchanged.changed)
+        rows = "1\tp\n"
+        self.assertIs(unchanged.filter_rows(rows), rows)
+
+        with self.assertRaises(ValueError):
+            CopyDataFilter("SELECT 1;\n", plan)
+
+    def test_statements_with_options_are_kept(self):
+        plan = CleaningPlan.of(['company'])
+        for statement in ("COPY product (id, company_id, name) FROM stdin WITH (FORMAT csv);\n",
+                          "COPY product (id, company_id, name) FROM stdin DELIMITER '|';\n",
+                          "COPY product (id, company_id, name) FROM stdin WITH CSV HEADER;\n"):
+            copy_filter = CopyDataFilter(statement, plan)
+            self.assertFalse(copy_filter.changed)
+            self.assertEqual(copy_filter.header, statement)
+            rows = "1,2,a\n1|2|a\n"
+            self.assertIs(copy_filter.filter_rows(rows), rows)
+
+        self.assertTrue(CopyDataFilter("COPY company (id) FROM stdin WITH (FORMAT csv);\n", plan).removed)
+        self.assertEqual(parse_copy_header("COPY t FROM stdin DELIMITER ';';").options, "DELIMITER ';'")
+        self.assertEqual(parse_copy_header("COPY t FROM stdin ;").options, "")
+
+    def test_row_chunks(self):
+        rows = "1\ta\n22\tbb\n333\tccc\n"
+        for size in (1, 4, 100):
+            chunks = list(iter_row_chunks(rows, 0, len(rows), size))
+            self.assertEqual(''.join(chunks), rows)
+            self.assertTrue(all(chunk.endswith('\n') for chunk in chunks))
+
+    def test_processor(self):
+        expected = (
+            "SET client_encoding = 'UTF8';\n"
+            "\n"
+            "--\n"
+            "-- Data for Name: company; Type: TABLE DATA\n"
+            "--\n"
+            "\n"
+            "\n"
+            "COPY public.price (id, value, note) FROM stdin;\n"
+            "1\t9.5\tcompany_id\n"
+            "2\t10.0\t\\t\n"
+            "\\.\n"
+            "\n"
+            "COPY public.product (id, name) FROM stdin;\n"
+            "1\tp\n"
+            "\\.\n"
+        )
+        for mode in ('never', 'auto', 'always'):
+            self.assertEqual(SQLProcessor(data_dump=mode).process_sql_content(self.DUMP, ['company']), expected)
+        self.assertEqual(''.join(SQLProcessor().process_stream(self.chunked(self.DUMP, 5), ['company'])), expected)
+
+    def test_sql_between_blocks_goes_through_the_chain(self):
+        content = (
+            "INSERT INTO company (id) VALUES (1);\n"
+            "COPY product (id, name) FROM stdin;\n1\tp\n\\.\n"
+            "SELECT * FROM product WHERE company_id = 1 AND id > 0;\n"
+        )
+        self.assertEqual(SQLProcessor().process_sql_content(content, ['company']), (
+            "COPY product (id, name) FROM stdin;\n1\tp\n\\.\n"
+            "SELECT * FROM product WHERE id > 0;\n"
+        ))
+
+    def test_processor_keeps_blocks_with_options(self):
+        content = (
+            "COPY product (id, company_id, name) FROM stdin WITH (FORMAT csv);\n1,2,\"it's\"\n\\.\n"
+            "COPY price (id, company_id) FROM stdin DELIMITER '|';\n1|2\n\\.\n"
+            "COPY company (id) FROM stdin WITH (FORMAT csv);\n1\n\\.\n"
+            "SELECT * FROM product WHERE company_id = 1 AND id > 0;\n"
+        )
+        expected = (
+            "COPY product (id, company_id, name) FROM stdin WITH (FORMAT csv);\n1,2,\"it's\"\n\\.\n"
+            "COPY price (id, company_id) FROM stdin DELIMITER '|';\n1|2\n\\.\n"
+            "SELECT * FROM product WHERE id > 0;\n"
+        )
+        self.assertEqual(SQLProcessor().process_sql_content(content, ['company']), expected)
+        self.assertEqual(''.join(SQLProcessor().process_stream(self.chunked(content, 7), ['company'])), expected)
+
+    def test_unchanged_blocks_are_copied_whole(self):
+        content = "DELETE FROM company;\nCOPY product (id, name) FROM stdin;\n1\tp\n\\.\n"
+        with mock.patch.object(CopyDataFilter, 'filter_rows', side_effect=AssertionError):
+            self.assertEqual(SQLProcessor().process_sql_content(content, ['company']),
+                             "COPY product (id, name) FROM stdin;\n1\tp\n\\.\n")
+
+    def test_mismatched_row_is_an_error(self):
+        content = "COPY product (id, company_id, name) FROM stdin;\n1\t2\tp\n2\t3\n\\.\n"
+        with self.assertRaises(ValueError):
+            SQLProcessor().process_sql_content(content, ['company'])
+        with self.assertRaises(ValueError):
+            ''.join(SQLProcessor().process_stream([content], ['company']))
+
+    def test_removed_content_is_replaced_by_placeholder(self):
+        content = "COPY public.company (id) FROM stdin;\n1\n\\.\n"
+        for output in (SQLProcessor().process_sql_content(content, ['company']),
+                       ''.join(SQLProcessor().process_stream([content], ['company']))):
+            self.assertEqual(output, "-- All content was removed by sql_cleaner\n-- Original tables: company\n")
+
+    def test_profile(self):
+        profiler = Profiler()
+        SQLProcessor(profiler).process_sql_content(self.DUMP, ['company'])
+        figures = profiler.handlers['copy_data']
+        self.assertEqual((figures['calls'], figures['statements_in'], figures['statements_out']), (1, 3, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from sql_cleaner.processor.data_dump import DataDumpCleaner
+from sql_cleaner.processor.lexer import significant_tokens
+from sql_cleaner.processor.profiler import Profiler
+from sql_cleaner.processor.sql_processor import SQLProcessor
+
+
+class TestDataDump(unittest.TestCase):
+    DUMP = (
+        "--\n"
+        "-- Data for Name: company; Type: TABLE DATA\n"
+        "--\n"
+        "\n"
+        "INSERT INTO public.company (id, name) VALUES (1, 'Acme; Inc');\n"
+        "INSERT INTO public.company (id, name) VALUES (2, 'Other');\n"
+        "\n"
+        "--\n"
+        "-- Data for Name: price; Type: TABLE DATA\n"
+        "--\n"
+        "\n"
+        "INSERT INTO public.price (id,   company_id, value) VALUES (1, 1,   9.5);\n"
+        "INSERT INTO public.price (company_id, id, value) VALUES\n"
+        "    (1, 2, 'company_id = 1'),\n"
+        "    (2, 3, 10.0);\n"
+        "INSERT INTO public.product (id, name) VALUES (1, 'p');\n"
+        "UPDATE company SET name = 'x';  \n"
+        "DELETE FROM company; -- trailing comment\n"
+        "SELECT pg_catalog.setval('public.company_id_seq', 2, true);\n"
+    )
+
+    def clean(self, content, tables, chain=None):
+        return DataDumpCleaner(tables, chain).clean(content)
+
+    def tokens(self, content):
+        return [token.value.lower() for token in significant_tokens(content)]
+
+    def test_keeps_all_other_bytes(self):
+        self.assertEqual(self.clean(self.DUMP, ['company']), (
+            "--\n"
+            "-- Data for Name: company; Type: TABLE DATA\n"
+            "--\n"
+            "\n"
+            "\n"
+            "--\n"
+            "-- Data for Name: price; Type: TABLE DATA\n"
+            "--\n"
+            "\n"
+            "INSERT INTO public.price (id,   value) VALUES (1, 9.5);\n"
+            "INSERT INTO public.price (id, value) VALUES\n"
+            "    (2, 'company_id = 1'),\n"
+            "    (3, 10.0);\n"
+            "INSERT INTO public.product (id, name) VALUES (1, 'p');\n"
+            " -- trailing comment\n"
+            "SELECT pg_catalog.setval('public.company_id_seq', 2, true);\n"
+        ))
+
+    def test_matches_the_chain(self):
+        processor = SQLProcessor()
+        for tables in (['company'], ['price'], ['product', 'company'], ['missing']):
+            cleaned = self.clean(self.DUMP, tables)
+            self.assertEqual(self.tokens(cleaned), self.tokens(processor.process_sql_content(self.DUMP, tables)))
+
+    def test_removes_trailing_and_inner_columns(self):
+        content = "INSERT INTO t (a, company_id, b, price_id) VALUES (1, 2, 3, 4), ( 5 , 6 , 7 , 8 );"
+        self.assertEqual(self.clean(content, ['company', 'price']), "INSERT INTO t (a, b) VALUES (1, 3), ( 5 , 7 );")
+        self.assertEqual(self.clean("INSERT INTO t (company_id) VALUES (1);", ['company']),
+                         "INSERT INTO t () VALUES ();")
+
+    def test_statements_that_need_the_chain(self):
+        content = "INSERT INTO a (id) VALUES (1);\nSELECT * FROM b WHERE company_id = 1 AND x = 2;\n"
+        self.assertIsNone(self.clean(content, ['company']))
+
+        chain = SQLProcessor().handler
+        self.assertEqual(self.clean(content, ['company'], chain),
+                         "INSERT INTO a (id) VALUES (1);\nSELECT * FROM b WHERE x = 2;\n")
+
+    def test_schema_qualified_updates_and_deletes(self):
+        content = "UPDATE public.company SET a = 1;\nDELETE FROM public.company;\nDELETE FROM public.price;\n"
+        self.assertEqual(self.clean(content, ['company']), "DELETE FROM public.price;\n")
+        self.assertEqual(SQLProcessor().process_sql_content(content, ['company']), "DELETE FROM public.price;\n")
+
+    def test_block_comments_and_missing_semicolons(self):
+        content = (
+            "/* dump; */ INSERT INTO company (id) VALUES (1);\n"
+            "INSERT INTO a (id, company_id) VALUES (1, 2)\n"
+            "INSERT INTO company (id) VALUES ($$x;$$)\n"
+        )
+        self.assertEqual(self.clean(content, ['company']), "/* dump; */ INSERT INTO a (id) VALUES (1)\n")
+
+    def test_comments_after_the_last_statement(self):
+        content = "INSERT INTO company (id) VALUES (1);\n-- rows where company_id is null are skipped\n"
+        expected = "-- rows where company_id is null are skipped\n"
+        self.assertEqual(self.clean(content, ['company']), expected)
+        self.assertEqual(self.clean(content, ['company'], SQLProcessor().handler), expected)
+        self.assertEqual(SQLProcessor(data_dump='always').process_sql_content(content, ['company']), expected)
+
+    def test_processor_modes(self):
+        mixed = self.DUMP + "SELECT * FROM price p JOIN company c ON c.id = p.company_id;\n"
+        never = SQLProcessor()
+
+        self.assertEqual(SQLProcessor(data_dump='auto').process_sql_content(self.DUMP, ['company']),
+                         self.clean(self.DUMP, ['company']))
+        self.assertEqual(SQLProcessor(data_dump='auto').process_sql_content(mixed, ['company']),
+                         never.process_sql_content(mixed, ['company']))
+        self.assertTrue(SQLProcessor(data_dump='always').process_sql_content(mixed, ['company']).endswith(
+            "\nSELECT * FROM price p;\n"))
+        with self.assertRaises(ValueError):
+            SQLProcessor(data_dump='sometimes')
+
+    def test_removed_content_is_replaced_by_placeholder(self):
+        processor = SQLProcessor(data_dump='auto')
+        output = processor.process_sql_content("INSERT INTO company (id) VALUES (1);\n", ['company'])
+        self.assertTrue(output.startswith("-- All content was removed by sql_cleaner"))
+
+    def test_profile(self):
+        profiler = Profiler()
+        SQLProcessor(profiler, data_dump='auto').process_sql_content(self.DUMP, ['company'])
+        figures = profiler.handlers['data_dump']
+        self.assertEqual((figures['calls'], figures['statements_in'], figures['statements_out']), (1, 7, 3))
+        self.assertEqual(figures['size_in'], len(self.DUMP))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,6 +22,11 @@ class TestDeleteHandler(unittest.TestCase):
         result = self.handler.process(sql, self.tables_to_process)
         self.assertEqual(result, "")
 
+    def test_remove_delete_for_schema_qualified_table(self):
+        sql = 'DELETE FROM public.target_table; DELETE FROM "public"."TARGET_TABLE" WHERE id = 1; DELETE FROM other;'
+        result = self.handler.process(sql, self.tables_to_process)
+        self.assertEqual(result, "DELETE FROM other;")
+
     def test_keep_delete_for_non_target_table(self):
         sql = "DELETE FROM other_table WHERE id = 1;"
         result = self.handler.process(sql, self.tables_to_process)
@@ -0,0 +1,35 @@
+import unittest
+from sql_cleaner.processor.edits import Edit, apply_edits, check_edits
+from sql_cleaner.processor.statement import rewrite_statement
+
+
+class TestEdits(unittest.TestCase):
+    def test_applied_in_order_of_position(self):
+        text = "SELECT a, b FROM t;"
+        self.assertEqual(apply_edits(text, [Edit(17, 18, 'u'), Edit(7, 8, 'x')]), "SELECT x, b FROM u;")
+        self.assertEqual(apply_edits(text, [Edit(8, 11)]), "SELECT a FROM t;")
+
+    def test_no_edits_returns_the_text(self):
+        text = "SELECT 1;"
+        self.assertIs(apply_edits(text, []), text)
+
+    def test_contained_edits_are_dropped(self):
+        edits = [Edit(4, 6, 'x'), Edit(2, 8), Edit(2, 3, 'y')]
+        self.assertEqual(check_edits(edits), [Edit(2, 8)])
+        self.assertEqual(apply_edits("0123456789", edits), "0189")
+
+    def test_partial_overlap_is_an_error(self):
+        with self.assertRaises(ValueError):
+            apply_edits("0123456789", [Edit(2, 5), Edit(4, 7)])
+
+    def test_rewrite_keeps_formatting(self):
+        text = "SELECT *\n  FROM t\n  WHERE a = 1\n  ORDER BY b;"
+        where = text.index('WHERE')
+        self.assertEqual(rewrite_statement(text, [Edit(where, text.index('\n', where))]),
+                         "SELECT *\n  FROM t\n  ORDER BY b;")
+        self.assertEqual(rewrite_statement(text, [Edit(where + 6, where + 11, 'b > 0')]),
+                         "SELECT *\n  FROM t\n  WHERE b > 0\n  ORDER BY b;")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from sql_cleaner.processor.file_finder import SQLFileFinder
+
+
+class TestSQLFileFinder(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        for relative_path in ['b.sql', 'a/z.sql', 'a/y.sql', 'a/notes.txt', 'node_modules/pkg/x.sql',
+                              '.git/hooks/x.sql', 'build/tmp/out.sql', 'c/d/e.sql']:
+            path = os.path.join(self.root, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write('SELECT 1;')
+    
+    def find(self, **kwargs):
+        finder = SQLFileFinder(self.root, **kwargs)
+        return [os.path.relpath(str(path), self.root) for path in finder.iter_sql_files()]
+    
+    def test_finds_sql_files_in_order(self):
+        self.assertEqual(self.find(), ['b.sql', 'a/y.sql', 'a/z.sql', 'build/tmp/out.sql', 'c/d/e.sql'])
+    
+    def test_find_sql_files_returns_list(self):
+        files = SQLFileFinder(self.root).find_sql_files()
+        self.assertEqual(len(files), 5)
+        self.assertTrue(all(path.is_file() for path in files))
+    
+    def test_include_and_exclude_patterns(self):
+        self.assertEqual(self.find(exclude=['build/', 'c/**/*.sql', 'z.sql']), ['b.sql', 'a/y.sql'])
+        self.assertEqual(self.find(include=['a/*']), ['a/notes.txt', 'a/y.sql', 'a/z.sql'])
+        # Anchored patterns only match from the root
+        self.assertEqual(self.find(exclude=['d/']), ['b.sql', 'a/y.sql', 'a/z.sql', 'build/tmp/out.sql'])
+        self.assertEqual(self.find(exclude=['/d/']), self.find())
+    
+    @unittest.skipUnless(hasattr(os, 'symlink') and hasattr(os, 'link'), 'links are not supported')
+    def test_links_are_followed_once(self):
+        os.link(os.path.join(self.root, 'b.sql'), os.path.join(self.root, 'hard.sql'))
+        os.symlink(os.path.join(self.root, 'a'), os.path.join(self.root, 'c', 'link'))
+        os.symlink(self.root, os.path.join(self.root, 'a', 'loop'))
+        
+        self.assertEqual(self.find(), ['b.sql', 'a/y.sql', 'a/z.sql', 'build/tmp/out.sql', 'c/d/e.sql'])
+    
+    def test_stopping_early(self):
+        files = SQLFileFinder(self.root, workers=2).iter_sql_files()
+        self.assertEqual(os.path.basename(str(next(files))), 'b.sql')
+        files.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
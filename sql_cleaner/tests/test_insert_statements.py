@@ -207,5 +207,19 @@ class TestInsertStatements(unittest.TestCase):
         self.assertNotIn("));", processed)
 
 
+    def test_multiple_reference_columns_removed_in_one_statement(self):
+        """Test that reference columns of several target tables are removed together"""
+        sql_content = """
+        insert into company (id, name) values (1, 'c');
+        insert into public.price_type (id) values (2);
+        insert into price (id, company_id, value, price_type_id) values (3, 1, 100, 2), (4, 1, 200, 2);
+        """
+        tables = ['company', 'price_type'] + [f'unused_{i}' for i in range(500)]
+        processed = self.processor.process_sql_content(sql_content, tables)
+        
+        self.assertNotIn("insert into company", processed)
+        self.assertNotIn("price_type (id)", processed)
+        self.assertIn("insert into price (id, value) values (3, 100), (4, 200)", processed)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -1,5 +1,5 @@
 import unittest
-from sql_cleaner.processor.join_handler import JoinHandler
+from sql_cleaner.processor.join_handler import JoinHandler, find_join_clauses
 from sql_cleaner.processor.where_handler import WhereHandler
 
 class TestJoinStatementHandler(unittest.TestCase):
@@ -135,6 +135,29 @@ class TestJoinStatementHandler(unittest.TestCase):
         expected = ' '.join(expected.split())
         self.assertEqual(result, expected)
 
+    
+    def test_schema_qualified_joins_of_all_tables(self):
+        sql = ('SELECT * FROM main_table m LEFT JOIN public.target_table t ON t.id = m.tid '
+               'JOIN "public"."product_balance_change" pbc ON pbc.id = m.pid '
+               'JOIN items i ON i.id = m.iid AND i.product_balance_change_id = pbc.id '
+               'WHERE t.active AND m.a = 1 AND pbc.amount > 0;')
+        expected = "SELECT * FROM main_table m JOIN items i ON i.id = m.iid WHERE m.a = 1;"
+        self.assertEqual(self.handler.process(sql, self.tables_to_process), expected)
+    
+    def test_find_join_clauses(self):
+        sql = ("SELECT * FROM a LEFT OUTER JOIN s.b AS x ON left(x.n, 2) = a.n AND x.k BETWEEN 1 AND 2 "
+               "CROSS JOIN c, (SELECT * FROM d JOIN e USING (id)) f WHERE a.id = 1")
+        clauses = find_join_clauses(sql)
+        self.assertEqual([(join.table, join.qualified_table, join.alias) for join in clauses],
+                         [('b', 's.b', 'x'), ('c', 'c', None), ('e', 'e', None)])
+        self.assertEqual([sql[join.start:join.end] for join in clauses], [
+            "LEFT OUTER JOIN s.b AS x ON left(x.n, 2) = a.n AND x.k BETWEEN 1 AND 2",
+            "CROSS JOIN c",
+            "JOIN e USING (id)",
+        ])
+        self.assertEqual(sql[clauses[0].condition_start:clauses[0].condition_end],
+                         "left(x.n, 2) = a.n AND x.k BETWEEN 1 AND 2")
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,71 @@
+import unittest
+from sql_cleaner.processor.lexer import (
+    COMMENT, STRING, QUOTED_IDENTIFIER, WORD, SEMICOLON,
+    tokenize, significant_tokens, iter_statement_spans
+)
+from sql_cleaner.processor.utils import split_into_statements, get_statement_target
+
+
+class TestLexer(unittest.TestCase):
+    def spans_to_text(self, sql):
+        return [sql[start:end].strip() for start, end in iter_statement_spans(sql)]
+
+    def test_tokens_cover_content(self):
+        sql = "SELECT 'a;b', \"c--d\" FROM t -- note\n/* x /* y */ z */;"
+        tokens = list(tokenize(sql))
+        self.assertEqual(''.join(token.value for token in tokens), sql)
+        self.assertEqual(tokens[-1].type, SEMICOLON)
+
+    def test_token_types(self):
+        sql = "SELECT 'it''s', \"Name\", $$a;b$$ -- c\nFROM t"
+        types = [token.type for token in significant_tokens(sql)]
+        self.assertEqual(types[0], WORD)
+        self.assertIn(QUOTED_IDENTIFIER, types)
+        self.assertEqual(types.count(STRING), 2)
+        self.assertNotIn(COMMENT, types)
+
+    def test_nested_block_comment(self):
+        sql = "/* outer /* inner */ still outer */ SELECT 1"
+        tokens = list(tokenize(sql))
+        self.assertEqual(tokens[0].type, COMMENT)
+        self.assertEqual(tokens[0].value, "/* outer /* inner */ still outer */")
+
+    def test_semicolons_inside_literals_and_comments(self):
+        sql = "INSERT INTO t (a) VALUES ('x;y'); -- one; two\nSELECT \"a;b\" FROM t /* ; */;"
+        statements = self.spans_to_text(sql)
+        self.assertEqual(len(statements), 2)
+        self.assertEqual(statements[0], "INSERT INTO t (a) VALUES ('x;y');")
+
+    def test_escaped_quote(self):
+        sql = "INSERT INTO t (a) VALUES ('it\\'s; fine'); SELECT 1;"
+        self.assertEqual(len(split_into_statements(sql)), 2)
+
+    def test_spans_are_contiguous(self):
+        sql = "SELECT 1;\n\n-- comment\nSELECT 2;\n"
+        spans = list(iter_statement_spans(sql))
+        self.assertEqual(spans[0][0], 0)
+        self.assertEqual(spans[-1][1], len(sql))
+        for previous, current in zip(spans, spans[1:]):
+            self.assertEqual(previous[1], current[0])
+
+    def test_statement_without_semicolon_followed_by_keyword_line(self):
+        sql = "DELETE FROM t WHERE id = 1\nSELECT * FROM other_table"
+        self.assertEqual(self.spans_to_text(sql), [
+            "DELETE FROM t WHERE id = 1",
+            "SELECT * FROM other_table",
+        ])
+
+    def test_keyword_lines_that_continue_a_statement(self):
+        sql = "INSERT INTO t (a)\nSELECT a FROM s;\nCREATE VIEW v AS\nSELECT 1;\nUPDATE t SET a = (\nSELECT 1);"
+        self.assertEqual(len(self.spans_to_text(sql)), 3)
+
+    def test_get_statement_target(self):
+        self.assertEqual(get_statement_target("DELETE FROM Target WHERE id = 1", ("delete", "from")), "target")
+        self.assertEqual(get_statement_target("delete from public.t;", ("delete", "from")), "public.t")
+        self.assertEqual(get_statement_target("/* c */ UPDATE t SET a = 1", ("update",)), "t")
+        self.assertIsNone(get_statement_target("DELETE FROM 'TARGET'", ("delete", "from")))
+        self.assertIsNone(get_statement_target("SELECT 1", ("update",)))
+
+
+if __name__ == "__main__":
+    unittest.main()
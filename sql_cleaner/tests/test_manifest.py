@@ -0,0 +1,90 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from sql_cleaner.cli import process_sql_files
+from sql_cleaner.processor.manifest import MANIFEST_FILE_NAME, RunManifest, tables_fingerprint
+
+
+class TestIncrementalRuns(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.target_file = self.write('target.sql', "INSERT INTO target (id) VALUES (1);\nSELECT * FROM product;\n")
+        self.other_file = self.write('other.sql', "SELECT * FROM product;\n")
+    
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+    
+    def run_cli(self, tables=('target',)):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            process_sql_files(self.directory, list(tables), jobs=1, incremental=True)
+        return output.getvalue()
+    
+    def test_second_run_skips_all_files(self):
+        first_log = self.run_cli()
+        self.assertIn(f"Processed file: {self.target_file}", first_log)
+        self.assertIn(f"No target tables found in file: {self.other_file}", first_log)
+        
+        second_log = self.run_cli()
+        self.assertIn(f"Unchanged since last run: {self.target_file}", second_log)
+        self.assertIn(f"Unchanged since last run: {self.other_file}", second_log)
+    
+    def test_changed_file_is_processed_again(self):
+        self.run_cli()
+        self.write('other.sql', "INSERT INTO target (id) VALUES (2);\n")
+        
+        log = self.run_cli()
+        self.assertIn(f"Processed file: {self.other_file}", log)
+        self.assertIn(f"Unchanged since last run: {self.target_file}", log)
+    
+    def test_changed_tables_process_all_files(self):
+        self.run_cli()
+        
+        log = self.run_cli(['target', 'product'])
+        self.assertNotIn("Unchanged since last run", log)
+        self.assertIn(f"No changes needed in file: {self.other_file}", log)
+    
+    def test_files_of_an_older_version_are_processed_again(self):
+        with mock.patch('sql_cleaner.processor.manifest.MANIFEST_VERSION', 1):
+            self.run_cli()
+        
+        self.assertNotIn("Unchanged since last run", self.run_cli())
+        self.assertIn(f"Unchanged since last run: {self.other_file}", self.run_cli())
+    
+    def test_touched_file_with_same_content_is_skipped(self):
+        self.run_cli()
+        stat = os.stat(self.other_file)
+        os.utime(self.other_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        
+        self.assertIn(f"Unchanged since last run: {self.other_file}", self.run_cli())
+        # The new modification time is recorded, so the next run need not hash the file
+        entry = RunManifest(self.directory).get(self.other_file)
+        self.assertEqual(entry.mtime_ns, stat.st_mtime_ns + 10 ** 9)
+    
+    def test_manifest_forgets_deleted_files(self):
+        self.run_cli()
+        os.remove(self.other_file)
+        self.run_cli()
+        
+        with open(os.path.join(self.directory, MANIFEST_FILE_NAME), encoding='utf-8') as f:
+            files = json.load(f)['files']
+        self.assertEqual(list(files), ['target.sql'])
+        self.assertEqual(files['target.sql']['fingerprint'], tables_fingerprint(['TARGET']))
+    
+    def test_unreadable_manifest_starts_empty(self):
+        self.write(MANIFEST_FILE_NAME, "{not json")
+        self.assertIn(f"Processed file: {self.target_file}", self.run_cli())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from sql_cleaner.processor.sql_processor import SQLProcessor
+
+
+class TestProcessMany(unittest.TestCase):
+    def setUp(self):
+        self.processor = SQLProcessor()
+        self.items = []
+        for i in range(50):
+            if i % 3 == 0:
+                content = f"INSERT INTO company (id) VALUES ({i});\nINSERT INTO price (id, company_id) VALUES ({i}, 1);"
+            elif i % 3 == 1:
+                content = f"SELECT * FROM product WHERE id = {i};"
+            else:
+                content = f"DELETE FROM company WHERE id = {i};"
+            self.items.append((f"snippet-{i}", content))
+    
+    def expected(self, tables):
+        return [(key, self.processor.process_sql_content(content, tables)) for key, content in self.items]
+    
+    def test_matches_process_sql_content(self):
+        results = list(self.processor.process_many(self.items, ['company']))
+        
+        self.assertEqual([(key, result) for key, result, _ in results], self.expected(['company']))
+    
+    def test_stats(self):
+        results = self.processor.process_many(self.items[:2], ['company'])
+        
+        _, result, stats = next(results)
+        self.assertTrue(stats.matched)
+        self.assertEqual((stats.size_in, stats.size_out), (len(self.items[0][1]), len(result)))
+        self.assertGreaterEqual(stats.seconds, 0)
+        
+        _, result, stats = next(results)
+        self.assertEqual(result, self.items[1][1])
+        self.assertFalse(stats.matched)
+    
+    def test_is_lazy(self):
+        def items():
+            yield self.items[0]
+            raise AssertionError("read too far")
+        
+        key, _, _ = next(self.processor.process_many(items(), ['company']))
+        self.assertEqual(key, 'snippet-0')
+    
+    def test_without_tables_uses_tables_of_each_item(self):
+        results = list(self.processor.process_many(self.items, []))
+        
+        self.assertEqual([(key, result) for key, result, _ in results], self.expected([]))
+    
+    def test_executors(self):
+        for executor_class in (ThreadPoolExecutor, ProcessPoolExecutor):
+            with executor_class(max_workers=2) as executor:
+                results = list(self.processor.process_many(iter(self.items), ['company'], executor, batch_size=4))
+            
+            self.assertEqual([(key, result) for key, result, _ in results], self.expected(['company']))
+    
+    def test_concurrent_data_dump_modes(self):
+        items = [(i, "INSERT INTO product (id, company_id)\nVALUES (1, 2);\n") for i in range(64)]
+        never = SQLProcessor(data_dump='never')
+        always = SQLProcessor(data_dump='always')
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            runs = [list(processor.process_many(iter(items), ['company'], executor, batch_size=1))
+                    for processor in (never, always)]
+            # Both runs have batches in flight in the same pool at the same time
+            interleaved = zip(never.process_many(iter(items), ['company'], executor, batch_size=1),
+                              always.process_many(iter(items), ['company'], executor, batch_size=1))
+            for (_, never_result, _), (_, always_result, _) in interleaved:
+                self.assertEqual(never_result, "INSERT INTO product (id) VALUES (1);\n")
+                self.assertEqual(always_result, "INSERT INTO product (id)\nVALUES (1);\n")
+        
+        self.assertEqual({result for _, result, _ in runs[0]}, {"INSERT INTO product (id) VALUES (1);\n"})
+        self.assertEqual({result for _, result, _ in runs[1]}, {"INSERT INTO product (id)\nVALUES (1);\n"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from sql_cleaner.cli import process_sql_files
+from sql_cleaner.processor.profiler import Profiler
+from sql_cleaner.processor.sql_processor import SQLProcessor
+
+
+class TestProfiler(unittest.TestCase):
+    SQL = "INSERT INTO target (id) VALUES (1);\nSELECT * FROM product WHERE target_id = 1 AND a = 2;"
+    
+    def test_handlers_record_when_profiler_attached(self):
+        profiler = Profiler()
+        processor = SQLProcessor(profiler)
+        processor.process_sql_content(self.SQL, ['target'])
+        
+        # Handlers only get the statements they accept, and none without a DELETE or UPDATE
+        self.assertEqual(set(profiler.handlers), {
+            'parse', 'render', 'CommentRemovalHandler', 'InsertHandler', 'WhereHandler', 'JoinHandler'
+        })
+        insert = profiler.handlers['InsertHandler']
+        self.assertEqual((insert['calls'], insert['statements_in'], insert['statements_out']), (1, 1, 0))
+        where = profiler.handlers['WhereHandler']
+        self.assertEqual((where['statements_in'], where['statements_out']), (1, 1))
+        self.assertLess(insert['size_out'], insert['size_in'])
+    
+    def test_nothing_recorded_when_detached(self):
+        profiler = Profiler()
+        processor = SQLProcessor(profiler)
+        processor.set_profiler(None)
+        processor.process_sql_content(self.SQL, ['target'])
+        self.assertEqual(profiler.handlers, {})
+    
+    def test_merge_adds_up(self):
+        first, second = Profiler(), Profiler()
+        for profiler, path in ((first, 'a.sql'), (second, 'b.sql')):
+            profiler.begin_file()
+            profiler.record_handler('InsertHandler', 0.5, 2, 1, 100, 40)
+            profiler.end_file(path, 1.0, 100, 40, {'target'}, 'processed')
+        first.merge(second)
+        
+        report = first.to_dict()
+        self.assertEqual(report['handlers']['InsertHandler']['calls'], 2)
+        self.assertEqual(report['tables']['target'], {'files': 2, 'seconds': 2.0, 'size_in': 200, 'size_out': 80})
+        self.assertEqual(report['totals']['outcomes'], {'processed': 2})
+        self.assertEqual(report['files']['b.sql']['handlers']['InsertHandler']['seconds'], 0.5)
+    
+    def test_cli_profile_report(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        for name, content in (('a.sql', self.SQL), ('b.sql', "SELECT 1;")):
+            with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        report_path = os.path.join(directory, 'profile.json')
+        
+        with redirect_stdout(io.StringIO()):
+            process_sql_files(directory, ['target'], jobs=2, profile_report=report_path)
+        with open(report_path, encoding='utf-8') as f:
+            report = json.load(f)
+        
+        self.assertEqual(report['totals']['outcomes'], {'processed': 1, 'skipped': 1})
+        self.assertEqual(report['tables']['target']['files'], 1)
+        self.assertEqual(report['handlers']['InsertHandler']['calls'], 1)
+        self.assertIn('WhereHandler', report['files'][os.path.join(directory, 'a.sql')]['handlers'])
+
+
+if __name__ == "__main__":
+    unittest.main()
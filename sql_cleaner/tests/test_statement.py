@@ -0,0 +1,141 @@
+import unittest
+from unittest import mock
+from sql_cleaner.processor.handler import SQLHandler
+from sql_cleaner.processor.statement import (
+    INSERT, SELECT, UPDATE, DELETE, DDL, OTHER,
+    parse_statements, render_changes, render_statements
+)
+from sql_cleaner.processor.sql_processor import SQLProcessor
+
+
+class _RecordingHandler(SQLHandler):
+    statement_types = frozenset([SELECT])
+    
+    def __init__(self):
+        super().__init__()
+        self.seen = []
+    
+    def process_statements(self, statements, tables_to_process):
+        self.seen.extend(statement.text.strip() for statement in statements)
+        # Drop the first statement it is given
+        return statements[1:]
+
+
+class TestStatement(unittest.TestCase):
+    def test_parse_records_kind_and_table(self):
+        sql = """
+        INSERT INTO public.Company (id) VALUES (1);
+        SELECT * FROM company;
+        UPDATE company SET name = 'x';
+        DELETE FROM company;
+        CREATE TABLE t (id int);
+        WITH x AS (SELECT 1) SELECT * FROM x;
+        """
+        statements = parse_statements(sql)
+        self.assertEqual([s.kind for s in statements], [INSERT, SELECT, UPDATE, DELETE, DDL, OTHER])
+        self.assertEqual([s.table for s in statements], ["public.company", None, "company", "company", None, None])
+
+    def test_statements_share_buffer(self):
+        sql = "SELECT 1; SELECT 2;"
+        statements = parse_statements(sql)
+        self.assertTrue(all(s.buffer is sql for s in statements))
+        self.assertEqual(statements[1].text.strip(), "SELECT 2;")
+
+    def test_text_change_resets_caches(self):
+        statement = parse_statements("SELECT * FROM Target t WHERE t.id = 1;")[0]
+        self.assertEqual(statement.lower, "select * from target t where t.id = 1;")
+        self.assertEqual(statement.aliases, {"target": ["t"]})
+
+        statement.text = "SELECT * FROM other o;"
+        self.assertEqual(statement.lower, "select * from other o;")
+        self.assertEqual(statement.aliases, {"other": ["o"]})
+
+    def test_aliases_for_consecutive_joins(self):
+        statement = parse_statements("SELECT * FROM a JOIN b bb JOIN c AS cc")[0]
+        self.assertEqual(statement.aliases["b"], ["bb"])
+        self.assertEqual(statement.aliases["c"], ["cc"])
+
+    def test_render_statements(self):
+        statements = parse_statements("SELECT 1;\n\n  SELECT 2;\n")
+        self.assertEqual(render_statements(statements), "SELECT 1; SELECT 2;")
+
+    def test_render_changes(self):
+        sql = "-- head\nSELECT  1;\nDELETE FROM t;\nSELECT 2 ; SELECT 3;\n/* tail */\n"
+        statements = parse_statements(sql)
+        statements[3].text = "SELECT 4;"
+        self.assertEqual(render_changes(sql, statements, statements[:1] + statements[2:]),
+                         "-- head\nSELECT  1;\nSELECT 2 ; SELECT 4;\n/* tail */\n")
+        self.assertEqual(render_changes(sql, statements, [statements[1]]), "-- head\nDELETE FROM t;\n/* tail */\n")
+        self.assertEqual(render_changes("DELETE FROM t;\n", statements[:0], []), "DELETE FROM t;\n")
+        
+        statements = parse_statements("DELETE FROM t;\nDELETE FROM t;\n SELECT 1;")
+        self.assertEqual(render_changes(statements[0].buffer, statements, statements[2:]), " SELECT 1;")
+        self.assertEqual(render_changes(statements[0].buffer, statements, []), "")
+
+    def test_tokens_are_lexed_once_per_text(self):
+        statement = parse_statements("SELECT * FROM t WHERE a = 1;")[0]
+        tokens = statement.tokens
+        self.assertIs(statement.tokens, tokens)
+        self.assertEqual(tokens[-1].value, ";")
+        
+        statement.text = "SELECT 1;"
+        self.assertEqual([token.value for token in statement.tokens], ["SELECT", "1", ";"])
+        
+        sql = "SELECT * FROM orders o JOIN company c ON c.id = o.company_id;"
+        with mock.patch('sql_cleaner.processor.join_handler.significant_tokens', side_effect=AssertionError):
+            self.assertEqual(SQLProcessor().process_sql_content(sql, ['company']), "SELECT * FROM orders o;")
+
+    def test_removed_statements_leave_no_empty_line(self):
+        processor = SQLProcessor()
+        self.assertEqual(
+            processor.process_sql_content(
+                "SELECT a FROM orders WHERE company_id = 1; DELETE FROM company;\nSELECT 2;\n", ['company']),
+            "SELECT a FROM orders;\nSELECT 2;\n")
+        self.assertEqual(
+            processor.process_sql_content(
+                "SELECT 1;\nDELETE FROM company;\n\nDELETE FROM company;\n\nSELECT 2;\n", ['company']),
+            "SELECT 1;\n\nSELECT 2;\n")
+        self.assertEqual(
+            processor.process_sql_content("DELETE FROM company;\n\nDELETE FROM company;\nSELECT 2;\n", ['company']),
+            "SELECT 2;\n")
+        self.assertEqual(
+            processor.process_sql_content("SELECT 1;\r\nDELETE FROM company;\r\nSELECT 2;\r\n", ['company']),
+            "SELECT 1;\r\nSELECT 2;\r\n")
+
+    def test_chain_keeps_statements_it_does_not_change(self):
+        sql = ("-- Seed data\n"
+               "SELECT *\n  FROM product -- all of it\n  ORDER BY id;\n"
+               "DELETE FROM target;\n"
+               "SELECT * FROM product p\n  WHERE p.target_id = 1 /* why */ AND p.a = 2;\n")
+        self.assertEqual(SQLProcessor().process_sql_content(sql, ['target']), (
+            "-- Seed data\n"
+            "SELECT *\n  FROM product -- all of it\n  ORDER BY id;\n"
+            "SELECT * FROM product p WHERE p.a = 2;\n"
+        ))
+
+    def test_chain_keeps_unrelated_statements(self):
+        sql = "UPDATE target SET a = 1;\nUPDATE other SET target_id = NULL WHERE target_id = 3;"
+        processed = SQLProcessor().process_sql_content(sql, ['target'])
+        self.assertEqual(processed, "UPDATE other SET target_id = NULL;")
+
+
+    def test_insert_source(self):
+        sql = ("INSERT INTO t (a, b) VALUES (1, 2); INSERT INTO t SELECT * FROM u WHERE x = 1;"
+               "INSERT INTO t (SELECT 1); INSERT INTO t DEFAULT VALUES; INSERT INTO t (a) WITH q AS (SELECT 1) SELECT * FROM q;")
+        statements = parse_statements(sql)
+        self.assertEqual([s.source for s in statements], ["VALUES", "SELECT", "SELECT", "DEFAULT", "WITH"])
+        self.assertEqual([s.is_data for s in statements], [True, False, False, True, False])
+
+    def test_handlers_get_only_accepted_statements(self):
+        handler = _RecordingHandler()
+        sql = "SELECT 1; INSERT INTO t VALUES (1); SELECT 2; DELETE FROM t; SELECT 3;"
+        self.assertEqual(handler.process(sql, []), "INSERT INTO t VALUES (1); SELECT 2; DELETE FROM t; SELECT 3;")
+        self.assertEqual(handler.seen, ["SELECT 1;", "SELECT 2;", "SELECT 3;"])
+
+        handler = _RecordingHandler()
+        self.assertEqual(handler.process("INSERT INTO t VALUES (1);", []), "INSERT INTO t VALUES (1);")
+        self.assertEqual(handler.seen, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
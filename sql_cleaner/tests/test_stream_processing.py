@@ -0,0 +1,83 @@
+import io
+import unittest
+from sql_cleaner.processor.lexer import iter_statement_spans, iter_statement_texts
+from sql_cleaner.processor.utils import split_into_statements, stream_statements
+from sql_cleaner.processor.sql_processor import SQLProcessor
+
+
+class TestStreamProcessing(unittest.TestCase):
+    SQL = (
+        "INSERT INTO target (id, name) VALUES (1, 'a;\nb');\n"
+        "INSERT INTO product (id, target_id, name) VALUES (1, 2, 'p');\n"
+        "/* block; comment */ SELECT * FROM product WHERE price > 0\n"
+        "DELETE FROM target WHERE id = 1\n"
+        "UPDATE product SET name = 'x';\n"
+    )
+    
+    def chunked(self, text, size):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+    
+    def test_statement_texts_do_not_depend_on_chunking(self):
+        expected = [self.SQL[start:end] for start, end in iter_statement_spans(self.SQL)]
+        for size in (1, 2, 3, 7, 16, 1000):
+            self.assertEqual(list(iter_statement_texts(self.chunked(self.SQL, size))), expected)
+    
+    def test_stream_statements_matches_split_into_statements(self):
+        sql = self.SQL.replace('\n', '\r\n')
+        expected = split_into_statements(sql)
+        self.assertEqual(list(stream_statements(io.StringIO(sql), chunk_size=5)), expected)
+        self.assertEqual(list(stream_statements(self.chunked(sql, 1))), expected)
+    
+    def test_process_stream(self):
+        processor = SQLProcessor()
+        output = ''.join(processor.process_stream(self.chunked(self.SQL, 4), ['target']))
+        self.assertEqual(output, (
+            "INSERT INTO product (id, name) VALUES (1, 'p');\n"
+            "/* block; comment */ SELECT * FROM product WHERE price > 0\n"
+            "UPDATE product SET name = 'x';\n"
+        ))
+    
+    def test_process_stream_matches_process_sql_content_statements(self):
+        processor = SQLProcessor()
+        streamed = ''.join(processor.process_stream(io.StringIO(self.SQL), ['product']))
+        self.assertEqual(
+            split_into_statements(processor.process_sql_content(streamed, ['product'])),
+            split_into_statements(processor.process_sql_content(self.SQL, ['product']))
+        )
+    
+    def test_process_stream_matches_process_sql_content(self):
+        processor = SQLProcessor()
+        for sql in ("SELECT 1;\n" + self.SQL + "-- end\n",
+                    self.SQL,
+                    "SELECT 1;\nDELETE FROM target;\n\nDELETE FROM target;\n\nSELECT 2;\n",
+                    "DELETE FROM target;\n\n  DELETE FROM target; SELECT 1;\r\nDELETE FROM target;\n",
+                    "SELECT 1;\n  COPY product (id) FROM stdin;\n1\n\\.\nDELETE FROM target;\n"):
+            for tables in (['target'], ['product']):
+                for size in (1, 7, 1000):
+                    self.assertEqual(''.join(processor.process_stream(self.chunked(sql, size), tables)),
+                                     processor.process_sql_content(sql, tables))
+    
+    def test_process_stream_keeps_removed_file(self):
+        processor = SQLProcessor()
+        output = ''.join(processor.process_stream(["DELETE FROM target;\n", "INSERT INTO target (id) VALUES (1);"], ['target']))
+        self.assertTrue(output.startswith("-- All content was removed by sql_cleaner"))
+        self.assertIn("target", output)
+    
+    def test_process_stream_filters_copy_data(self):
+        sql = (
+            "COPY public.target (id, name) FROM stdin;\n1\tit's\n\\.\n\n"
+            "COPY public.product (id, target_id, name) FROM stdin;\n1\t2\tp;\n2\t\\N\tq\n\\.\n"
+        )
+        processor = SQLProcessor()
+        for size in (1, 5, 1000):
+            output = ''.join(processor.process_stream(self.chunked(sql, size), ['target']))
+            self.assertEqual(output, "\nCOPY public.product (id, name) FROM stdin;\n1\tp;\n2\tq\n\\.\n")
+            self.assertEqual(output, processor.process_sql_content(sql, ['target']))
+    
+    def test_process_stream_without_tables_passes_through(self):
+        processor = SQLProcessor()
+        self.assertEqual(''.join(processor.process_stream(io.StringIO(self.SQL), [])), self.SQL)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import io
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from sql_cleaner.benchmarks.corpus import CorpusGenerator
+from sql_cleaner.cli import process_sql_files
+from sql_cleaner.processor.table_index import INDEX_FILE_NAME, TableIndex, scan_names
+from sql_cleaner.processor.table_prefilter import TablePrefilter
+
+
+class TestTableIndex(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+    
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+    
+    def open_index(self):
+        index = TableIndex(self.directory)
+        self.addCleanup(index.close)
+        return index
+    
+    def test_scan_names_records_byte_offsets(self):
+        names = scan_names("SELECT 'é' FROM Company c WHERE c.price_id = 1;".encode('utf-8'))
+        
+        self.assertEqual(names['company'], [17])
+        self.assertEqual(names['c'], [33])
+        self.assertEqual(names['price_id'], [35])
+        self.assertNotIn('select', names)
+    
+    def test_update_is_incremental(self):
+        first = self.write('a.sql', "INSERT INTO company (id) VALUES (1);")
+        second = self.write('b.sql', "SELECT 1;")
+        index = self.open_index()
+        
+        self.assertEqual(index.update([first, second]), 2)
+        self.assertEqual(index.update([first, second]), 0)
+        
+        self.write('b.sql', "SELECT * FROM price;")
+        os.utime(second, ns=(0, 0))
+        self.assertEqual(index.update([first, second]), 1)
+        self.assertEqual(index.files_for_tables(['PRICE']), {second})
+        
+        index.update([second])
+        self.assertEqual(index.mentions('company'), {})
+    
+    def test_changes_are_kept_only_when_saved(self):
+        path = self.write('a.sql', "INSERT INTO company (id) VALUES (1);")
+        index = TableIndex(self.directory)
+        index.update([path])
+        index.close()
+        
+        self.assertEqual(self.open_index().update([path]), 1)
+    
+    def test_files_for_tables_covers_the_prefilter(self):
+        tables = ['target_0', 'target_1', 'store']
+        generator = CorpusGenerator(tables, seed=3)
+        paths = [self.write(f'file{i}.sql', generator.content(300)) for i in range(40)]
+        paths.append(self.write('folded.sql', "UPDATE ſtore SET a = 1;"))
+        paths.append(self.write('qualified.sql', "INSERT INTO public.store (id) VALUES (1);"))
+        paths.append(self.write('copy.sql', "COPY public.store (id) FROM stdin;\n1\n\\.\n"))
+        index = self.open_index()
+        index.update(paths)
+        
+        for table in tables:
+            prefilter = TablePrefilter([table])
+            expected = set()
+            for path in paths:
+                with open(path, encoding='utf-8') as f:
+                    if prefilter.contains(f.read()):
+                        expected.add(path)
+            self.assertTrue(expected)
+            self.assertLessEqual(expected, index.files_for_tables([table]))
+        
+        self.assertIsNone(index.files_for_tables(['public.company']))
+        self.assertEqual(index.files_for_tables([]), set())
+    
+    def test_indexed_run_opens_only_listed_files(self):
+        self.write('a.sql', "INSERT INTO company (id) VALUES (1);\nSELECT 2;")
+        self.write('b.sql', "SELECT 1;")
+        
+        output = io.StringIO()
+        with redirect_stdout(output):
+            process_sql_files(self.directory, ['company'], jobs=1, use_index=True)
+        log = output.getvalue()
+        
+        self.assertIn("1 of 2 files reference the tables", log)
+        self.assertIn("Processed file: " + os.path.join(self.directory, 'a.sql'), log)
+        self.assertNotIn("b.sql", log)
+        self.assertIn("Found 2 SQL files.", log)
+
+    def test_dry_run_writes_no_index(self):
+        self.write('a.sql', "INSERT INTO company (id) VALUES (1);\nSELECT 2;")
+        index_path = os.path.join(self.directory, INDEX_FILE_NAME)
+        
+        with redirect_stdout(io.StringIO()) as output:
+            process_sql_files(self.directory, ['company'], jobs=1, use_index=True, dry_run=True)
+        self.assertIn("1 of 1 files reference the tables", output.getvalue())
+        self.assertFalse(os.path.exists(index_path))
+        
+        self.open_index().close()
+        connection = sqlite3.connect(index_path)
+        connection.execute("UPDATE meta SET value = '0' WHERE key = 'version'")
+        connection.commit()
+        connection.close()
+        with open(index_path, 'rb') as f:
+            stale = f.read()
+        
+        with redirect_stdout(io.StringIO()) as output:
+            process_sql_files(self.directory, ['company'], jobs=1, use_index=True, dry_run=True)
+        self.assertIn("1 of 1 files reference the tables", output.getvalue())
+        with open(index_path, 'rb') as f:
+            self.assertEqual(f.read(), stale)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from sql_cleaner.processor.table_prefilter import TablePrefilter
+
+
+class TestTablePrefilter(unittest.TestCase):
+    def setUp(self):
+        self.prefilter = TablePrefilter(["Company", "price", "price_history"])
+
+    def test_contains(self):
+        self.assertTrue(self.prefilter.contains("INSERT INTO company (id) VALUES (1);"))
+        self.assertTrue(self.prefilter.contains("SELECT * FROM product WHERE company_id = 1;"))
+        self.assertTrue(self.prefilter.contains("SELECT company.name FROM x;"))
+        self.assertTrue(self.prefilter.contains("SELECT * FROM a JOIN Price p ON p.id = a.pid;"))
+        self.assertTrue(self.prefilter.contains("update price set value = 1;"))
+        self.assertTrue(self.prefilter.contains("INSERT INTO public.company VALUES (1);"))
+        self.assertTrue(self.prefilter.contains("DELETE FROM public.price;"))
+        self.assertTrue(self.prefilter.contains("COPY public.company (id, name) FROM stdin;"))
+        self.assertFalse(self.prefilter.contains("SELECT * FROM product WHERE product_id = 1;"))
+        self.assertFalse(self.prefilter.contains("SELECT * FROM companies;"))
+
+    def test_find(self):
+        content = "SELECT 1; INSERT INTO product (id, price_id) VALUES (1, 2);"
+        self.assertEqual(self.prefilter.find(content), content.index("price_id"))
+        self.assertEqual(self.prefilter.find(content, content.index("price_id") + 1), -1)
+        self.assertEqual(TablePrefilter([]).find(content), -1)
+
+    def test_find_tables(self):
+        content = "SELECT * FROM price_history h JOIN x ON x.company_id = h.id;"
+        self.assertEqual(self.prefilter.find_tables(content), {"price_history", "company"})
+        self.assertEqual(self.prefilter.find_tables("SELECT 1;"), set())
+
+    def test_many_tables_sharing_prefixes(self):
+        tables = [f"t{i}" for i in range(2000)] + ["price", "price_history"]
+        prefilter = TablePrefilter(tables)
+        content = "SELECT * FROM t1999 JOIN t1 ON t1.id = t1999.t19_id JOIN price_history h ON h.price_id = 1;"
+        self.assertEqual(prefilter.find_tables(content), {"t1999", "t1", "t19", "price_history", "price"})
+        self.assertFalse(prefilter.contains("SELECT * FROM t20000;"))
+        self.assertTrue(prefilter.may_contain(b"DELETE FROM T1234;"))
+        self.assertFalse(prefilter.may_contain(b"SELECT * FROM tx WHERE cost > 0;"))
+
+    def test_may_contain_bytes(self):
+        self.assertTrue(self.prefilter.may_contain(b"INSERT INTO COMPANY (id) VALUES (1);"))
+        self.assertTrue(self.prefilter.may_contain(b"SELECT * FROM x WHERE price_id = 1;"))
+        self.assertTrue(self.prefilter.may_contain("SELECT 'é' FROM company;".encode('utf-8')))
+        self.assertFalse(self.prefilter.may_contain(b"SELECT * FROM companies;"))
+        self.assertFalse(self.prefilter.may_contain(b""))
+
+    def test_may_contain_matches_unicode_case_folding(self):
+        # Case-insensitive text matching treats the long s and the Kelvin sign as 's' and 'k'
+        prefilter = TablePrefilter(["store", "kind"])
+        for content in ["UPDATE \u017ftore SET a = 1;", "SELECT * FROM \u212aind;"]:
+            self.assertTrue(prefilter.contains(content))
+            self.assertTrue(prefilter.may_contain(content.encode('utf-8')))
+
+    def test_may_contain_non_ascii_table_names(self):
+        prefilter = TablePrefilter(["caf\u00e9"])
+        self.assertTrue(prefilter.may_contain(b"SELECT 1;"))
+        self.assertFalse(TablePrefilter([]).may_contain(b"SELECT * FROM company;"))
+
+    def test_empty_table_list(self):
+        prefilter = TablePrefilter([])
+        self.assertFalse(prefilter.contains("SELECT * FROM company;"))
+        self.assertEqual(prefilter.find_tables("SELECT * FROM company;"), set())
+
+    def test_table_names_are_escaped(self):
+        prefilter = TablePrefilter(["a.b"])
+        self.assertFalse(prefilter.contains("SELECT * FROM axb;"))
+
+
+if __name__ == "__main__":
+    unittest.main()
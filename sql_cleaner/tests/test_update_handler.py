@@ -22,6 +22,11 @@ class TestUpdateHandler(unittest.TestCase):
         result = self.handler.process(sql, self.tables_to_process)
         self.assertEqual(result, "")
 
+    def test_remove_update_for_schema_qualified_table(self):
+        sql = 'UPDATE public.target_table SET a = 1; UPDATE "public"."TARGET_TABLE" SET a = 2; UPDATE other SET a = 3;'
+        result = self.handler.process(sql, self.tables_to_process)
+        self.assertEqual(result, "UPDATE other SET a = 3;")
+
     def test_keep_update_for_non_target_table(self):
         sql = "UPDATE other_table SET status = 'active' WHERE id = 1;"
         result = self.handler.process(sql, self.tables_to_process)
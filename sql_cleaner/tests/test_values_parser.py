@@ -0,0 +1,57 @@
+import unittest
+
+from sql_cleaner.processor.insert_handler import InsertHandler
+from sql_cleaner.processor.edits import apply_edits
+from sql_cleaner.processor.values_parser import iter_value_tuples, remove_fields
+
+
+def fields(statement, pos=0):
+    return [[statement[start:end].strip() for start, end in value_tuple.fields]
+            for value_tuple in iter_value_tuples(statement, pos)]
+
+
+class TestValuesParser(unittest.TestCase):
+    def test_tuples_and_fields(self):
+        self.assertEqual(fields(" (1, 'a'),\n (2, 'b');"), [['1', "'a'"], ['2', "'b'"]])
+    
+    def test_strings_and_nested_parentheses(self):
+        statement = r"""(1, 'a, (b', "c)", 'it''s', 'd\', e', now(), coalesce(x, 1))"""
+        self.assertEqual(fields(statement), [
+            ['1', "'a, (b'", '"c)"', "'it''s'", r"'d\', e'", 'now()', 'coalesce(x, 1)']
+        ])
+    
+    def test_spans_point_into_statement(self):
+        statement = "VALUES (1,2), (3,4) ON DUPLICATE KEY UPDATE a = VALUES(a);"
+        value_tuples = list(iter_value_tuples(statement, 6))
+        
+        self.assertEqual([statement[t.start:t.end] for t in value_tuples], ['(1,2)', '(3,4)'])
+        self.assertEqual(statement[value_tuples[-1].end:], " ON DUPLICATE KEY UPDATE a = VALUES(a);")
+    
+    def test_unterminated_values(self):
+        self.assertEqual(fields("(1, 2), (3, 'x"), [['1', '2']])
+        self.assertEqual(fields("(1, (2"), [])
+        self.assertEqual(fields("no tuples"), [])
+    
+    def test_remove_fields(self):
+        statement = "(1,  2 , 3, 4)"
+        value_tuple = next(iter_value_tuples(statement))
+        
+        def removed(drop):
+            return apply_edits(statement, remove_fields(statement, value_tuple.fields, drop))
+        
+        self.assertEqual(removed({1}), "(1,  3, 4)")
+        self.assertEqual(removed({0, 1}), "(3, 4)")
+        self.assertEqual(removed({2, 3}), "(1,  2)")
+        self.assertEqual(removed({0, 1, 2, 3}), "()")
+    
+    def test_multi_value_insert_keeps_expressions_and_trailing_clause(self):
+        statement = ("INSERT INTO price (id, company_id, created, note) VALUES "
+                     "(1, 2, now(), 'a (b)'), (3, 4, now(), 'c') ON CONFLICT (id) DO NOTHING;")
+        processed = InsertHandler()._process_reference_insert(statement, {'company_id'})
+        
+        self.assertEqual(processed, "INSERT INTO price (id, created, note) VALUES "
+                                    "(1, now(), 'a (b)'), (3, now(), 'c') ON CONFLICT (id) DO NOTHING;")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ if PACKAGE_ROOT not in sys.path:
     sys.path.insert(0, os.path.abspath(os.path.join(PACKAGE_ROOT, '..')))
 
 from sql_cleaner.processor.sql_processor import SQLProcessor
+from sql_cleaner.processor.where_handler import WhereHandler
 
 
 class TestWhereConditionRemoval(unittest.TestCase):
@@ -219,6 +220,37 @@ class TestWhereConditionRemoval(unittest.TestCase):
         self.assertEqual("SELECT * FROM product p WHERE p.price > 0;", processed.strip())
         self.assertNotIn("target_id", processed.lower())
         self.assertNotIn("BETWEEN", processed.upper())
+    
+    def test_all_tables_in_one_pass(self):
+        """Test removing conditions of several tables and their aliases from one WHERE clause"""
+        sql = """
+        SELECT * FROM product p JOIN target t ON p.target_id = t.id JOIN region r ON r.id = p.region_id
+        WHERE (t.active = true OR region_id IS NULL) AND p.price > 0 AND r.name = 'Europe'
+        GROUP BY p.id;
+        """
+        
+        processed = WhereHandler().process(sql, ['target', 'region'])
+        
+        self.assertIn("WHERE p.price > 0\n        GROUP BY p.id;", processed)
+    
+    def test_string_literals_are_not_references(self):
+        """Test that table names inside string literals do not remove a condition"""
+        sql = "SELECT * FROM product WHERE name = 'target_id = 1' AND target_id = 2;"
+        
+        processed = self.processor.process_sql_content(sql, ['target'])
+        
+        self.assertEqual("SELECT * FROM product WHERE name = 'target_id = 1';", processed.strip())
+
+    def test_removed_where_clause_leaves_no_gap(self):
+        """Test that removing the only condition leaves no whitespace before the semicolon"""
+        handler = WhereHandler()
+        
+        self.assertEqual(handler.process("SELECT * FROM orders WHERE company_id = 1 ;", ['company']),
+                         "SELECT * FROM orders;")
+        self.assertEqual(handler.process("SELECT * FROM orders\n  WHERE company_id = 1\n;", ['company']),
+                         "SELECT * FROM orders;")
+        self.assertEqual(handler.process("SELECT * FROM orders WHERE company_id = 1 ORDER BY id;", ['company']),
+                         "SELECT * FROM orders ORDER BY id;")
 
 
 if __name__ == '__main__':